@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import string
+from pathlib import Path
+
+from src.reuse import _HISTORY_MAGIC, _digest_password
+
+PEPPER = "benchmark-pepper"
+
+_WORD_ALPHABET = string.ascii_lowercase + string.digits
+_QUERY_ALPHABET = string.ascii_letters + string.digits + string.punctuation
+
+
+def common_word(i: int) -> str:
+    return f"{_encode(i)}pw"
+
+
+def _encode(i: int) -> str:
+    out = []
+    while True:
+        i, r = divmod(i, len(_WORD_ALPHABET))
+        out.append(_WORD_ALPHABET[r])
+        if not i:
+            return "".join(out)
+
+
+def common_passwords_file(work_dir: Path, size: int) -> Path:
+    path = work_dir / f"common-{size}.txt"
+    if not path.exists():
+        work_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for start in range(0, size, 65536):
+                stop = min(size, start + 65536)
+                f.write("\n".join(common_word(i) for i in range(start, stop)) + "\n")
+        tmp.replace(path)
+    return path
+
+
+def history_password(i: int) -> str:
+    return f"history-{i}"
+
+
+def history_file(work_dir: Path, size: int) -> Path:
+    path = work_dir / f"history-{size}.bin"
+    if not path.exists():
+        work_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_HISTORY_MAGIC)
+            for start in range(0, size, 65536):
+                stop = min(size, start + 65536)
+                f.write(
+                    b"".join(
+                        bytes.fromhex(_digest_password(history_password(i), PEPPER))
+                        for i in range(start, stop)
+                    )
+                )
+        tmp.replace(path)
+    return path
+
+
+def query_passwords(count: int, corpus_size: int, hit_ratio: float = 0.1) -> list[str]:
+    rng = random.Random(count * 31 + corpus_size)
+    out: list[str] = []
+    for _ in range(count):
+        if corpus_size and rng.random() < hit_ratio:
+            out.append(common_word(rng.randrange(corpus_size)))
+        else:
+            out.append("".join(rng.choice(_QUERY_ALPHABET) for _ in range(rng.randint(6, 20))))
+    return out
+
+
+def stub_breach_lookup(password: str) -> int:
+    return hashlib.sha1(password.encode("utf-8")).digest()[0] % 3
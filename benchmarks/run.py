@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from benchmarks.corpora import (
+    PEPPER,
+    common_passwords_file,
+    history_file,
+    history_password,
+    query_passwords,
+    stub_breach_lookup,
+)
+from src.analyzer import analyze_password, analyze_passwords
+from src.patterns import is_common_password
+from src.reuse import _digest_password, check_reuse, save_to_history
+
+DEFAULT_SIZES = "1e3,1e4,1e5"
+DEFAULT_WORK_DIR = Path(__file__).resolve().parent / ".cache"
+IMPORT_BUDGET_US = 150_000
+_ROOT = Path(__file__).resolve().parents[1]
+_IMPORT_RUNS = 20
+
+
+def _timed(calls: Iterable[Callable[[], object]]) -> list[int]:
+    latencies: list[int] = []
+    clock = time.perf_counter_ns
+    for call in calls:
+        started = clock()
+        call()
+        latencies.append(clock() - started)
+    return latencies
+
+
+def _bench_common_lookup(work_dir: Path, size: int, ops: int) -> list[int]:
+    path = common_passwords_file(work_dir, size)
+    queries = query_passwords(ops, size)
+    is_common_password("warm-up", path)
+    return _timed(lambda pw=pw: is_common_password(pw, path) for pw in queries)
+
+
+def _bench_reuse_check(work_dir: Path, size: int, ops: int) -> list[int]:
+    path = history_file(work_dir, size)
+    queries = [history_password(i * 7919 % max(size, 1)) for i in range(ops // 2)]
+    queries += query_passwords(ops - len(queries), 0)
+    check_reuse("warm-up", path, PEPPER)
+    return _timed(lambda pw=pw: check_reuse(pw, path, PEPPER) for pw in queries)
+
+
+def _bench_save_history(work_dir: Path, size: int, ops: int) -> list[int]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.bin"
+        shutil.copyfile(history_file(work_dir, size), path)
+        check_reuse("warm-up", path, PEPPER)
+        digests = [_digest_password(f"new-{i}", PEPPER) for i in range(ops)]
+        return _timed(lambda d=d: save_to_history(d, path) for d in digests)
+
+
+def _bench_analyze_password(work_dir: Path, size: int, ops: int) -> list[int]:
+    common = common_passwords_file(work_dir, size)
+    history = history_file(work_dir, min(size, 10**5))
+    queries = query_passwords(ops, size)
+
+    def analyze(pw: str) -> object:
+        return analyze_password(
+            pw,
+            common_passwords_path=common,
+            history_path=history,
+            history_pepper=PEPPER,
+            check_breach=True,
+            save_history=False,
+            breach_lookup=stub_breach_lookup,
+        )
+
+    analyze("warm-up")
+    return _timed(lambda pw=pw: analyze(pw) for pw in queries)
+
+
+def _bench_analyze_passwords(work_dir: Path, size: int, ops: int) -> list[int]:
+    common = common_passwords_file(work_dir, size)
+    history = history_file(work_dir, min(size, 10**5))
+    is_common_password("warm-up", common)
+    check_reuse("warm-up", history, PEPPER)
+    results = analyze_passwords(
+        query_passwords(ops, size),
+        common_passwords_path=common,
+        history_path=history,
+        history_pepper=PEPPER,
+        check_breach=True,
+        save_history=False,
+        breach_lookup=stub_breach_lookup,
+    )
+    latencies: list[int] = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for _ in results:
+        now = clock()
+        latencies.append(now - started)
+        started = now
+    return latencies
+
+
+def _bench_cli_import(work_dir: Path, size: int, ops: int) -> list[int]:
+    env = {**os.environ, "PASSWORD_HISTORY_PATH": str(work_dir / "startup-history.bin")}
+    latencies: list[int] = []
+    for _ in range(min(ops, _IMPORT_RUNS)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.cli"],
+            cwd=_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in proc.stderr.splitlines():
+            if line.startswith("import time:") and line.endswith("| src.cli"):
+                latencies.append(int(line.split("|")[1]) * 1000)
+    return latencies
+
+
+CASES: dict[str, Callable[[Path, int, int], list[int]]] = {
+    "common_lookup": _bench_common_lookup,
+    "reuse_check": _bench_reuse_check,
+    "save_history": _bench_save_history,
+    "analyze_password": _bench_analyze_password,
+    "analyze_passwords": _bench_analyze_passwords,
+    "cli_import": _bench_cli_import,
+}
+
+
+def _percentile(sorted_values: list[int], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index] / 1000
+
+
+def _peak_rss_kib() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _run_case(case: str, work_dir: Path, size: int, ops: int) -> dict[str, Any]:
+    started = time.perf_counter()
+    latencies = CASES[case](work_dir, size, ops)
+    wall = time.perf_counter() - started
+    total = sum(latencies) / 1e9
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / total if total else 0.0,
+        "p50_us": _percentile(latencies, 0.50),
+        "p95_us": _percentile(latencies, 0.95),
+        "p99_us": _percentile(latencies, 0.99),
+        "max_us": latencies[-1] / 1000 if latencies else 0.0,
+        "wall_seconds": wall,
+        "peak_rss_kib": _peak_rss_kib(),
+    }
+
+
+def _prepare(case: str, work_dir: Path, size: int) -> None:
+    if case in {"common_lookup", "analyze_password", "analyze_passwords"}:
+        common_passwords_file(work_dir, size)
+    if case in {"reuse_check", "save_history"}:
+        history_file(work_dir, size)
+    if case in {"analyze_password", "analyze_passwords"}:
+        history_file(work_dir, min(size, 10**5))
+
+
+def run(cases: list[str], sizes: list[int], ops: int, work_dir: Path) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    spawn = multiprocessing.get_context("spawn")
+    for case in cases:
+        for size in sizes:
+            _prepare(case, work_dir, size)
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                result = pool.submit(_run_case, case, work_dir, size, ops).result()
+            key = f"{case}@{size}"
+            results[key] = result
+            print(
+                f"{key:<28} {result['ops_per_sec']:>12.0f} ops/s"
+                f"  p50 {result['p50_us']:>9.1f}us  p95 {result['p95_us']:>9.1f}us"
+                f"  p99 {result['p99_us']:>9.1f}us  rss {result['peak_rss_kib'] / 1024:>7.1f}MiB",
+                flush=True,
+            )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ops": ops,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> int:
+    regressions = 0
+    print()
+    print(f"{'case':<28} {'ops/s':>10} {'baseline':>10} {'change':>8}  {'p99 change':>10}")
+    for key, now in current["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            print(f"{key:<28} {now['ops_per_sec']:>10.0f} {'-':>10}")
+            continue
+        change = now["ops_per_sec"] / before["ops_per_sec"] - 1 if before["ops_per_sec"] else 0.0
+        p99 = now["p99_us"] / before["p99_us"] - 1 if before["p99_us"] else 0.0
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{key:<28} {now['ops_per_sec']:>10.0f} {before['ops_per_sec']:>10.0f}"
+            f" {change:>+8.1%}  {p99:>+10.1%}{flag}"
+        )
+    return 1 if regressions else 0
+
+
+def _parse_sizes(text: str) -> list[int]:
+    return [int(float(s)) for s in text.split(",") if s.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analyzer hot paths")
+    parser.add_argument(
+        "--cases",
+        default=",".join(CASES),
+        help=f"Comma-separated cases (default: all of {', '.join(CASES)})",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma-separated corpus/history sizes, up to 1e7 (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per case (default: 2000)")
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=DEFAULT_WORK_DIR,
+        help="Where generated corpora and history files are cached",
+    )
+    parser.add_argument("--save", type=Path, metavar="FILE", help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, metavar="FILE", help="Compare against a baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Relative ops/s drop reported as a regression (default: 0.15)",
+    )
+    args = parser.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    if args.ops < 1:
+        parser.error("--ops must be >= 1")
+
+    current = run(cases, _parse_sizes(args.sizes), args.ops, args.work_dir)
+    if args.save is not None:
+        args.save.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+    status = 0
+    for key, result in current["results"].items():
+        if key.startswith("cli_import@") and result["p50_us"] > IMPORT_BUDGET_US:
+            print(f"{key} p50 {result['p50_us']:.0f}us exceeds {IMPORT_BUDGET_US}us budget")
+            status = 1
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        status = max(status, compare(current, baseline, args.threshold))
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,5 @@
-import { analyzePassword, clearLocalHistory, loadCommonPasswords } from "./modules/analyzer.js";
+import { AnalysisClient } from "./modules/analysis-client.js";
+import { HISTORY_STORAGE_KEY, clearLocalHistory } from "./modules/analyzer.js";
 import { generatePassword } from "./modules/generator.js";
 import {
   aesGcmDecrypt,
@@ -191,26 +192,13 @@ function installAutoGrowTextareas() {
   }
 }
 
-let commonSet = null;
-let wordSet = null;
-let customWordSet = new Set();
+let analysisClient = null;
 let lastGenerated = "";
 let lastAnalysis = null;
+let lastRenderedId = 0;
+let previewTimer = null;
 
-async function loadWords(url) {
-  const resp = await fetch(url);
-  if (!resp.ok) {
-    throw new Error("Failed to load words");
-  }
-  const text = await resp.text();
-  const set = new Set();
-  for (const line of text.split(/\r?\n/)) {
-    const w = line.trim().toLowerCase();
-    if (!w || w.startsWith("#")) continue;
-    set.add(w);
-  }
-  return set;
-}
+const PREVIEW_DEBOUNCE_MS = 60;
 
 async function readTextFile(file) {
   return new Promise((resolve, reject) => {
@@ -221,21 +209,9 @@ async function readTextFile(file) {
   });
 }
 
-async function loadUploadedWordlist(file) {
-  const text = await readTextFile(file);
-  const set = new Set();
-  for (const line of text.split(/\r?\n/)) {
-    const w = line.trim().toLowerCase();
-    if (!w || w.startsWith("#")) continue;
-    set.add(w);
-  }
-  return set;
-}
-
-function mergedWordSet(base, custom) {
-  const merged = new Set(base ?? []);
-  for (const w of custom ?? []) merged.add(w);
-  return merged;
+function wordListUrl(lang) {
+  const path = lang === "es" ? "assets/words_es.bin" : lang === "fr" ? "assets/words_fr.bin" : "assets/words_en.bin";
+  return new URL(path, document.baseURI).href;
 }
 
 function parseWeightsJson(text) {
@@ -248,36 +224,75 @@ function parseWeightsJson(text) {
   return parsed;
 }
 
-async function runAnalysis(password, options) {
-  const toggles = {
-    patterns: $("toggle-patterns").checked,
-    dictionary: $("toggle-dictionary").checked,
-    reuse: $("toggle-reuse").checked,
+function analysisOptions() {
+  return {
+    policy: $("policy").value,
+    toggles: {
+      patterns: $("toggle-patterns").checked,
+      dictionary: $("toggle-dictionary").checked,
+      reuse: $("toggle-reuse").checked,
+    },
+    weights: parseWeightsJson($("weights-json").value),
   };
+}
 
-  const policy = $("policy").value;
-  const weights = parseWeightsJson($("weights-json").value);
-
-  const analysis = await analyzePassword(password, {
-    commonSet,
-    wordSet,
-    policy,
-    toggles,
-    weights,
-    pepper: options?.pepper ?? "",
-    saveHistory: true,
-  });
-
-  lastAnalysis = analysis;
-
+function renderAnalysis(analysis, warnings) {
   setText("score", String(analysis.score));
   const tone = analysis.score >= 80 ? "is-good" : analysis.score >= 50 ? "is-warn" : "is-bad";
   setPill("label", analysis.label, tone);
   setText("entropy", analysis.entropyBits.toFixed(1));
   setText("shannon", (analysis.shannonEntropyBits ?? 0).toFixed(1));
-  setText("reuse", analysis.isReused ? "reused" : "not seen");
   setMeter(analysis.score);
-  renderReasons(analysis.reasons);
+  renderReasons([...analysis.reasons, ...(warnings ?? [])]);
+}
+
+function renderLatency() {
+  if (!$maybe("debug-panel")) return;
+  const stats = analysisClient.latency();
+  setText("debug-mode", stats.mode);
+  setText("debug-last", stats.lastMs.toFixed(1));
+  setText("debug-worker", stats.workerMs.toFixed(1));
+  setText("debug-p50", stats.p50Ms.toFixed(1));
+  setText("debug-p95", stats.p95Ms.toFixed(1));
+  setText("debug-cancelled", `${stats.cancelled} of ${stats.count + stats.cancelled}`);
+}
+
+function acceptResponse(response) {
+  renderLatency();
+  if (response.type !== "result" || response.id <= lastRenderedId) return false;
+  lastRenderedId = response.id;
+  return true;
+}
+
+async function runAnalysis(password, options) {
+  clearTimeout(previewTimer);
+  const response = await analysisClient.analyze(
+    password,
+    { ...analysisOptions(), pepper: options?.pepper ?? "", saveHistory: true },
+    { history: localStorage.getItem(HISTORY_STORAGE_KEY) },
+  );
+  if (response.history !== undefined) {
+    localStorage.setItem(HISTORY_STORAGE_KEY, response.history);
+  }
+  if (!acceptResponse(response)) return;
+
+  lastAnalysis = response.analysis;
+  renderAnalysis(response.analysis, response.warnings);
+  setText("reuse", response.analysis.isReused ? "reused" : "not seen");
+}
+
+async function previewAnalysis(password) {
+  const response = await analysisClient.analyze(password, analysisOptions(), { live: true });
+  if (!acceptResponse(response)) return;
+  renderAnalysis(response.analysis, response.warnings);
+  setText("reuse", "—");
+}
+
+function schedulePreview(password) {
+  clearTimeout(previewTimer);
+  previewTimer = setTimeout(() => {
+    previewAnalysis(password).catch((e) => renderReasons([String(e?.message ?? e)]));
+  }, PREVIEW_DEBOUNCE_MS);
 }
 
 function handleNav() {
@@ -293,6 +308,7 @@ function handleStrength() {
   if (!$maybe("pwd")) return;
   const pwd = $("pwd");
   const pepper = $("pepper");
+  analysisClient = new AnalysisClient();
 
   if ($maybe("reasons")) {
     renderReasons(null);
@@ -314,8 +330,7 @@ function handleStrength() {
     const file = input.files && input.files.length > 0 ? input.files[0] : null;
     if (!file) return;
     try {
-      customWordSet = await loadUploadedWordlist(file);
-      wordSet = mergedWordSet(wordSet, customWordSet);
+      await analysisClient.setCustomWords(await readTextFile(file));
     } catch (e) {
       renderReasons([String(e?.message ?? e)]);
     }
@@ -324,15 +339,8 @@ function handleStrength() {
   const dictLang = $maybe("dict-lang");
   if (dictLang) {
     dictLang.addEventListener("change", async () => {
-      const lang = String(dictLang.value || "en");
-      const url = lang === "es" ? "assets/words_es.txt" : lang === "fr" ? "assets/words_fr.txt" : "assets/words_en.txt";
-      try {
-        const base = await loadWords(url);
-        wordSet = mergedWordSet(base, customWordSet);
-      } catch (e) {
-        wordSet = mergedWordSet(new Set(), customWordSet);
-        renderReasons([String(e?.message ?? e)]);
-      }
+      await analysisClient.setWordList(wordListUrl(String(dictLang.value || "en")));
+      if (pwd.value) schedulePreview(pwd.value);
     });
   }
 
@@ -358,6 +366,8 @@ function handleStrength() {
     });
   }
 
+  pwd.addEventListener("input", () => schedulePreview(pwd.value));
+
   pwd.addEventListener("keydown", async (ev) => {
     if (ev.key !== "Enter") return;
     await runAnalysis(pwd.value, { pepper: pepper.value });
@@ -571,16 +581,9 @@ async function init() {
   handleAesGcmPage();
   handleBase64Page();
 
-  try {
-    commonSet = await loadCommonPasswords("assets/common_passwords.txt");
-  } catch {
-    commonSet = new Set();
-  }
-
-  try {
-    wordSet = await loadWords("assets/words_en.txt");
-  } catch {
-    wordSet = new Set();
+  if (analysisClient) {
+    await analysisClient.setCommonList(new URL("assets/common_passwords.bin", document.baseURI).href);
+    await analysisClient.setWordList(wordListUrl(String($maybe("dict-lang")?.value || "en")));
   }
 }
 
@@ -0,0 +1,125 @@
+import { AnalysisEngine } from "./analysis-engine.js";
+
+const LATENCY_WINDOW = 200;
+
+function percentile(sorted, q) {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+}
+
+export class AnalysisClient {
+  constructor(options) {
+    this.nextId = 1;
+    this.pending = new Map();
+    this.roundTrips = [];
+    this.lastRoundTripMs = 0;
+    this.lastWorkerMs = 0;
+    this.cancelled = 0;
+    this.worker = null;
+    this.engine = null;
+
+    const WorkerCtor = options?.Worker ?? globalThis.Worker;
+    if (WorkerCtor && options?.inline !== true) {
+      try {
+        this.worker = new WorkerCtor(new URL("./analysis-worker.js", import.meta.url), { type: "module" });
+        this.worker.addEventListener("message", (ev) => this.settle(ev.data));
+        this.worker.addEventListener("error", () => this.fallBackInline());
+      } catch {
+        this.worker = null;
+      }
+    }
+    if (!this.worker) {
+      this.engine = new AnalysisEngine();
+    }
+  }
+
+  get mode() {
+    return this.worker ? "worker" : "inline";
+  }
+
+  fallBackInline() {
+    if (this.worker) {
+      this.worker.terminate();
+      this.worker = null;
+    }
+    this.engine = new AnalysisEngine();
+    for (const [id, entry] of this.pending) {
+      this.pending.delete(id);
+      this.engine.handle(entry.message).then((response) => this.finish(entry, response));
+    }
+  }
+
+  settle(response) {
+    const entry = this.pending.get(response.id);
+    if (!entry) return;
+    this.pending.delete(response.id);
+    this.finish(entry, response);
+  }
+
+  finish(entry, response) {
+    const roundTripMs = performance.now() - entry.started;
+    if (response.type === "cancelled") {
+      this.cancelled += 1;
+    } else if (response.type === "result") {
+      this.lastRoundTripMs = roundTripMs;
+      this.lastWorkerMs = response.elapsedMs;
+      this.roundTrips.push(roundTripMs);
+      if (this.roundTrips.length > LATENCY_WINDOW) this.roundTrips.shift();
+    }
+    if (response.type === "error") {
+      entry.reject(new Error(response.message));
+    } else {
+      entry.resolve({ ...response, roundTripMs });
+    }
+  }
+
+  request(message) {
+    const id = this.nextId;
+    this.nextId += 1;
+    const full = { ...message, id };
+    return new Promise((resolve, reject) => {
+      const entry = { message: full, started: performance.now(), resolve, reject };
+      if (this.worker) {
+        this.pending.set(id, entry);
+        this.worker.postMessage(full);
+      } else {
+        this.engine.handle(full).then((response) => this.finish(entry, response));
+      }
+    });
+  }
+
+  setCommonList(url) {
+    return this.request({ type: "common-list", url });
+  }
+
+  setWordList(url) {
+    return this.request({ type: "word-list", url });
+  }
+
+  setCustomWords(text) {
+    return this.request({ type: "custom-words", text });
+  }
+
+  analyze(password, options, extra) {
+    return this.request({
+      type: "analyze",
+      password,
+      options,
+      live: Boolean(extra?.live),
+      history: extra?.history ?? null,
+    });
+  }
+
+  latency() {
+    const sorted = [...this.roundTrips].sort((a, b) => a - b);
+    return {
+      mode: this.mode,
+      count: sorted.length,
+      lastMs: this.lastRoundTripMs,
+      workerMs: this.lastWorkerMs,
+      p50Ms: percentile(sorted, 0.5),
+      p95Ms: percentile(sorted, 0.95),
+      cancelled: this.cancelled,
+    };
+  }
+}
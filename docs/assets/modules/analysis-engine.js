@@ -0,0 +1,135 @@
+import { IncrementalAnalyzer, analyzePassword, buildWordMatcher, parseWordlist } from "./analyzer.js";
+import { WordlistUnion, readWordlist } from "./wordlist.js";
+
+const EMPTY = new Set();
+
+async function fetchBuffer(url) {
+  const resp = await fetch(url);
+  if (!resp.ok) {
+    throw new Error(`Failed to load ${url}`);
+  }
+  return resp.arrayBuffer();
+}
+
+function historyStorage(raw) {
+  const state = { value: raw ?? null, written: false };
+  return {
+    state,
+    getItem() {
+      return state.value;
+    },
+    setItem(_key, value) {
+      state.value = String(value);
+      state.written = true;
+    },
+    removeItem() {
+      state.value = null;
+      state.written = true;
+    },
+  };
+}
+
+function yieldToQueuedMessages() {
+  return new Promise((resolve) => setTimeout(resolve, 0));
+}
+
+export class AnalysisEngine {
+  constructor(options) {
+    this.fetchBuffer = options?.fetchBuffer ?? fetchBuffer;
+    this.crypto = options?.crypto ?? globalThis.crypto;
+    this.lists = new Map();
+    this.failed = new Map();
+    this.commonUrl = null;
+    this.wordUrl = null;
+    this.customWords = EMPTY;
+    this.union = null;
+    this.live = new IncrementalAnalyzer();
+    this.latestLive = 0;
+  }
+
+  list(url) {
+    if (!url) return Promise.resolve(EMPTY);
+    let pending = this.lists.get(url);
+    if (!pending) {
+      pending = this.fetchBuffer(url)
+        .then(readWordlist)
+        .catch((e) => {
+          this.failed.set(url, String(e?.message ?? e));
+          return EMPTY;
+        });
+      this.lists.set(url, pending);
+    }
+    return pending;
+  }
+
+  wordSetFor(base) {
+    if (this.customWords.size === 0) return base;
+    if (base.size === 0) return this.customWords;
+    if (this.union?.base !== base || this.union?.custom !== this.customWords) {
+      this.union = { base, custom: this.customWords, value: new WordlistUnion([base, this.customWords]) };
+    }
+    return this.union.value;
+  }
+
+  async analyze(message) {
+    if (message.live) {
+      this.latestLive = message.id;
+      await yieldToQueuedMessages();
+      if (message.id !== this.latestLive) {
+        return { type: "cancelled", id: message.id };
+      }
+    }
+
+    const toggles = message.options?.toggles;
+    const commonUrl = toggles?.patterns === false ? null : this.commonUrl;
+    const wordUrl = toggles?.dictionary === false ? null : this.wordUrl;
+    const [commonSet, base] = await Promise.all([this.list(commonUrl), this.list(wordUrl)]);
+    const warnings = [commonUrl, wordUrl].filter((url) => this.failed.has(url)).map((url) => this.failed.get(url));
+
+    const started = performance.now();
+    const options = { ...message.options, commonSet, wordSet: this.wordSetFor(base) };
+    if (message.live) {
+      this.live.update(message.password);
+      const analysis = this.live.result(options);
+      return { type: "result", id: message.id, analysis, warnings, elapsedMs: performance.now() - started };
+    }
+
+    const storage = historyStorage(message.history);
+    const analysis = await analyzePassword(message.password, {
+      ...options,
+      storage,
+      crypto: this.crypto,
+    });
+    return {
+      type: "result",
+      id: message.id,
+      analysis,
+      warnings,
+      history: storage.state.written ? storage.state.value : undefined,
+      elapsedMs: performance.now() - started,
+    };
+  }
+
+  async handle(message) {
+    try {
+      switch (message.type) {
+        case "analyze":
+          return await this.analyze(message);
+        case "common-list":
+          this.commonUrl = message.url ?? null;
+          return { type: "ok", id: message.id };
+        case "word-list":
+          this.wordUrl = message.url ?? null;
+          return { type: "ok", id: message.id };
+        case "custom-words":
+          this.customWords = parseWordlist(message.text ?? "");
+          buildWordMatcher(this.customWords);
+          return { type: "ok", id: message.id, size: this.customWords.size };
+        default:
+          throw new Error(`Unknown message type: ${message.type}`);
+      }
+    } catch (e) {
+      return { type: "error", id: message.id, message: String(e?.message ?? e) };
+    }
+  }
+}
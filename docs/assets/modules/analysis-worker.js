@@ -0,0 +1,7 @@
+import { AnalysisEngine } from "./analysis-engine.js";
+
+const engine = new AnalysisEngine();
+
+self.addEventListener("message", async (ev) => {
+  self.postMessage(await engine.handle(ev.data));
+});
@@ -36,30 +36,37 @@ function buildKeyboardAdjacency() {
 
 const KEYBOARD_ADJ = buildKeyboardAdjacency();
 
-export function estimateCharsetSize(password) {
-  const hasLower = [...password].some((c) => c >= "a" && c <= "z");
-  const hasUpper = [...password].some((c) => c >= "A" && c <= "Z");
-  const hasDigit = [...password].some((c) => c >= "0" && c <= "9");
-  const punctuation = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~";
-  const hasSymbol = [...password].some((c) => punctuation.includes(c));
-  const hasOther = [...password].some(
-    (c) =>
-      !(c >= "a" && c <= "z") &&
-      !(c >= "A" && c <= "Z") &&
-      !(c >= "0" && c <= "9") &&
-      !punctuation.includes(c),
-  );
+const PUNCTUATION = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~";
+const CLASS_LOWER = 1;
+const CLASS_UPPER = 2;
+const CLASS_DIGIT = 4;
+const CLASS_SYMBOL = 8;
+const CLASS_OTHER = 16;
+
+function charClass(c) {
+  if (c >= "a" && c <= "z") return CLASS_LOWER;
+  if (c >= "A" && c <= "Z") return CLASS_UPPER;
+  if (c >= "0" && c <= "9") return CLASS_DIGIT;
+  if (PUNCTUATION.includes(c)) return CLASS_SYMBOL;
+  return CLASS_OTHER;
+}
 
+function charsetSizeForClasses(classes) {
   let size = 0;
-  if (hasLower) size += 26;
-  if (hasUpper) size += 26;
-  if (hasDigit) size += 10;
-  if (hasSymbol) size += punctuation.length;
-  if (hasOther) size += 32;
-
+  if (classes & CLASS_LOWER) size += 26;
+  if (classes & CLASS_UPPER) size += 26;
+  if (classes & CLASS_DIGIT) size += 10;
+  if (classes & CLASS_SYMBOL) size += PUNCTUATION.length;
+  if (classes & CLASS_OTHER) size += 32;
   return Math.max(size, 1);
 }
 
+export function estimateCharsetSize(password) {
+  let classes = 0;
+  for (const c of password) classes |= charClass(c);
+  return charsetSizeForClasses(classes);
+}
+
 export function estimateEntropyBits(password) {
   if (!password) return 0;
   const charset = estimateCharsetSize(password);
@@ -138,28 +145,104 @@ export function isCommonPassword(password, commonSet) {
   return commonSet.has(p);
 }
 
-export function detectPatterns(password, commonSet) {
+export function detectPatterns(password, commonSet, features) {
   const hits = [];
-  if (hasRepeatedRun(password)) hits.push({ name: "repeated_chars", detail: "Contains repeated character runs" });
-  if (hasSimpleSequence(password)) hits.push({ name: "sequence", detail: "Contains simple sequential characters" });
-  if (hasKeyboardWalk(password)) hits.push({ name: "keyboard_walk", detail: "Contains keyboard-walk patterns" });
+  const repeated = features ? features.hasRepeatedRun : hasRepeatedRun(password);
+  const sequence = features ? features.hasSequence : hasSimpleSequence(password);
+  const keyboardWalk = features ? features.hasKeyboardWalk : hasKeyboardWalk(password);
+  if (repeated) hits.push({ name: "repeated_chars", detail: "Contains repeated character runs" });
+  if (sequence) hits.push({ name: "sequence", detail: "Contains simple sequential characters" });
+  if (keyboardWalk) hits.push({ name: "keyboard_walk", detail: "Contains keyboard-walk patterns" });
   if (isCommonPassword(password, commonSet)) hits.push({ name: "common_password", detail: "Matches a common password" });
   return hits;
 }
 
+export class WordMatcher {
+  constructor(words, minLength = 4) {
+    this.goto = [new Map()];
+    this.out = [[]];
+    this.fail = [0];
+    this.size = 0;
+
+    for (const w of words ?? []) {
+      if (typeof w !== "string") continue;
+      const word = w.trim().toLowerCase();
+      if (word.length < minLength || word.startsWith("#")) continue;
+      let node = 0;
+      for (const c of word) {
+        let next = this.goto[node].get(c);
+        if (next === undefined) {
+          next = this.goto.length;
+          this.goto[node].set(c, next);
+          this.goto.push(new Map());
+          this.out.push([]);
+        }
+        node = next;
+      }
+      if (this.out[node].length === 0) {
+        this.out[node] = [word];
+        this.size += 1;
+      }
+    }
+
+    this.fail = new Array(this.goto.length).fill(0);
+    const queue = [...this.goto[0].values()];
+    for (let i = 0; i < queue.length; i += 1) {
+      const node = queue[i];
+      for (const [c, child] of this.goto[node]) {
+        queue.push(child);
+        let f = this.fail[node];
+        while (f && !this.goto[f].has(c)) f = this.fail[f];
+        this.fail[child] = this.goto[f].get(c) ?? 0;
+        this.out[child] = this.out[child].concat(this.out[this.fail[child]]);
+      }
+    }
+  }
+
+  findAll(text, limit = Infinity) {
+    const found = new Set();
+    let node = 0;
+    for (const c of text.toLowerCase()) {
+      while (node && !this.goto[node].has(c)) node = this.fail[node];
+      node = this.goto[node].get(c) ?? 0;
+      for (const word of this.out[node]) {
+        found.add(word);
+        if (found.size >= limit) return [...found];
+      }
+    }
+    return [...found];
+  }
+
+  matches(text) {
+    const out = [];
+    let node = 0;
+    let end = 0;
+    for (const c of text.toLowerCase()) {
+      end += c.length;
+      while (node && !this.goto[node].has(c)) node = this.fail[node];
+      node = this.goto[node].get(c) ?? 0;
+      for (const word of this.out[node]) out.push({ end, length: word.length, word });
+    }
+    return out;
+  }
+}
+
+const matcherCache = new WeakMap();
+
+export function buildWordMatcher(wordSet) {
+  if (wordSet instanceof WordMatcher) return wordSet;
+  let matcher = matcherCache.get(wordSet);
+  if (!matcher) {
+    matcher = new WordMatcher(wordSet);
+    matcherCache.set(wordSet, matcher);
+  }
+  return matcher;
+}
+
 export function detectDictionaryWords(password, wordSet) {
   if (!wordSet) return [];
-  const p = password.toLowerCase();
-  const out = new Set();
-  for (const w of wordSet) {
-    if (typeof w !== "string") continue;
-    const word = w.trim().toLowerCase();
-    if (word.length < 4) continue;
-    if (word.length > p.length) continue;
-    if (p.includes(word)) out.add(word);
-    if (out.size >= 3) break;
-  }
-  return [...out];
+  if (typeof wordSet.findAll === "function") return wordSet.findAll(password, 3);
+  return buildWordMatcher(wordSet).findAll(password, 3);
 }
 
 export function labelForScore(score) {
@@ -260,8 +343,10 @@ export async function sha256HexWithPepper(password, pepper, cryptoProvider) {
   return out;
 }
 
+export const HISTORY_STORAGE_KEY = "psc_history_digests";
+
 function loadDigestSet(storage) {
-  const raw = storage.getItem("psc_history_digests");
+  const raw = storage.getItem(HISTORY_STORAGE_KEY);
   if (!raw) return new Set();
   try {
     const parsed = JSON.parse(raw);
@@ -277,43 +362,55 @@ function loadDigestSet(storage) {
 }
 
 function saveDigestSet(storage, set) {
-  storage.setItem("psc_history_digests", JSON.stringify([...set].sort()));
+  storage.setItem(HISTORY_STORAGE_KEY, JSON.stringify([...set].sort()));
 }
 
 export function clearLocalHistory(storage) {
-  storage.removeItem("psc_history_digests");
+  storage.removeItem(HISTORY_STORAGE_KEY);
 }
 
-export async function analyzePassword(password, options) {
-  const commonSet = options?.commonSet ?? null;
-  const wordSet = options?.wordSet ?? null;
-  const saveHistory = Boolean(options?.saveHistory);
-  const pepper = options?.pepper ?? "";
-  const storage = options?.storage ?? globalThis.localStorage;
-  const cryptoProvider = options?.crypto ?? globalThis.crypto;
+function analysisConfig(options) {
   const policy = policyConfig(options?.policy);
-  const weights = mergedWeights(policy.weights, options?.weights);
-  const toggles = {
-    patterns: options?.toggles?.patterns !== false,
-    dictionary: options?.toggles?.dictionary !== false,
-    reuse: options?.toggles?.reuse !== false,
+  return {
+    commonSet: options?.commonSet ?? null,
+    wordSet: options?.wordSet ?? null,
+    policy,
+    weights: mergedWeights(policy.weights, options?.weights),
+    toggles: {
+      patterns: options?.toggles?.patterns !== false,
+      dictionary: options?.toggles?.dictionary !== false,
+      reuse: options?.toggles?.reuse !== false,
+    },
   };
+}
 
-  const reasons = [];
+function emptyAnalysis() {
+  return {
+    score: 0,
+    label: "weak",
+    entropyBits: 0,
+    reasons: ["Password is empty"],
+    isReused: false,
+  };
+}
 
-  if (!password) {
-    return {
-      score: 0,
-      label: "weak",
-      entropyBits: 0,
-      reasons: ["Password is empty"],
-      isReused: false,
-    };
-  }
+function passwordFeatures(password) {
+  return {
+    length: password.length,
+    entropyBits: estimateEntropyBits(password),
+    shannonEntropyBits: estimateShannonEntropyBits(password),
+    hasRepeatedRun: hasRepeatedRun(password),
+    hasSequence: hasSimpleSequence(password),
+    hasKeyboardWalk: hasKeyboardWalk(password),
+  };
+}
 
+function scoreFeatures(password, features, config) {
+  const { policy, weights, toggles } = config;
+  const reasons = [];
   let score = 0;
 
-  const length = password.length;
+  const length = features.length;
   if (length < 8) {
     reasons.push("Too short (< 8 characters)");
     score -= weights.lengthPenaltyShort;
@@ -325,8 +422,8 @@ export async function analyzePassword(password, options) {
     score += weights.lengthBonusGood;
   }
 
-  const entropy = estimateEntropyBits(password);
-  const shannonEntropy = estimateShannonEntropyBits(password);
+  const entropy = features.entropyBits;
+  const shannonEntropy = features.shannonEntropyBits;
   if (entropy < policy.entropyThresholds.low) {
     reasons.push(`Low estimated entropy (${entropy.toFixed(1)} bits)`);
     score -= weights.entropyPenaltyLow;
@@ -344,7 +441,7 @@ export async function analyzePassword(password, options) {
   }
 
   if (toggles.patterns) {
-    const hits = detectPatterns(password, commonSet);
+    const hits = detectPatterns(password, config.commonSet, features);
     for (const hit of hits) {
       reasons.push(`Pattern detected: ${hit.detail}`);
     }
@@ -355,22 +452,52 @@ export async function analyzePassword(password, options) {
   }
 
   if (toggles.dictionary) {
-    const words = detectDictionaryWords(password, wordSet);
+    const words = detectDictionaryWords(password, config.wordSet);
     if (words.length > 0) {
       reasons.push(`Dictionary word detected: ${words.join(", ")}`);
       score -= weights.dictionaryPenalty;
     }
   }
 
+  return { score, reasons };
+}
+
+function finishAnalysis(features, score, reasons, isReused, digestHex) {
+  const finalScore = Math.max(0, Math.min(100, score + 50));
+  return {
+    score: finalScore,
+    label: labelForScore(finalScore),
+    entropyBits: features.entropyBits,
+    shannonEntropyBits: features.shannonEntropyBits,
+    reasons,
+    isReused,
+    digestHex,
+  };
+}
+
+export async function analyzePassword(password, options) {
+  const saveHistory = Boolean(options?.saveHistory);
+  const pepper = options?.pepper ?? "";
+  const storage = options?.storage ?? globalThis.localStorage;
+  const cryptoProvider = options?.crypto ?? globalThis.crypto;
+  const config = analysisConfig(options);
+
+  if (!password) {
+    return emptyAnalysis();
+  }
+
+  const features = passwordFeatures(password);
+  let { score, reasons } = scoreFeatures(password, features, config);
+
   let isReused = false;
   let digestHex = null;
-  if (toggles.reuse && pepper && storage && cryptoProvider?.subtle) {
+  if (config.toggles.reuse && pepper && storage && cryptoProvider?.subtle) {
     digestHex = await sha256HexWithPepper(password, pepper, cryptoProvider);
     const digests = loadDigestSet(storage);
     isReused = digests.has(digestHex);
     if (isReused) {
       reasons.push("Password appears to be reused (seen in local history)");
-      score -= weights.reusePenalty;
+      score -= config.weights.reusePenalty;
     }
     if (saveHistory) {
       digests.add(digestHex);
@@ -378,24 +505,141 @@ export async function analyzePassword(password, options) {
     }
   }
 
-  const finalScore = Math.max(0, Math.min(100, score + 50));
-  return {
-    score: finalScore,
-    label: labelForScore(finalScore),
-    entropyBits: entropy,
-    shannonEntropyBits: shannonEntropy,
-    reasons,
-    isReused,
-    digestHex,
-  };
+  return finishAnalysis(features, score, reasons, isReused, digestHex);
 }
 
-export async function loadCommonPasswords(url) {
-  const resp = await fetch(url);
-  if (!resp.ok) {
-    throw new Error("Failed to load common passwords");
+const FINAL_SIGMA = "\u03a3";
+
+export class IncrementalAnalyzer {
+  constructor(password = "") {
+    this.chars = [];
+    this.counts = new Map();
+    this.saved = [];
+    this.length = 0;
+    this.classes = 0;
+    this.repeat = 0;
+    this.longestRepeat = 0;
+    this.prevLower = -1;
+    this.up = 1;
+    this.down = 1;
+    this.kb = 1;
+    this.longestSeq = 0;
+    this.longestKb = 0;
+    this.sigmas = 0;
+    for (const c of password) this.push(c);
   }
-  const text = await resp.text();
+
+  get password() {
+    return this.chars.join("");
+  }
+
+  push(c) {
+    if (typeof c !== "string" || [...c].length !== 1) {
+      throw new TypeError("push() takes a single character");
+    }
+    this.saved.push([
+      this.classes,
+      this.repeat,
+      this.longestRepeat,
+      this.prevLower,
+      this.up,
+      this.down,
+      this.kb,
+      this.longestSeq,
+      this.longestKb,
+    ]);
+
+    this.classes |= charClass(c);
+    this.counts.set(c, (this.counts.get(c) ?? 0) + 1);
+    this.repeat = this.chars[this.chars.length - 1] === c ? this.repeat + 1 : 1;
+    this.longestRepeat = Math.max(this.longestRepeat, this.repeat);
+
+    const lower = c.toLowerCase();
+    for (let i = 0; i < lower.length; i += 1) {
+      const code = lower.charCodeAt(i);
+      if (this.prevLower >= 0) {
+        const diff = code - this.prevLower;
+        this.up = diff === 1 ? this.up + 1 : 1;
+        this.down = diff === -1 ? this.down + 1 : 1;
+        const neigh = KEYBOARD_ADJ.get(String.fromCharCode(this.prevLower));
+        this.kb = neigh && neigh.has(lower[i]) ? this.kb + 1 : 1;
+        this.longestSeq = Math.max(this.longestSeq, this.up, this.down);
+        this.longestKb = Math.max(this.longestKb, this.kb);
+      }
+      this.prevLower = code;
+    }
+
+    if (c === FINAL_SIGMA) this.sigmas += 1;
+    this.length += c.length;
+    this.chars.push(c);
+  }
+
+  pop() {
+    if (this.chars.length === 0) {
+      throw new RangeError("pop from an empty password");
+    }
+    const c = this.chars.pop();
+    const count = this.counts.get(c) - 1;
+    if (count) this.counts.set(c, count);
+    else this.counts.delete(c);
+    if (c === FINAL_SIGMA) this.sigmas -= 1;
+    this.length -= c.length;
+    [
+      this.classes,
+      this.repeat,
+      this.longestRepeat,
+      this.prevLower,
+      this.up,
+      this.down,
+      this.kb,
+      this.longestSeq,
+      this.longestKb,
+    ] = this.saved.pop();
+    return c;
+  }
+
+  update(value) {
+    const chars = [...value];
+    let keep = 0;
+    while (keep < chars.length && keep < this.chars.length && chars[keep] === this.chars[keep]) keep += 1;
+    while (this.chars.length > keep) this.pop();
+    for (let i = keep; i < chars.length; i += 1) this.push(chars[i]);
+  }
+
+  features() {
+    const n = this.length;
+    let shannon = 0;
+    if (n) {
+      let h = 0;
+      for (const count of this.counts.values()) {
+        const p = count / n;
+        h -= p * Math.log2(p);
+      }
+      shannon = h * n;
+    }
+    const rescan = this.sigmas > 0 ? this.password : null;
+    return {
+      length: n,
+      entropyBits: n ? n * Math.log2(charsetSizeForClasses(this.classes)) : 0,
+      shannonEntropyBits: shannon,
+      hasRepeatedRun: this.longestRepeat >= 4,
+      hasSequence: rescan === null ? this.longestSeq >= 4 : hasSimpleSequence(rescan),
+      hasKeyboardWalk: rescan === null ? this.longestKb >= 4 : hasKeyboardWalk(rescan),
+    };
+  }
+
+  result(options) {
+    if (this.chars.length === 0) {
+      return emptyAnalysis();
+    }
+    const password = this.password;
+    const features = this.features();
+    const { score, reasons } = scoreFeatures(password, features, analysisConfig(options));
+    return finishAnalysis(features, score, reasons, false, null);
+  }
+}
+
+export function parseWordlist(text) {
   const set = new Set();
   for (const line of text.split(/\r?\n/)) {
     const w = line.trim().toLowerCase();
@@ -404,3 +648,11 @@ export async function loadCommonPasswords(url) {
   }
   return set;
 }
+
+export async function loadCommonPasswords(url) {
+  const resp = await fetch(url);
+  if (!resp.ok) {
+    throw new Error("Failed to load common passwords");
+  }
+  return parseWordlist(await resp.text());
+}
@@ -0,0 +1,199 @@
+import { buildWordMatcher, parseWordlist } from "./analyzer.js";
+
+const MAGIC = [0x50, 0x53, 0x43, 0x57];
+export const WORDLIST_VERSION = 1;
+
+const encoder = new TextEncoder();
+const decoder = new TextDecoder();
+
+function utf8Length(c) {
+  const cp = c.codePointAt(0);
+  if (cp < 0x80) return 1;
+  if (cp < 0x800) return 2;
+  if (cp < 0x10000) return 3;
+  return 4;
+}
+
+export function isCompiledWordlist(buffer) {
+  if (buffer.byteLength < MAGIC.length) return false;
+  const head = new Uint8Array(buffer, 0, MAGIC.length);
+  return MAGIC.every((b, i) => head[i] === b);
+}
+
+export function firstDistinctWords(matches, limit = Infinity) {
+  const ordered = [...matches].sort((a, b) => a.end - b.end || b.length - a.length);
+  const found = new Set();
+  for (const m of ordered) {
+    found.add(m.word);
+    if (found.size >= limit) break;
+  }
+  return [...found];
+}
+
+export class CompiledWordlist {
+  constructor(buffer, section = 0) {
+    if (!isCompiledWordlist(buffer)) {
+      throw new Error("Not a compiled wordlist");
+    }
+    const view = new DataView(buffer);
+    const version = view.getUint16(4, true);
+    if (version !== WORDLIST_VERSION) {
+      throw new Error(`Unsupported compiled wordlist version ${version}`);
+    }
+    if (section >= view.getUint16(6, true)) {
+      throw new Error(`Compiled wordlist has no section ${section}`);
+    }
+    const start = view.getUint32(8 + 4 * section, true);
+    this.view = view;
+    this.size = view.getUint32(start, true);
+    this.blocks = view.getUint32(start + 4, true);
+    this.maxLength = view.getUint32(start + 8, true);
+    this.offsets = start + 12;
+    const dataStart = this.offsets + 4 * (this.blocks + 1);
+    this.data = new Uint8Array(buffer, dataStart, this.blockOffset(this.blocks));
+    this.scratch = new Uint8Array(this.maxLength);
+  }
+
+  blockOffset(block) {
+    return this.view.getUint32(this.offsets + 4 * block, true);
+  }
+
+  varint(pos) {
+    let n = 0;
+    let shift = 0;
+    for (;;) {
+      const b = this.data[pos];
+      pos += 1;
+      n += (b & 0x7f) * 2 ** shift;
+      if (b < 0x80) return [n, pos];
+      shift += 7;
+    }
+  }
+
+  compareHead(block, target, start, end) {
+    const [n, pos] = this.varint(this.blockOffset(block));
+    return compareBytes(this.data, pos, pos + n, target, start, end);
+  }
+
+  *blockWords(block) {
+    const end = this.blockOffset(block + 1);
+    let [n, pos] = this.varint(this.blockOffset(block));
+    const word = this.scratch;
+    word.set(this.data.subarray(pos, pos + n));
+    pos += n;
+    let length = n;
+    yield length;
+    while (pos < end) {
+      let shared;
+      [shared, pos] = this.varint(pos);
+      [n, pos] = this.varint(pos);
+      word.set(this.data.subarray(pos, pos + n), shared);
+      pos += n;
+      length = shared + n;
+      yield length;
+    }
+  }
+
+  seek(target, start, end) {
+    let lo = 0;
+    let hi = this.blocks;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.compareHead(mid, target, start, end) <= 0) lo = mid + 1;
+      else hi = mid;
+    }
+    const block = Math.max(lo - 1, 0);
+    const word = this.scratch;
+    for (let b = block; b < this.blocks && b <= block + 1; b += 1) {
+      for (const length of this.blockWords(b)) {
+        const cmp = compareBytes(word, 0, length, target, start, end);
+        if (cmp < 0) continue;
+        if (cmp === 0) return 2;
+        return startsWith(word, length, target, start, end) ? 1 : 0;
+      }
+    }
+    return 0;
+  }
+
+  has(word) {
+    if (typeof word !== "string" || this.size === 0) return false;
+    const target = encoder.encode(word);
+    if (target.length > this.maxLength) return false;
+    return this.seek(target, 0, target.length) === 2;
+  }
+
+  matches(text, minLength = 4) {
+    const lower = text.toLowerCase();
+    const bytes = encoder.encode(lower);
+    const byteAt = [0];
+    const unitAt = [0];
+    for (const c of lower) {
+      byteAt.push(byteAt[byteAt.length - 1] + utf8Length(c));
+      unitAt.push(unitAt[unitAt.length - 1] + c.length);
+    }
+
+    const out = [];
+    if (this.size === 0) return out;
+    for (let k = 0; k < byteAt.length - 1; k += 1) {
+      for (let e = k + 1; e < byteAt.length; e += 1) {
+        if (byteAt[e] - byteAt[k] > this.maxLength) break;
+        const state = this.seek(bytes, byteAt[k], byteAt[e]);
+        if (state === 0) break;
+        const length = unitAt[e] - unitAt[k];
+        if (state === 2 && length >= minLength) {
+          out.push({ end: unitAt[e], length, word: lower.slice(unitAt[k], unitAt[e]) });
+        }
+      }
+    }
+    return out;
+  }
+
+  findAll(text, limit = Infinity) {
+    return firstDistinctWords(this.matches(text), limit);
+  }
+
+  *[Symbol.iterator]() {
+    for (let b = 0; b < this.blocks; b += 1) {
+      for (const length of this.blockWords(b)) {
+        yield decoder.decode(this.scratch.subarray(0, length));
+      }
+    }
+  }
+}
+
+function compareBytes(a, aStart, aEnd, b, bStart, bEnd) {
+  const n = Math.min(aEnd - aStart, bEnd - bStart);
+  for (let i = 0; i < n; i += 1) {
+    const d = a[aStart + i] - b[bStart + i];
+    if (d !== 0) return d;
+  }
+  return aEnd - aStart - (bEnd - bStart);
+}
+
+function startsWith(word, length, prefix, start, end) {
+  if (length < end - start) return false;
+  return compareBytes(word, 0, end - start, prefix, start, end) === 0;
+}
+
+export class WordlistUnion {
+  constructor(lists) {
+    this.lists = lists;
+    this.matchers = lists.map((list) => (list instanceof CompiledWordlist ? list : buildWordMatcher(list)));
+  }
+
+  has(word) {
+    return this.lists.some((list) => list.has(word));
+  }
+
+  findAll(text, limit = Infinity) {
+    return firstDistinctWords(
+      this.matchers.flatMap((m) => m.matches(text)),
+      limit,
+    );
+  }
+}
+
+export function readWordlist(buffer) {
+  if (isCompiledWordlist(buffer)) return new CompiledWordlist(buffer);
+  return parseWordlist(decoder.decode(buffer));
+}
@@ -1,24 +1,62 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Container, Iterable, Iterator, Sequence
 from dataclasses import dataclass
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from typing import Any
 
-from src.breach import check_pwned_password_k_anonymity
-from src.entropy import estimate_entropy_bits, estimate_shannon_entropy_bits
-from src.patterns import detect_patterns
-from src.reuse import ReuseResult, check_reuse, save_to_history
+from src import metrics
+from src.breach import (
+    BreachLookup,
+    FilteredBreachLookup,
+    check_pwned_password_k_anonymity,
+    check_pwned_passwords_grouped,
+)
+from src.dictionary import WordMatcher, load_word_matcher
+from src.features import IncrementalFeatures, PasswordFeatures, extract_features
+from src.patterns import detect_patterns_with_index, load_common_password_index
+from src.reasons import (
+    PATTERN_REASONS,
+    REASON_ACCEPTABLE_LENGTH,
+    REASON_BREACH_UNAVAILABLE,
+    REASON_BREACHED,
+    REASON_CHECKS_SKIPPED,
+    REASON_EMPTY,
+    REASON_GOOD_LENGTH,
+    REASON_HIGH_ENTROPY,
+    REASON_LOW_ENTROPY,
+    REASON_LOW_SHANNON_ENTROPY,
+    REASON_MODERATE_ENTROPY,
+    REASON_NOT_BREACHED,
+    REASON_REUSED,
+    REASON_TOO_SHORT,
+    render_reasons,
+)
+from src.result_cache import LocalResult, ResultCache
+from src.reuse import _digest_password, check_reuse_in, open_history
+from src.vectorized import extract_features_batch
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Analysis:
     score: int
     label: str
     entropy_bits: float
     shannon_entropy_bits: float
-    reasons: list[str]
+    reason_codes: bytes
+    reason_params: tuple[float | str, ...]
     is_reused: bool
     breach_count: int | None
 
+    @property
+    def reasons(self) -> list[str]:
+        return render_reasons(self.reason_codes, self.reason_params)
+
+
+_BREACH_BATCH_SIZE = 1024
+
 
 def _label(score: int) -> str:
     if score < 40:
@@ -28,96 +66,582 @@ def _label(score: int) -> str:
     return "strong"
 
 
-def analyze_password(
-    password: str,
-    *,
-    common_passwords_path: Path,
-    history_path: Path,
-    history_pepper: str,
-    check_breach: bool,
-    save_history: bool,
-) -> Analysis:
-    reasons: list[str] = []
+_EMPTY_ANALYSIS = Analysis(
+    score=0,
+    label="weak",
+    entropy_bits=0.0,
+    shannon_entropy_bits=0.0,
+    reason_codes=bytes((REASON_EMPTY,)),
+    reason_params=(),
+    is_reused=False,
+    breach_count=None,
+)
 
-    if not password:
-        return Analysis(
-            score=0,
-            label="weak",
-            entropy_bits=0.0,
-            shannon_entropy_bits=0.0,
-            reasons=["Password is empty"],
-            is_reused=False,
-            breach_count=None,
-        )
 
-    score = 0
+def _empty_analysis() -> Analysis:
+    return _EMPTY_ANALYSIS
 
-    length = len(password)
+
+def analysis_payload(analysis: Analysis) -> dict[str, Any]:
+    return {
+        "score": analysis.score,
+        "label": analysis.label,
+        "entropy_bits": analysis.entropy_bits,
+        "shannon_entropy_bits": analysis.shannon_entropy_bits,
+        "is_reused": analysis.is_reused,
+        "breach_count": analysis.breach_count,
+        "reasons": analysis.reasons,
+    }
+
+
+ReuseLookup = Callable[[], bool]
+
+MODES = ("full", "fast")
+
+
+class _Scoring:
+    __slots__ = (
+        "password",
+        "features",
+        "common_index",
+        "dictionary",
+        "is_reused",
+        "breach_lookup",
+        "disabled",
+        "watch",
+        "score",
+        "codes",
+        "params",
+        "reused",
+        "breach_count",
+        "next_stage",
+        "key",
+    )
+
+    def __init__(
+        self,
+        password: str,
+        features: PasswordFeatures,
+        common_index: Container[str],
+        dictionary: WordMatcher | None,
+        is_reused: bool | ReuseLookup,
+        check_breach: bool,
+        breach_lookup: BreachLookup | None,
+    ) -> None:
+        self.password = password
+        self.features = features
+        self.common_index = common_index
+        self.dictionary = dictionary
+        self.is_reused = is_reused
+        self.breach_lookup = breach_lookup
+        self.disabled = frozenset() if check_breach else frozenset({"breach"})
+        self.watch = metrics.stopwatch()
+        self.score = 0
+        self.codes: list[int] = []
+        self.params: list[float | str] = []
+        self.reused = False
+        self.breach_count: int | None = None
+        self.next_stage = 0
+        self.key = ""
+
+
+def _score_length(ctx: _Scoring) -> None:
+    length = ctx.features.length
     if length < 8:
-        reasons.append("Too short (< 8 characters)")
-        score -= 25
+        ctx.codes.append(REASON_TOO_SHORT)
+        ctx.score -= 25
     elif length < 12:
-        reasons.append("Acceptable length (8–11), but longer is better")
-        score += 10
+        ctx.codes.append(REASON_ACCEPTABLE_LENGTH)
+        ctx.score += 10
     else:
-        reasons.append("Good length (>= 12)")
-        score += 25
+        ctx.codes.append(REASON_GOOD_LENGTH)
+        ctx.score += 25
 
-    entropy = estimate_entropy_bits(password)
-    shannon_entropy = estimate_shannon_entropy_bits(password)
+
+def _score_entropy(ctx: _Scoring) -> None:
+    entropy = ctx.features.entropy_bits
+    shannon_entropy = ctx.features.shannon_entropy_bits
     if entropy < 40:
-        reasons.append(f"Low estimated entropy ({entropy:.1f} bits)")
-        score -= 20
+        ctx.codes.append(REASON_LOW_ENTROPY)
+        ctx.params.append(entropy)
+        ctx.score -= 20
     elif entropy < 60:
-        reasons.append(f"Moderate estimated entropy ({entropy:.1f} bits)")
-        score += 10
+        ctx.codes.append(REASON_MODERATE_ENTROPY)
+        ctx.params.append(entropy)
+        ctx.score += 10
     else:
-        reasons.append(f"High estimated entropy ({entropy:.1f} bits)")
-        score += 25
+        ctx.codes.append(REASON_HIGH_ENTROPY)
+        ctx.params.append(entropy)
+        ctx.score += 25
 
     if shannon_entropy < 25:
-        reasons.append(f"Low Shannon entropy signal ({shannon_entropy:.1f} bits)")
-        score -= 10
+        ctx.codes.append(REASON_LOW_SHANNON_ENTROPY)
+        ctx.params.append(shannon_entropy)
+        ctx.score -= 10
+
 
-    hits = detect_patterns(password, common_passwords_path)
+def _score_patterns(ctx: _Scoring) -> None:
+    hits = detect_patterns_with_index(ctx.password, ctx.common_index, ctx.features, ctx.dictionary)
     for hit in hits:
-        reasons.append(f"Pattern detected: {hit.detail}")
+        ctx.codes.append(PATTERN_REASONS[hit.name])
+        if hit.words:
+            ctx.params.append(", ".join(hit.words))
 
     if any(h.name == "common_password" for h in hits):
-        score -= 60
+        ctx.score -= 60
+    if any(h.name == "common_password_variant" for h in hits):
+        ctx.score -= 40
     if any(h.name in {"keyboard_walk", "sequence"} for h in hits):
-        score -= 20
+        ctx.score -= 20
     if any(h.name == "repeated_chars" for h in hits):
-        score -= 10
+        ctx.score -= 10
+    if any(h.name == "dictionary_word" for h in hits):
+        ctx.score -= 20
 
-    reuse: ReuseResult = check_reuse(password, history_path, history_pepper)
-    if reuse.is_reused:
-        reasons.append("Password appears to be reused (seen in local history)")
-        score -= 30
 
-    breach_count: int | None = None
-    if check_breach:
-        breach_count = check_pwned_password_k_anonymity(password)
-        if breach_count is None:
-            reasons.append("Breach check unavailable (network error)")
-        elif breach_count > 0:
-            reasons.append(f"Found in breach corpus ({breach_count} occurrences)")
-            score -= 50
-        else:
-            reasons.append("Not found in breach corpus (k-anonymity check)")
-            score += 5
-
-    score = max(0, min(100, score + 50))
+def _score_reuse(ctx: _Scoring) -> None:
+    ctx.reused = ctx.is_reused() if callable(ctx.is_reused) else ctx.is_reused
+    if ctx.reused:
+        ctx.codes.append(REASON_REUSED)
+        ctx.score -= 30
 
-    if save_history:
-        save_to_history(reuse.digest_hex, history_path)
 
+def _score_breach(ctx: _Scoring) -> None:
+    if ctx.breach_lookup is None:
+        ctx.breach_count = check_pwned_password_k_anonymity(ctx.password)
+    else:
+        ctx.breach_count = ctx.breach_lookup(ctx.password)
+    if ctx.breach_count is None:
+        ctx.codes.append(REASON_BREACH_UNAVAILABLE)
+    elif ctx.breach_count > 0:
+        ctx.codes.append(REASON_BREACHED)
+        ctx.params.append(ctx.breach_count)
+        ctx.score -= 50
+    else:
+        ctx.codes.append(REASON_NOT_BREACHED)
+        ctx.score += 5
+
+
+@dataclass(frozen=True)
+class _Stage:
+    name: str
+    cost: int
+    min_delta: int
+    max_delta: int
+    run: Callable[[_Scoring], None]
+
+
+_STAGES = tuple(
+    sorted(
+        (
+            _Stage("length", cost=1, min_delta=-25, max_delta=25, run=_score_length),
+            _Stage("entropy", cost=1, min_delta=-30, max_delta=25, run=_score_entropy),
+            _Stage("patterns", cost=10, min_delta=-110, max_delta=0, run=_score_patterns),
+            _Stage("reuse_check", cost=100, min_delta=-30, max_delta=0, run=_score_reuse),
+            _Stage("breach", cost=10_000, min_delta=-50, max_delta=5, run=_score_breach),
+        ),
+        key=lambda stage: stage.cost,
+    )
+)
+_REUSE_STAGE = next(i for i, stage in enumerate(_STAGES) if stage.name == "reuse_check")
+_BREACH_STAGE = next(i for i, stage in enumerate(_STAGES) if stage.name == "breach")
+
+
+def _final_score(raw: int) -> int:
+    return max(0, min(100, raw + 50))
+
+
+def _label_is_settled(ctx: _Scoring) -> bool:
+    low = high = ctx.score
+    for stage in _STAGES[ctx.next_stage :]:
+        if stage.name not in ctx.disabled:
+            low += stage.min_delta
+            high += stage.max_delta
+    return _label(_final_score(low)) == _label(_final_score(high))
+
+
+def _advance(ctx: _Scoring, stop: int, mode: str) -> None:
+    while ctx.next_stage < stop:
+        stage = _STAGES[ctx.next_stage]
+        if stage.name in ctx.disabled:
+            ctx.next_stage += 1
+            continue
+        if mode == "fast" and _label_is_settled(ctx):
+            ctx.codes.append(REASON_CHECKS_SKIPPED)
+            ctx.next_stage = len(_STAGES)
+            return
+        ctx.next_stage += 1
+        ctx.watch.restart()
+        stage.run(ctx)
+        ctx.watch.lap(stage.name)
+
+
+def _finish(ctx: _Scoring) -> Analysis:
+    score = _final_score(ctx.score)
     return Analysis(
         score=score,
         label=_label(score),
-        entropy_bits=entropy,
-        shannon_entropy_bits=shannon_entropy,
-        reasons=reasons,
-        is_reused=reuse.is_reused,
-        breach_count=breach_count,
+        entropy_bits=ctx.features.entropy_bits,
+        shannon_entropy_bits=ctx.features.shannon_entropy_bits,
+        reason_codes=bytes(ctx.codes),
+        reason_params=tuple(ctx.params),
+        is_reused=ctx.reused,
+        breach_count=ctx.breach_count,
+    )
+
+
+def _start(
+    password: str,
+    *,
+    common_index: Container[str],
+    is_reused: bool | ReuseLookup,
+    check_breach: bool,
+    breach_lookup: BreachLookup | None,
+    features: PasswordFeatures | None,
+    dictionary: WordMatcher | None,
+    cached: LocalResult | None = None,
+) -> _Scoring:
+    if cached is not None:
+        features = cached.features
+    elif features is None:
+        watch = metrics.stopwatch()
+        features = extract_features(password)
+        watch.lap("features")
+    ctx = _Scoring(
+        password, features, common_index, dictionary, is_reused, check_breach, breach_lookup
+    )
+    if cached is not None:
+        ctx.score = cached.score
+        ctx.codes = list(cached.reason_codes)
+        ctx.params = list(cached.reason_params)
+        ctx.next_stage = cached.next_stage
+    return ctx
+
+
+def _run_local_stages(
+    ctx: _Scoring, mode: str, result_cache: ResultCache | None, scope: int
+) -> None:
+    if ctx.next_stage >= _REUSE_STAGE:
+        return
+    _advance(ctx, _REUSE_STAGE, mode)
+    if result_cache is not None and ctx.next_stage == _REUSE_STAGE:
+        result_cache.put(
+            ctx.key,
+            LocalResult(
+                ctx.features, ctx.score, bytes(ctx.codes), tuple(ctx.params), ctx.next_stage
+            ),
+            scope,
+        )
+
+
+def _cached_breach_lookup(
+    result_cache: ResultCache, key: str, breach_lookup: BreachLookup | None
+) -> BreachLookup:
+    def lookup(password: str) -> int | None:
+        count = result_cache.get_breach(key)
+        if count is None:
+            if breach_lookup is None:
+                count = check_pwned_password_k_anonymity(password)
+            else:
+                count = breach_lookup(password)
+            if count is not None:
+                result_cache.put_breach(key, count)
+        return count
+
+    return lookup
+
+
+def score_password(
+    password: str,
+    *,
+    common_index: Container[str],
+    is_reused: bool | ReuseLookup,
+    check_breach: bool,
+    breach_lookup: BreachLookup | None = None,
+    features: PasswordFeatures | None = None,
+    dictionary: WordMatcher | None = None,
+    mode: str = "full",
+    result_cache: ResultCache | None = None,
+) -> Analysis:
+    if mode not in MODES:
+        raise ValueError(f"Unknown analysis mode: {mode!r}")
+    if not password:
+        return _empty_analysis()
+
+    key = ""
+    scope = 0
+    if result_cache is not None:
+        key = result_cache.key(password)
+        scope = result_cache.scope(common_index, dictionary)
+    ctx = _start(
+        password,
+        common_index=common_index,
+        is_reused=is_reused,
+        check_breach=check_breach,
+        breach_lookup=breach_lookup,
+        features=features,
+        dictionary=dictionary,
+        cached=result_cache.get(key, scope) if result_cache is not None else None,
+    )
+    ctx.key = key
+    _run_local_stages(ctx, mode, result_cache, scope)
+    if result_cache is not None and check_breach:
+        ctx.breach_lookup = _cached_breach_lookup(result_cache, key, breach_lookup)
+    _advance(ctx, len(_STAGES), mode)
+    return _finish(ctx)
+
+
+class IncrementalAnalyzer:
+    def __init__(
+        self,
+        *,
+        common_index: Container[str],
+        dictionary: WordMatcher | None = None,
+        password: str = "",
+    ) -> None:
+        self.common_index = common_index
+        self.dictionary = dictionary
+        self._features = IncrementalFeatures(password)
+
+    @property
+    def password(self) -> str:
+        return self._features.password
+
+    def push(self, char: str) -> None:
+        self._features.push(char)
+
+    def pop(self) -> str:
+        return self._features.pop()
+
+    def result(self) -> Analysis:
+        return score_password(
+            self._features.password,
+            common_index=self.common_index,
+            is_reused=False,
+            check_breach=False,
+            features=self._features.features(),
+            dictionary=self.dictionary,
+        )
+
+
+def analyze_password(
+    password: str,
+    *,
+    common_passwords_path: Path,
+    history_path: Path,
+    history_pepper: str,
+    check_breach: bool,
+    save_history: bool,
+    breach_lookup: BreachLookup | None = None,
+    wordlist_paths: Sequence[Path] = (),
+    mode: str = "full",
+    result_cache: ResultCache | None = None,
+) -> Analysis:
+    if not password:
+        return _empty_analysis()
+
+    history = open_history(history_path)
+    digest = _digest_password(password, history_pepper)
+    analysis = score_password(
+        password,
+        common_index=load_common_password_index(common_passwords_path),
+        is_reused=partial(history.__contains__, digest),
+        check_breach=check_breach,
+        breach_lookup=breach_lookup,
+        dictionary=load_word_matcher(wordlist_paths) if wordlist_paths else None,
+        mode=mode,
+        result_cache=result_cache,
     )
+
+    if save_history:
+        watch = metrics.stopwatch()
+        history.add(digest)
+        watch.lap("history_save")
+
+    return analysis
+
+
+def iter_reuse(
+    passwords: Iterable[str],
+    *,
+    history_path: Path,
+    history_pepper: str,
+    save_history: bool,
+) -> Iterator[tuple[str, bool]]:
+    history = open_history(history_path)
+    for password in passwords:
+        if not password:
+            yield password, False
+            continue
+
+        watch = metrics.stopwatch()
+        reuse = check_reuse_in(password, history, history_pepper)
+        watch.lap("reuse_check")
+        if save_history and not reuse.is_reused:
+            history.add(reuse.digest_hex)
+            watch.lap("history_save")
+
+        yield password, reuse.is_reused
+
+
+def _batch_breach_counts(
+    passwords: Sequence[str], breach_lookup: BreachLookup | None
+) -> list[int | None]:
+    if breach_lookup is None:
+        return check_pwned_passwords_grouped(passwords)
+    if isinstance(breach_lookup, FilteredBreachLookup):
+        candidates = [pw for pw in passwords if breach_lookup.might_contain(pw)]
+        counts = dict(zip(candidates, _batch_breach_counts(candidates, breach_lookup.lookup)))
+        return [counts.get(pw, 0) for pw in passwords]
+    from src.breach_client import PwnedPasswordsClient
+
+    if isinstance(breach_lookup, PwnedPasswordsClient):
+        return check_pwned_passwords_grouped(passwords, fetch_many=breach_lookup.fetch_ranges)
+    return [breach_lookup(pw) for pw in passwords]
+
+
+def score_passwords(
+    pairs: Sequence[tuple[str, bool]],
+    *,
+    common_index: Container[str],
+    check_breach: bool,
+    breach_lookup: BreachLookup | None = None,
+    engine: str = "python",
+    dictionary: WordMatcher | None = None,
+    mode: str = "full",
+    result_cache: ResultCache | None = None,
+) -> list[Analysis]:
+    if mode not in MODES:
+        raise ValueError(f"Unknown analysis mode: {mode!r}")
+
+    keys = [""] * len(pairs)
+    cached: list[LocalResult | None] = [None] * len(pairs)
+    repeated = [False] * len(pairs)
+    scope = 0
+    if result_cache is not None:
+        scope = result_cache.scope(common_index, dictionary)
+        seen: set[str] = set()
+        for i, (password, _) in enumerate(pairs):
+            if not password:
+                continue
+            keys[i] = key = result_cache.key(password)
+            if key in seen:
+                repeated[i] = True
+            else:
+                seen.add(key)
+                cached[i] = result_cache.get(key, scope)
+
+    watch = metrics.stopwatch()
+    computed = [
+        pw for (pw, _), hit, again in zip(pairs, cached, repeated) if hit is None and not again
+    ]
+    features = iter(extract_features_batch(computed, engine=engine))
+    watch.lap("features_batch")
+
+    contexts: list[_Scoring | None] = []
+    for (password, is_reused), hit, again, key in zip(pairs, cached, repeated, keys):
+        f = next(features) if hit is None and not again else None
+        if not password:
+            contexts.append(None)
+            continue
+        if again and result_cache is not None:
+            hit = result_cache.get(key, scope)
+        scoring = _start(
+            password,
+            common_index=common_index,
+            is_reused=is_reused,
+            check_breach=check_breach,
+            breach_lookup=None,
+            features=f,
+            dictionary=dictionary,
+            cached=hit,
+        )
+        scoring.key = key
+        _run_local_stages(scoring, mode, result_cache, scope)
+        _advance(scoring, _BREACH_STAGE, mode)
+        contexts.append(scoring)
+
+    if check_breach:
+        pending = [
+            ctx
+            for ctx in contexts
+            if ctx is not None
+            and ctx.next_stage <= _BREACH_STAGE
+            and not (mode == "fast" and _label_is_settled(ctx))
+        ]
+        keys_by_password = {ctx.password: ctx.key for ctx in pending}
+        known: dict[str, int | None] = {}
+        if result_cache is not None:
+            for password, key in keys_by_password.items():
+                count = result_cache.get_breach(key)
+                if count is not None:
+                    known[password] = count
+        unique = [pw for pw in keys_by_password if pw not in known]
+        watch.restart()
+        fetched = dict(zip(unique, _batch_breach_counts(unique, breach_lookup)))
+        watch.lap("breach_batch")
+        known.update(fetched)
+        if result_cache is not None:
+            for password, count in fetched.items():
+                if count is not None:
+                    result_cache.put_breach(keys_by_password[password], count)
+        for scoring in pending:
+            scoring.breach_lookup = known.__getitem__
+
+    results: list[Analysis] = []
+    for ctx in contexts:
+        if ctx is None:
+            results.append(_empty_analysis())
+            continue
+        _advance(ctx, len(_STAGES), mode)
+        results.append(_finish(ctx))
+    return results
+
+
+def analyze_passwords(
+    passwords: Iterable[str],
+    *,
+    common_passwords_path: Path,
+    history_path: Path,
+    history_pepper: str,
+    check_breach: bool,
+    save_history: bool,
+    breach_lookup: BreachLookup | None = None,
+    engine: str = "python",
+    wordlist_paths: Sequence[Path] = (),
+    mode: str = "full",
+    result_cache: ResultCache | None = None,
+) -> Iterator[Analysis]:
+    common_index = load_common_password_index(common_passwords_path)
+    dictionary = load_word_matcher(wordlist_paths) if wordlist_paths else None
+    pairs = iter_reuse(
+        passwords,
+        history_path=history_path,
+        history_pepper=history_pepper,
+        save_history=save_history,
+    )
+
+    if not check_breach and engine == "python":
+        for password, is_reused in pairs:
+            yield score_password(
+                password,
+                common_index=common_index,
+                is_reused=is_reused,
+                check_breach=False,
+                dictionary=dictionary,
+                mode=mode,
+                result_cache=result_cache,
+            )
+        return
+
+    while chunk := list(islice(pairs, _BREACH_BATCH_SIZE)):
+        yield from score_passwords(
+            chunk,
+            common_index=common_index,
+            check_breach=check_breach,
+            breach_lookup=breach_lookup,
+            engine=engine,
+            dictionary=dictionary,
+            mode=mode,
+            result_cache=result_cache,
+        )
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from src.normalize import canonical_form, variant_key
+
+_MAGIC = b"PSCBLOOM"
+_VERSION = 2
+_HEADER = struct.Struct("<8sHHIQQ")
+
+
+def _probe_seeds(key: bytes) -> tuple[int, int]:
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+def optimal_parameters(capacity: int, fp_rate: float) -> tuple[int, int]:
+    if not 0 < fp_rate < 1:
+        raise ValueError("fp_rate must be between 0 and 1")
+    capacity = max(capacity, 1)
+    bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    __slots__ = ("path", "_bits", "_num_bits", "_num_hashes", "_count", "_mmap", "_file")
+
+    def __init__(self, num_bits: int, num_hashes: int) -> None:
+        if num_bits <= 0 or num_bits % 8:
+            raise ValueError("num_bits must be a positive multiple of 8")
+        self.path: Path | None = None
+        self._bits: bytearray | memoryview = bytearray(num_bits // 8)
+        self._num_bits = num_bits
+        self._num_hashes = num_hashes
+        self._count = 0
+        self._mmap: mmap.mmap | None = None
+        self._file: BinaryIO | None = None
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> BloomFilter:
+        return cls(*optimal_parameters(capacity, fp_rate))
+
+    @classmethod
+    def load(cls, path: Path) -> BloomFilter:
+        bloom = cls.__new__(cls)
+        bloom.path = path
+        bloom._bits = bytearray()
+        bloom._mmap = None
+        bloom._file = f = path.open("rb")
+        try:
+            bloom._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, num_hashes, _, num_bits, count = _HEADER.unpack_from(bloom._mmap)
+        except (ValueError, struct.error):
+            f.close()
+            raise ValueError(f"{path} is not a bloom filter") from None
+        if magic != _MAGIC or len(bloom._mmap) != _HEADER.size + num_bits // 8:
+            bloom.close()
+            raise ValueError(f"{path} is not a bloom filter")
+        if version != _VERSION:
+            bloom.close()
+            raise ValueError(
+                f"{path} uses bloom filter format {version}; rebuild it with build-filter"
+            )
+        bloom._bits = memoryview(bloom._mmap)[_HEADER.size :]
+        bloom._num_bits = num_bits
+        bloom._num_hashes = num_hashes
+        bloom._count = count
+        return bloom
+
+    def __reduce__(self) -> tuple[object, ...]:
+        if self.path is None:
+            state = (self._num_bits, self._num_hashes, self._count, bytes(self._bits))
+            return (_restore_in_memory, state)
+        return (BloomFilter.load, (self.path,))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, bytes):
+            return False
+        h1, h2 = _probe_seeds(key)
+        bits = self._bits
+        m = self._num_bits
+        for i in range(self._num_hashes):
+            pos = (h1 + i * h2) % m
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def num_bits(self) -> int:
+        return self._num_bits
+
+    @property
+    def num_hashes(self) -> int:
+        return self._num_hashes
+
+    def add(self, key: bytes) -> None:
+        if not isinstance(self._bits, bytearray):
+            raise TypeError("Bloom filters loaded from disk are read-only")
+        h1, h2 = _probe_seeds(key)
+        bits = self._bits
+        m = self._num_bits
+        for i in range(self._num_hashes):
+            pos = (h1 + i * h2) % m
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def update(self, keys: Iterable[bytes]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(
+                _HEADER.pack(_MAGIC, _VERSION, self._num_hashes, 0, self._num_bits, self._count)
+            )
+            f.write(self._bits)
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        if isinstance(self._bits, memoryview):
+            self._bits.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _restore_in_memory(num_bits: int, num_hashes: int, count: int, bits: bytes) -> BloomFilter:
+    bloom = BloomFilter(num_bits, num_hashes)
+    bloom._bits[:] = bits
+    bloom._count = count
+    return bloom
+
+
+def _count_and_build(
+    keys: Callable[[], Iterator[bytes]], fp_rate: float
+) -> BloomFilter:
+    capacity = sum(1 for _ in keys())
+    bloom = BloomFilter.for_capacity(capacity, fp_rate)
+    bloom.update(keys())
+    return bloom
+
+
+def build_common_password_filter(
+    wordlist_path: Path, filter_path: Path, fp_rate: float = 0.001
+) -> int:
+    words = 0
+
+    def keys() -> Iterator[bytes]:
+        nonlocal words
+        words = 0
+        with wordlist_path.open(encoding="utf-8") as f:
+            for line in f:
+                w = line.strip().lower()
+                if w and not w.startswith("#"):
+                    words += 1
+                    yield w.encode("utf-8")
+                    yield variant_key(canonical_form(w))
+
+    bloom = _count_and_build(keys, fp_rate)
+    bloom.save(filter_path)
+    return words
+
+
+def build_breach_filter(dump_path: Path, filter_path: Path, fp_rate: float = 0.001) -> int:
+    def keys() -> Iterator[bytes]:
+        with dump_path.open(encoding="ascii") as f:
+            for line in f:
+                sha1, sep, _ = line.strip().partition(":")
+                if sep and len(sha1) == 40:
+                    yield bytes.fromhex(sha1)
+
+    bloom = _count_and_build(keys, fp_rate)
+    bloom.save(filter_path)
+    return len(bloom)
+
+
+def filter_sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + ".bloom")
@@ -1,22 +1,159 @@
 from __future__ import annotations
 
 import hashlib
-import urllib.error
-import urllib.request
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from src import metrics
+from src.bloom import BloomFilter
+
+DEFAULT_BASE_URL = "https://api.pwnedpasswords.com"
+
+BreachLookup = Callable[[str], "int | None"]
+RangeFetcher = Callable[[str], "str | None"]
+BatchRangeFetcher = Callable[[Sequence[str]], "list[str | None]"]
 
 
 def _sha1_hex(password: str) -> str:
     h = hashlib.sha1()  # noqa: S324
-    h.update(password.encode("utf-8"))
+    h.update(password.encode("utf-8", "surrogateescape"))
     return h.hexdigest().upper()
 
 
-def check_pwned_password_k_anonymity(password: str, timeout_seconds: int = 10) -> int | None:
-    sha1 = _sha1_hex(password)
-    prefix = sha1[:5]
-    suffix = sha1[5:]
+@dataclass(frozen=True)
+class RangeCacheStats:
+    memory_hits: int
+    disk_hits: int
+    misses: int
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+class RangeCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 4096,
+        cache_dir: Path | None = None,
+        ttl_seconds: float = 24 * 60 * 60,
+    ) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def __reduce__(
+        self,
+    ) -> tuple[Callable[..., RangeCache], tuple[int, Path | None, float]]:
+        return (_restore_range_cache, (self.max_entries, self.cache_dir, self.ttl_seconds))
+
+    def stats(self) -> RangeCacheStats:
+        with self._lock:
+            return RangeCacheStats(self._memory_hits, self._disk_hits, self._misses)
+
+    def merge_stats(self, stats: RangeCacheStats) -> None:
+        with self._lock:
+            self._memory_hits += stats.memory_hits
+            self._disk_hits += stats.disk_hits
+            self._misses += stats.misses
+
+    def _disk_path(self, prefix: str) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / prefix[:2] / f"{prefix}.z"
+
+    def get(self, prefix: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(prefix)
+            if entry is not None:
+                if now - entry[0] < self.ttl_seconds:
+                    self._entries.move_to_end(prefix)
+                    self._memory_hits += 1
+                    return entry[1]
+                del self._entries[prefix]
+
+        found = self._read_disk(prefix, now)
+        with self._lock:
+            if found is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+        stored_at, body = found
+        self._remember(prefix, body, stored_at)
+        return body
+
+    def put(self, prefix: str, body: str) -> None:
+        now = time.time()
+        self._remember(prefix, body, now)
+        if self.cache_dir is not None:
+            self._write_disk(prefix, body)
+
+    def _remember(self, prefix: str, body: str, stored_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[prefix] = (stored_at, body)
+            self._entries.move_to_end(prefix)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_disk(self, prefix: str, now: float) -> tuple[float, str] | None:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(prefix)
+        try:
+            stored_at = path.stat().st_mtime
+            if now - stored_at >= self.ttl_seconds:
+                return None
+            return stored_at, zlib.decompress(path.read_bytes()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+
+    def _write_disk(self, prefix: str, body: str) -> None:
+        import tempfile
+
+        path = self._disk_path(prefix)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{prefix}.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(zlib.compress(body.encode("utf-8")))
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            return
+
 
-    url = f"https://api.pwnedpasswords.com/range/{prefix}"
+def _restore_range_cache(
+    max_entries: int, cache_dir: Path | None, ttl_seconds: float
+) -> RangeCache:
+    return RangeCache(max_entries=max_entries, cache_dir=cache_dir, ttl_seconds=ttl_seconds)
+
+
+def _fetch_range(prefix: str, timeout_seconds: float) -> str | None:
+    import urllib.error
+    import urllib.request
+
+    url = f"{DEFAULT_BASE_URL}/range/{prefix}"
     req = urllib.request.Request(
         url,
         headers={
@@ -27,10 +164,28 @@ def check_pwned_password_k_anonymity(password: str, timeout_seconds: int = 10) -
 
     try:
         with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
-            body = resp.read().decode("utf-8")
+            body: str = resp.read().decode("utf-8")
     except (urllib.error.URLError, TimeoutError, OSError):
+        metrics.inc("breach_network_errors")
         return None
+    return body
+
+
+def fetch_range(
+    prefix: str, *, timeout_seconds: float = 10, cache: RangeCache | None = None
+) -> str | None:
+    if cache is not None:
+        cached = cache.get(prefix)
+        if cached is not None:
+            return cached
 
+    body = _fetch_range(prefix, timeout_seconds)
+    if body is not None and cache is not None:
+        cache.put(prefix, body)
+    return body
+
+
+def count_in_range(body: str, suffix: str) -> int | None:
     for line in body.splitlines():
         if ":" not in line:
             continue
@@ -42,3 +197,200 @@ def check_pwned_password_k_anonymity(password: str, timeout_seconds: int = 10) -
                 return None
 
     return 0
+
+
+def parse_range(body: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for line in body.splitlines():
+        sfx, sep, count = line.partition(":")
+        if not sep:
+            continue
+        try:
+            counts[sfx.strip().upper()] = int(count)
+        except ValueError:
+            continue
+    return counts
+
+
+def check_pwned_passwords_grouped(
+    passwords: Sequence[str],
+    fetch: RangeFetcher = fetch_range,
+    *,
+    fetch_many: BatchRangeFetcher | None = None,
+) -> list[int | None]:
+    hashes = [_sha1_hex(pw) for pw in passwords]
+    groups: dict[str, list[int]] = {}
+    for i, sha1 in enumerate(hashes):
+        groups.setdefault(sha1[:5], []).append(i)
+
+    prefixes = list(groups)
+    bodies = fetch_many(prefixes) if fetch_many is not None else [fetch(p) for p in prefixes]
+    results: list[int | None] = [None] * len(hashes)
+    for members, body in zip(groups.values(), bodies):
+        if body is None:
+            continue
+        counts = parse_range(body)
+        for i in members:
+            results[i] = counts.get(hashes[i][5:], 0)
+    return results
+
+
+def check_pwned_password_k_anonymity(
+    password: str, timeout_seconds: int = 10, *, cache: RangeCache | None = None
+) -> int | None:
+    sha1 = _sha1_hex(password)
+    prefix = sha1[:5]
+    suffix = sha1[5:]
+
+    body = fetch_range(prefix, timeout_seconds=timeout_seconds, cache=cache)
+    if body is None:
+        return None
+    return count_in_range(body, suffix)
+
+
+class FilteredBreachLookup:
+    __slots__ = ("bloom", "lookup")
+
+    def __init__(self, bloom: BloomFilter, lookup: BreachLookup) -> None:
+        self.bloom = bloom
+        self.lookup = lookup
+
+    def might_contain(self, password: str) -> bool:
+        return bytes.fromhex(_sha1_hex(password)) in self.bloom
+
+    def __call__(self, password: str) -> int | None:
+        if not self.might_contain(password):
+            return 0
+        return self.lookup(password)
+
+
+_INDEX_MAGIC = b"PSCB"
+_INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sHHQ")
+_FANOUT_BITS = 20
+_FANOUT_SIZE = (1 << _FANOUT_BITS) + 1
+_FANOUT_ENTRY = struct.Struct("<Q")
+_RECORD = struct.Struct("<20sI")
+_RECORDS_OFFSET = _INDEX_HEADER.size + _FANOUT_SIZE * _FANOUT_ENTRY.size
+
+
+def _parse_dump_line(line: str, digest_size: int = 20) -> tuple[bytes, int] | None:
+    line = line.strip()
+    if not line or ":" not in line:
+        return None
+    digest, count = line.split(":", 1)
+    digest = digest.strip()
+    if len(digest) != digest_size * 2:
+        raise ValueError(f"Expected a {digest_size * 2}-character hash, got {digest!r}")
+    return bytes.fromhex(digest), min(int(count.strip()), 0xFFFFFFFF)
+
+
+def build_local_breach_index(dump_path: Path, index_path: Path) -> int:
+    fanout = array("Q", bytes(_FANOUT_ENTRY.size * _FANOUT_SIZE))
+    written = 0
+    prev = b""
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with dump_path.open("r", encoding="ascii") as src:
+        try:
+            with tmp_path.open("wb") as dst:
+                dst.write(bytes(_RECORDS_OFFSET))
+                for line in src:
+                    parsed = _parse_dump_line(line)
+                    if parsed is None:
+                        continue
+                    digest, count = parsed
+                    if digest <= prev:
+                        raise ValueError("Breach dump must be sorted by hash without duplicates")
+                    prev = digest
+                    fanout[(int.from_bytes(digest[:3], "big") >> 4) + 1] += 1
+                    dst.write(_RECORD.pack(digest, count))
+                    written += 1
+
+                for i in range(1, _FANOUT_SIZE):
+                    fanout[i] += fanout[i - 1]
+
+                dst.seek(0)
+                dst.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, 0, written))
+                if sys.byteorder != "little":
+                    fanout.byteswap()
+                dst.write(fanout.tobytes())
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    return written
+
+
+class LocalBreachIndex:
+    __slots__ = ("path", "_file", "_mm", "_count")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a local breach index") from None
+
+        count = -1
+        if len(self._mm) >= _RECORDS_OFFSET:
+            magic, version, _, count = _INDEX_HEADER.unpack_from(self._mm, 0)
+            if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+                count = -1
+        if count < 0 or len(self._mm) != _RECORDS_OFFSET + count * _RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a local breach index")
+        self._count: int = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __reduce__(self) -> tuple[type[LocalBreachIndex], tuple[Path]]:
+        return (LocalBreachIndex, (self.path,))
+
+    def __enter__(self) -> LocalBreachIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __call__(self, password: str) -> int:
+        return self.count_for_sha1(_sha1_hex(password))
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def _fanout(self, bucket: int) -> int:
+        offset = _INDEX_HEADER.size + bucket * _FANOUT_ENTRY.size
+        value: int = _FANOUT_ENTRY.unpack_from(self._mm, offset)[0]
+        return value
+
+    def records(self, chunk_records: int = 1 << 16) -> Iterator[tuple[bytes, int]]:
+        step = chunk_records * _RECORD.size
+        end = _RECORDS_OFFSET + self._count * _RECORD.size
+        for offset in range(_RECORDS_OFFSET, end, step):
+            yield from _RECORD.iter_unpack(self._mm[offset : min(offset + step, end)])
+
+    def count_for_sha1(self, sha1_hex: str) -> int:
+        target = bytes.fromhex(sha1_hex)
+        bucket = int(sha1_hex[:5], 16)
+        lo = self._fanout(bucket)
+        hi = self._fanout(bucket + 1)
+        mm = self._mm
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _RECORDS_OFFSET + mid * _RECORD.size
+            digest = mm[offset : offset + 20]
+            if digest < target:
+                lo = mid + 1
+            elif digest > target:
+                hi = mid
+            else:
+                count: int = _RECORD.unpack_from(mm, offset)[1]
+                return count
+        return 0
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import asyncio
+import http.client
+import queue
+import ssl
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterable, Sequence
+
+from src import metrics
+from src.breach import DEFAULT_BASE_URL, RangeCache, _sha1_hex, count_in_range
+
+_HEADERS = {
+    "User-Agent": "password-strength-checker",
+    "Add-Padding": "true",
+}
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+def _split_base_url(base_url: str) -> tuple[str, str, int, str]:
+    parts = urllib.parse.urlsplit(base_url)
+    if parts.scheme not in {"http", "https"} or not parts.hostname:
+        raise ValueError(f"Unsupported breach API URL: {base_url!r}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return parts.scheme, parts.hostname, port, parts.path.rstrip("/")
+
+
+def _retry_delay(attempt: int, backoff_seconds: float, retry_after: str | None) -> float:
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), _MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            pass
+    return backoff_seconds * 2.0**attempt
+
+
+class PwnedPasswordsClient:
+    def __init__(
+        self,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout_seconds: float = 10,
+        max_connections: int = 8,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        cache: RangeCache | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache = cache
+        self._scheme, self._host, self._port, self._path = _split_base_url(base_url)
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def __reduce__(self) -> tuple[Callable[..., PwnedPasswordsClient], tuple[object, ...]]:
+        return (
+            _restore_client,
+            (
+                self.base_url,
+                self.timeout_seconds,
+                self.max_connections,
+                self.max_retries,
+                self.backoff_seconds,
+                self.cache,
+            ),
+        )
+
+    def __enter__(self) -> PwnedPasswordsClient:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __call__(self, password: str) -> int | None:
+        sha1 = _sha1_hex(password)
+        body = self.fetch_range(sha1[:5])
+        if body is None:
+            return None
+        return count_in_range(body, sha1[5:])
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(
+                self._host, self._port, timeout=self.timeout_seconds
+            )
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout_seconds)
+
+    def _exchange(
+        self, conn: http.client.HTTPConnection, prefix: str
+    ) -> tuple[int, str | None, str | None]:
+        try:
+            conn.request("GET", f"{self._path}/range/{prefix}", headers=_HEADERS)
+            resp = conn.getresponse()
+            payload = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+        body = payload.decode("utf-8") if resp.status == 200 else None
+        return resp.status, resp.getheader("Retry-After"), body
+
+    def _request(self, prefix: str) -> tuple[int, str | None, str | None]:
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._exchange(self._connect(), prefix)
+            try:
+                return self._exchange(conn, prefix)
+            except (http.client.HTTPException, OSError):
+                return self._exchange(self._connect(), prefix)
+
+    def fetch_range(self, prefix: str) -> str | None:
+        if self.cache is not None:
+            cached = self.cache.get(prefix)
+            if cached is not None:
+                return cached
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                status, retry_after, body = self._request(prefix)
+            except (http.client.HTTPException, OSError, UnicodeDecodeError):
+                metrics.inc("breach_network_errors")
+                return None
+
+            if body is not None:
+                if self.cache is not None:
+                    self.cache.put(prefix, body)
+                return body
+            if status not in _RETRY_STATUSES or attempt == self.max_retries:
+                return None
+            metrics.inc("breach_retries")
+            time.sleep(_retry_delay(attempt, self.backoff_seconds, retry_after))
+
+        return None
+
+    def fetch_ranges(self, prefixes: Sequence[str]) -> list[str | None]:
+        if len(prefixes) < 2:
+            return [self.fetch_range(prefix) for prefix in prefixes]
+        return asyncio.run(self._fetch_ranges(prefixes))
+
+    async def _fetch_ranges(self, prefixes: Sequence[str]) -> list[str | None]:
+        async with AsyncPwnedPasswordsClient(
+            base_url=self.base_url,
+            timeout_seconds=self.timeout_seconds,
+            max_concurrency=self.max_connections,
+            max_retries=self.max_retries,
+            backoff_seconds=self.backoff_seconds,
+            cache=self.cache,
+        ) as client:
+            return list(await asyncio.gather(*(client.fetch_range(p) for p in prefixes)))
+
+
+def _restore_client(
+    base_url: str,
+    timeout_seconds: float,
+    max_connections: int,
+    max_retries: int,
+    backoff_seconds: float,
+    cache: RangeCache | None,
+) -> PwnedPasswordsClient:
+    return PwnedPasswordsClient(
+        base_url=base_url,
+        timeout_seconds=timeout_seconds,
+        max_connections=max_connections,
+        max_retries=max_retries,
+        backoff_seconds=backoff_seconds,
+        cache=cache,
+    )
+
+
+class _AsyncConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncPwnedPasswordsClient:
+    def __init__(
+        self,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout_seconds: float = 10,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        cache: RangeCache | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache = cache
+        self._scheme, self._host, self._port, self._path = _split_base_url(base_url)
+        self._idle: list[_AsyncConnection] = []
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def __aenter__(self) -> AsyncPwnedPasswordsClient:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        for conn in idle:
+            try:
+                await conn.writer.wait_closed()
+            except OSError:
+                pass
+
+    async def check(self, password: str) -> int | None:
+        sha1 = _sha1_hex(password)
+        body = await self.fetch_range(sha1[:5])
+        if body is None:
+            return None
+        return count_in_range(body, sha1[5:])
+
+    async def check_many(self, passwords: Iterable[str]) -> list[int | None]:
+        return list(await asyncio.gather(*(self.check(pw) for pw in passwords)))
+
+    async def fetch_range(self, prefix: str) -> str | None:
+        if self.cache is not None:
+            cached = self.cache.get(prefix)
+            if cached is not None:
+                return cached
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    status, retry_after, body = await asyncio.wait_for(
+                        self._request(prefix), self.timeout_seconds
+                    )
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+                    metrics.inc("breach_network_errors")
+                    return None
+
+                if body is not None:
+                    if self.cache is not None:
+                        self.cache.put(prefix, body)
+                    return body
+                if status not in _RETRY_STATUSES or attempt == self.max_retries:
+                    return None
+                metrics.inc("breach_retries")
+                await asyncio.sleep(_retry_delay(attempt, self.backoff_seconds, retry_after))
+
+        return None
+
+    async def _connect(self) -> _AsyncConnection:
+        ssl_context = ssl.create_default_context() if self._scheme == "https" else None
+        reader, writer = await asyncio.open_connection(self._host, self._port, ssl=ssl_context)
+        return _AsyncConnection(reader, writer)
+
+    async def _request(self, prefix: str) -> tuple[int, str | None, str | None]:
+        if not self._idle:
+            return await self._send(await self._connect(), prefix)
+        try:
+            return await self._send(self._idle.pop(), prefix)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            return await self._send(await self._connect(), prefix)
+
+    async def _send(
+        self, conn: _AsyncConnection, prefix: str
+    ) -> tuple[int, str | None, str | None]:
+        try:
+            status, headers, payload = await self._exchange(conn, prefix)
+        except BaseException:
+            conn.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            conn.close()
+        else:
+            self._idle.append(conn)
+
+        body = payload.decode("utf-8") if status == 200 else None
+        return status, headers.get("retry-after"), body
+
+    async def _exchange(
+        self, conn: _AsyncConnection, prefix: str
+    ) -> tuple[int, dict[str, str], bytes]:
+        lines = [f"GET {self._path}/range/{prefix} HTTP/1.1", f"Host: {self._host}"]
+        lines += [f"{k}: {v}" for k, v in _HEADERS.items()]
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("ascii"))
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readuntil(b"\r\n")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError("Malformed HTTP status line")
+        status = int(parts[1])
+
+        headers: dict[str, str] = {}
+        while True:
+            line = await conn.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks: list[bytes] = []
+            while True:
+                size_line = await conn.reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";", 1)[0], 16)
+                if size == 0:
+                    while await conn.reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await conn.reader.readexactly(size))
+                await conn.reader.readexactly(2)
+            payload = b"".join(chunks)
+        elif "content-length" in headers:
+            payload = await conn.reader.readexactly(int(headers["content-length"]))
+        else:
+            payload = await conn.reader.read()
+            headers["connection"] = "close"
+
+        return status, headers, payload
@@ -2,11 +2,198 @@ from __future__ import annotations
 
 import argparse
 import getpass
-import json
 import os
+import signal
+import sys
+import time
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any, TextIO
 
-from src.analyzer import analyze_password
+from src.analyzer import (
+    MODES,
+    Analysis,
+    analysis_payload,
+    analyze_password,
+    analyze_passwords,
+)
+from src.bloom import (
+    BloomFilter,
+    build_breach_filter,
+    build_common_password_filter,
+    filter_sidecar_path,
+)
+from src.breach import (
+    DEFAULT_BASE_URL,
+    BreachLookup,
+    FilteredBreachLookup,
+    LocalBreachIndex,
+    RangeCache,
+    build_local_breach_index,
+)
+from src.hash_audit import CORPORA, HASH_TYPES, audit_hashes, open_corpus
+from src.metrics import Metrics, set_metrics_sink
+from src.report import FORMATS
+from src.result_cache import ResultCache
+from src.reuse import open_history
+from src.vectorized import ENGINES, HAVE_NUMPY
+from src.wordlist import KINDS, compile_wordlist_file, compiled_wordlist_path
+
+
+def _read_passwords(stream: TextIO) -> Iterator[str]:
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def _run_batch(
+    stream: TextIO,
+    *,
+    workers: int,
+    engine: str,
+    fmt: str,
+    output: Path | None,
+    summary: bool,
+    options: dict[str, Any],
+) -> int:
+    import json
+
+    from src.report import AuditAggregator, ReportWriter, open_report_writer
+
+    count = 0
+    started = time.perf_counter()
+    results: Iterator[Analysis]
+    if workers > 1:
+        from src.parallel import analyze_passwords_parallel
+
+        results = analyze_passwords_parallel(
+            _read_passwords(stream), workers=workers, engine=engine, **options
+        )
+    else:
+        results = analyze_passwords(_read_passwords(stream), engine=engine, **options)
+    aggregator = AuditAggregator() if summary else None
+    writer: ReportWriter | None = None
+    if output is not None or not summary:
+        writer = open_report_writer(fmt, output)
+    try:
+        for count, analysis in enumerate(results, start=1):
+            if writer is not None:
+                writer.write(analysis)
+            if aggregator is not None:
+                aggregator.add(analysis)
+    finally:
+        if writer is not None:
+            writer.close()
+    if aggregator is not None:
+        print(json.dumps(aggregator.summary(), indent=2))
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(
+        f"analyzed {count} passwords in {elapsed:.2f}s ({rate:.0f} passwords/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _run_hash_audit(stream: TextIO, args: argparse.Namespace) -> int:
+    import json
+
+    corpus = open_corpus(args.corpus_path, args.hash_type, args.corpus)
+    field = "breach_count" if args.corpus == "breach" else "common_password"
+    encode = json.JSONEncoder().encode
+    total = matched = 0
+    for match in audit_hashes(stream, corpus, args.hash_type, chunk_size=args.chunk_size):
+        total += 1
+        if match.count:
+            matched += 1
+        elif not args.all:
+            continue
+        value = match.count if args.corpus == "breach" else bool(match.count)
+        row = {"line": match.line, "hash": match.hash_hex, field: value}
+        sys.stdout.write(encode(row) + "\n")
+    print(f"{matched} of {total} hashes found in {args.corpus_path}", file=sys.stderr)
+    return 0
+
+
+def _run_single(password: str | None, *, as_json: bool, options: dict[str, Any]) -> int:
+    if password is None:
+        password = getpass.getpass("Password: ")
+
+    analysis = analyze_password(password, **options)
+
+    if as_json:
+        import json
+
+        print(json.dumps(analysis_payload(analysis), indent=2) + "\n")
+        return 0
+
+    print(f"score: {analysis.score}/100")
+    print(f"label: {analysis.label}")
+    print(f"entropy_bits: {analysis.entropy_bits:.1f}")
+    print(f"shannon_entropy_bits: {analysis.shannon_entropy_bits:.1f}")
+    if analysis.breach_count is not None:
+        print(f"breach_count: {analysis.breach_count}")
+    print("reasons:")
+    for r in analysis.reasons:
+        print(f"- {r}")
+
+    return 0
+
+
+def _enable_metrics(
+    history_path: Path, cache: RangeCache | None, result_cache: ResultCache | None
+) -> Metrics:
+    sink = Metrics()
+    history = open_history(history_path)
+    sink.register_gauge("history_digests", lambda: len(history))
+    if cache is not None:
+        sink.register_counter("breach_cache_memory_hits", lambda: cache.stats().memory_hits)
+        sink.register_counter("breach_cache_disk_hits", lambda: cache.stats().disk_hits)
+        sink.register_counter("breach_cache_misses", lambda: cache.stats().misses)
+    if result_cache is not None:
+        sink.register_counter("result_cache_hits", lambda: result_cache.stats().hits)
+        sink.register_counter("result_cache_misses", lambda: result_cache.stats().misses)
+        sink.register_counter("result_cache_breach_hits", lambda: result_cache.stats().breach_hits)
+        sink.register_counter("result_cache_evictions", lambda: result_cache.stats().evictions)
+        sink.register_gauge("result_cache_entries", lambda: len(result_cache))
+    set_metrics_sink(sink)
+    return sink
+
+
+def _run_server(args: argparse.Namespace, options: dict[str, Any]) -> int:
+    from src.server import AnalysisService, make_http_server, make_unix_server
+
+    service = AnalysisService(
+        common_passwords_path=options["common_passwords_path"],
+        history_path=options["history_path"],
+        history_pepper=options["history_pepper"],
+        check_breach=options["check_breach"],
+        breach_lookup=options["breach_lookup"],
+        wordlist_paths=options["wordlist_paths"],
+        mode=options["mode"],
+        result_cache=options["result_cache"],
+        max_batch=args.max_batch,
+        max_queue=args.max_queue,
+    )
+    if args.socket is not None:
+        server = make_unix_server(service, args.socket)
+        print(f"listening on {args.socket}", file=sys.stderr)
+    else:
+        server = make_http_server(service, args.port)
+        print(f"listening on http://127.0.0.1:{args.port}", file=sys.stderr)
+
+    def stop(signum: int, frame: object) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
 
 
 def main() -> int:
@@ -15,11 +202,265 @@ def main() -> int:
     parser.add_argument("--check-breach", action="store_true", help="Use HIBP k-anonymity API")
     parser.add_argument("--save-history", action="store_true", help="Save digest to local history")
     parser.add_argument("--json", action="store_true", help="Print analysis JSON (for automation)")
+    parser.add_argument(
+        "--input",
+        metavar="FILE",
+        help="Analyze newline-delimited passwords from FILE ('-' for stdin) and print JSONL",
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="With --input, print aggregate histograms (rows are written only with --output)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="jsonl",
+        help="Row format for --input: JSONL, CSV or binary columnar (default: jsonl)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        metavar="PATH",
+        help="Write --input rows to PATH instead of stdout",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Worker processes for --input mode (default: 1)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help="Feature extraction engine for --input mode (vectorized requires numpy)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="full",
+        help="'fast' skips the reuse and breach checks once the label is settled (default: full)",
+    )
+    parser.add_argument(
+        "--result-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Reuse results of up to N repeated passwords, keyed by peppered digest (default: off)",
+    )
+    parser.add_argument(
+        "--result-cache-breach-ttl",
+        type=float,
+        default=60 * 60,
+        metavar="SECONDS",
+        help="Maximum age of cached breach counts in the result cache (default: 3600)",
+    )
+    parser.add_argument(
+        "--wordlist",
+        type=Path,
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Flag passwords that embed words from PATH (repeatable)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        metavar="PATH",
+        help="Record per-stage timings and counters and write them to PATH in Prometheus format",
+    )
+    parser.add_argument(
+        "--breach-index",
+        type=Path,
+        metavar="PATH",
+        help="Check breaches against a local index (see build-breach-index) instead of HIBP",
+    )
+    parser.add_argument(
+        "--breach-cache",
+        type=Path,
+        metavar="DIR",
+        help="Persist compressed HIBP range responses in DIR between runs",
+    )
+    parser.add_argument(
+        "--breach-cache-ttl",
+        type=float,
+        default=24 * 60 * 60,
+        metavar="SECONDS",
+        help="Maximum age of cached HIBP range responses (default: 86400)",
+    )
+    parser.add_argument(
+        "--breach-api-url",
+        default=DEFAULT_BASE_URL,
+        metavar="URL",
+        help=f"Pwned Passwords range API base URL (default: {DEFAULT_BASE_URL})",
+    )
+    parser.add_argument(
+        "--breach-filter",
+        type=Path,
+        metavar="PATH",
+        help="Bloom filter (see build-filter breach) that answers definite breach misses locally",
+    )
+
+    subcommands = parser.add_subparsers(dest="command")
+    build_index = subcommands.add_parser(
+        "build-breach-index",
+        help="Compile a sorted Pwned Passwords SHA-1 dump into a local breach index",
+    )
+    build_index.add_argument("dump", type=Path, help="HASH:COUNT dump ordered by hash")
+    build_index.add_argument("output", type=Path, help="Index file to write")
+
+    build_filter = subcommands.add_parser(
+        "build-filter",
+        help="Build a Bloom filter over a common-password list or a breach dump",
+    )
+    build_filter.add_argument("kind", choices=["common", "breach"])
+    build_filter.add_argument("source", type=Path, help="Wordlist or HASH:COUNT dump")
+    build_filter.add_argument(
+        "output",
+        type=Path,
+        nargs="?",
+        help="Filter file to write (default: SOURCE.bloom, picked up automatically for wordlists)",
+    )
+    build_filter.add_argument(
+        "--fp-rate",
+        type=float,
+        default=0.001,
+        help="Target false-positive rate (default: 0.001)",
+    )
+
+    compile_list = subcommands.add_parser(
+        "compile-wordlist",
+        help="Compile a text wordlist into the compact binary format read without parsing",
+    )
+    compile_list.add_argument(
+        "kind",
+        choices=KINDS,
+        help="'common' also stores leet/suffix variant keys; 'words' is for dictionary lists",
+    )
+    compile_list.add_argument("source", type=Path, help="Newline-delimited wordlist")
+    compile_list.add_argument(
+        "output",
+        type=Path,
+        nargs="?",
+        help="File to write (default: SOURCE with a .bin suffix, picked up automatically)",
+    )
+
+    audit = subcommands.add_parser(
+        "audit-hashes",
+        help="Merge-join a file of SHA-1 or NTLM hashes against a sorted breach or common corpus",
+    )
+    audit.add_argument("hash_type", choices=HASH_TYPES)
+    audit.add_argument(
+        "hashes",
+        help="One hash per line ('-' for stdin); HASH:COUNT, user:HASH and pwdump lines also work",
+    )
+    audit.add_argument(
+        "corpus_path",
+        type=Path,
+        help="Breach index or HASH:COUNT dump ordered by hash (a wordlist with --corpus common)",
+    )
+    audit.add_argument(
+        "--corpus",
+        choices=CORPORA,
+        default="breach",
+        help="'common' hashes the wordlist and reports common_password instead of breach_count",
+    )
+    audit.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1 << 20,
+        metavar="N",
+        help="Hashes sorted in memory before spilling a run to a temporary file (default: 1048576)",
+    )
+    audit.add_argument("--all", action="store_true", help="Also print hashes that were not found")
+
+    serve = subcommands.add_parser(
+        "serve",
+        help="Keep indexes warm and answer JSON analysis requests on localhost or a Unix socket",
+    )
+    serve.add_argument(
+        "--socket",
+        type=Path,
+        metavar="PATH",
+        help="Listen on a Unix domain socket (newline-delimited JSON) instead of HTTP",
+    )
+    serve.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port for the HTTP listener on 127.0.0.1 (default: 8765)",
+    )
+    serve.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Record per-stage timings and counters and expose them at GET /metrics",
+    )
+    serve.add_argument(
+        "--max-batch",
+        type=int,
+        default=256,
+        metavar="N",
+        help="Maximum passwords scored together in one batch (default: 256)",
+    )
+    serve.add_argument(
+        "--max-queue",
+        type=int,
+        default=1024,
+        metavar="N",
+        help="Maximum queued requests before answering 503 (default: 1024)",
+    )
+
     args = parser.parse_args()
 
-    password = args.password
-    if password is None:
-        password = getpass.getpass("Password: ")
+    if args.command == "build-breach-index":
+        try:
+            written = build_local_breach_index(args.dump, args.output)
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"build-breach-index: {exc}") from None
+        print(f"wrote {written} hashes to {args.output}", file=sys.stderr)
+        return 0
+
+    if args.command == "build-filter":
+        output = args.output or filter_sidecar_path(args.source)
+        build = build_common_password_filter if args.kind == "common" else build_breach_filter
+        written = build(args.source, output, args.fp_rate)
+        print(f"wrote a filter over {written} entries to {output}", file=sys.stderr)
+        return 0
+
+    if args.command == "compile-wordlist":
+        output = args.output or compiled_wordlist_path(args.source)
+        written = compile_wordlist_file(args.source, output, args.kind)
+        print(f"compiled {written} words to {output}", file=sys.stderr)
+        return 0
+
+    if args.command == "audit-hashes":
+        if args.chunk_size < 1:
+            parser.error("--chunk-size must be >= 1")
+        try:
+            if args.hashes == "-":
+                return _run_hash_audit(sys.stdin, args)
+            with open(args.hashes, encoding="utf-8", errors="surrogateescape") as stream:
+                return _run_hash_audit(stream, args)
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"audit-hashes: {exc}") from None
+
+    if args.input is not None and args.password is not None:
+        parser.error("--input and --password are mutually exclusive")
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.result_cache < 0:
+        parser.error("--result-cache must be >= 0")
+    if args.command == "serve" and (args.max_batch < 1 or args.max_queue < 1):
+        parser.error("--max-batch and --max-queue must be >= 1")
+    if args.breach_filter is not None and not (args.check_breach or args.breach_index):
+        parser.error("--breach-filter requires --check-breach or --breach-index")
+    for wordlist in args.wordlist:
+        if not wordlist.is_file():
+            parser.error(f"--wordlist: {wordlist} is not a file")
+    if args.engine == "vectorized" and not HAVE_NUMPY:
+        parser.error("--engine vectorized requires numpy (pip install '.[vectorized]')")
 
     history_path = Path(os.getenv("PASSWORD_HISTORY_PATH", "data/history.json"))
     pepper = os.getenv("PASSWORD_HISTORY_PEPPER")
@@ -31,39 +472,75 @@ def main() -> int:
 
     common_passwords_path = Path("data/common_passwords.txt")
 
-    analysis = analyze_password(
-        password,
-        common_passwords_path=common_passwords_path,
-        history_path=history_path,
-        history_pepper=pepper,
-        check_breach=args.check_breach,
-        save_history=args.save_history,
-    )
-
-    if args.json:
-        payload = {
-            "score": analysis.score,
-            "label": analysis.label,
-            "entropy_bits": analysis.entropy_bits,
-            "shannon_entropy_bits": analysis.shannon_entropy_bits,
-            "is_reused": analysis.is_reused,
-            "breach_count": analysis.breach_count,
-            "reasons": analysis.reasons,
-        }
-        print(json.dumps(payload, indent=2) + "\n")
-        return 0
+    breach_lookup: BreachLookup | None = None
+    cache: RangeCache | None = None
+    if args.breach_index is not None:
+        try:
+            breach_lookup = LocalBreachIndex(args.breach_index)
+        except (OSError, ValueError) as exc:
+            parser.error(f"--breach-index: {exc}")
+    elif args.check_breach:
+        from src.breach_client import PwnedPasswordsClient
 
-    print(f"score: {analysis.score}/100")
-    print(f"label: {analysis.label}")
-    print(f"entropy_bits: {analysis.entropy_bits:.1f}")
-    print(f"shannon_entropy_bits: {analysis.shannon_entropy_bits:.1f}")
-    if analysis.breach_count is not None:
-        print(f"breach_count: {analysis.breach_count}")
-    print("reasons:")
-    for r in analysis.reasons:
-        print(f"- {r}")
+        cache = RangeCache(cache_dir=args.breach_cache, ttl_seconds=args.breach_cache_ttl)
+        breach_lookup = PwnedPasswordsClient(base_url=args.breach_api_url, cache=cache)
+    if breach_lookup is not None and args.breach_filter is not None:
+        try:
+            breach_filter = BloomFilter.load(args.breach_filter)
+        except (OSError, ValueError) as exc:
+            parser.error(f"--breach-filter: {exc}")
+        breach_lookup = FilteredBreachLookup(breach_filter, breach_lookup)
 
-    return 0
+    result_cache: ResultCache | None = None
+    if args.result_cache > 0:
+        result_cache = ResultCache(
+            pepper=pepper,
+            max_entries=args.result_cache,
+            breach_ttl_seconds=args.result_cache_breach_ttl,
+        )
+
+    sink: Metrics | None = None
+    if args.metrics_file is not None or (args.command == "serve" and args.metrics):
+        sink = _enable_metrics(history_path, cache, result_cache)
+
+    options: dict[str, Any] = {
+        "common_passwords_path": common_passwords_path,
+        "history_path": history_path,
+        "history_pepper": pepper,
+        "check_breach": args.check_breach or breach_lookup is not None,
+        "save_history": args.save_history,
+        "breach_lookup": breach_lookup,
+        "wordlist_paths": args.wordlist,
+        "mode": args.mode,
+        "result_cache": result_cache,
+    }
+
+    if args.command == "serve":
+        status = _run_server(args, options)
+    elif args.input is not None:
+        batch: dict[str, Any] = {
+            "workers": args.workers,
+            "engine": args.engine,
+            "fmt": args.format,
+            "output": args.output,
+            "summary": args.summary,
+            "options": options,
+        }
+        if args.input == "-":
+            status = _run_batch(sys.stdin, **batch)
+        else:
+            try:
+                stream = open(args.input, encoding="utf-8", errors="surrogateescape")
+            except OSError as exc:
+                parser.error(f"--input: {exc}")
+            with stream:
+                status = _run_batch(stream, **batch)
+    else:
+        status = _run_single(args.password, as_json=args.json, options=options)
+
+    if sink is not None and args.metrics_file is not None:
+        args.metrics_file.write_text(sink.to_prometheus(), encoding="utf-8")
+    return status
 
 
 def cli() -> None:
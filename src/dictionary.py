@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+from src.wordlist import read_wordlist_words
+
+_MIN_WORD_LENGTH = 4
+_MAX_REPORTED_WORDS = 3
+_MATCHER_CACHE_MAX = 8
+
+
+class WordMatcher:
+    __slots__ = ("_goto", "_fail", "_out", "_count")
+
+    def __init__(self, words: Iterable[str], min_length: int = _MIN_WORD_LENGTH) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._out: list[tuple[str, ...]] = [()]
+        self._count = 0
+
+        for raw in words:
+            word = raw.strip().lower()
+            if len(word) < min_length or word.startswith("#"):
+                continue
+            node = 0
+            for c in word:
+                nxt = self._goto[node].get(c)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][c] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                node = nxt
+            if not self._out[node]:
+                self._out[node] = (word,)
+                self._count += 1
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(c, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    @classmethod
+    def from_text(cls, text: str) -> WordMatcher:
+        return cls(text.splitlines())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def find_all(self, text: str, limit: int | None = None) -> list[str]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        found: dict[str, None] = {}
+        node = 0
+        for c in text.lower():
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            for word in out[node]:
+                found[word] = None
+                if limit is not None and len(found) >= limit:
+                    return list(found)
+        return list(found)
+
+    def find_words(self, password: str) -> list[str]:
+        return self.find_all(password, _MAX_REPORTED_WORDS)
+
+
+_EMPTY_MATCHER = WordMatcher(())
+_matcher_cache: dict[tuple[str, ...], tuple[tuple[tuple[int, int], ...], WordMatcher]] = {}
+
+
+def load_word_matcher(wordlist_paths: Sequence[Path]) -> WordMatcher:
+    if not wordlist_paths:
+        return _EMPTY_MATCHER
+
+    key = tuple(os.fspath(p) for p in wordlist_paths)
+    stamps = []
+    for path in wordlist_paths:
+        st = path.stat()
+        stamps.append((st.st_mtime_ns, st.st_size))
+    stamp = tuple(stamps)
+
+    cached = _matcher_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    words: list[str] = []
+    for path in wordlist_paths:
+        words.extend(read_wordlist_words(path))
+    matcher = WordMatcher(words)
+
+    _matcher_cache.pop(key, None)
+    while len(_matcher_cache) >= _MATCHER_CACHE_MAX:
+        del _matcher_cache[next(iter(_matcher_cache))]
+    _matcher_cache[key] = (stamp, matcher)
+    return matcher
+
+
+def clear_word_matcher_cache() -> None:
+    _matcher_cache.clear()
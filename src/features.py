@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import math
+import string
+from dataclasses import dataclass
+
+from src.patterns import _KEYBOARD_ADJ
+
+_LOWER = 1
+_UPPER = 2
+_DIGIT = 4
+_SYMBOL = 8
+_OTHER = 16
+
+_CLASS_SIZES = (
+    (_LOWER, 26),
+    (_UPPER, 26),
+    (_DIGIT, 10),
+    (_SYMBOL, len(string.punctuation)),
+    (_OTHER, 32),
+)
+
+
+def _char_classes(c: str) -> int:
+    lower = c.islower()
+    upper = c.isupper()
+    digit = c.isdigit()
+    symbol = c in string.punctuation
+    bits = 0
+    if lower:
+        bits |= _LOWER
+    if upper:
+        bits |= _UPPER
+    if digit:
+        bits |= _DIGIT
+    if symbol:
+        bits |= _SYMBOL
+    if not (lower or upper or digit or symbol):
+        bits |= _OTHER
+    return bits
+
+
+_ASCII_CLASSES = {chr(i): _char_classes(chr(i)) for i in range(128)}
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordFeatures:
+    length: int
+    charset_size: int
+    entropy_bits: float
+    shannon_entropy_bits: float
+    longest_repeat_run: int
+    longest_sequence_run: int
+    longest_keyboard_run: int
+
+    @property
+    def has_repeated_chars(self) -> bool:
+        return self.longest_repeat_run >= 4
+
+    @property
+    def has_sequence(self) -> bool:
+        return self.longest_sequence_run >= 4
+
+    @property
+    def has_keyboard_walk(self) -> bool:
+        return self.longest_keyboard_run >= 4
+
+
+def _walk_runs(lowered: str) -> tuple[int, int]:
+    longest_seq = longest_kb = 1 if lowered else 0
+    up = down = kb = 1
+    prev = ""
+    for i, c in enumerate(lowered):
+        if i:
+            diff = ord(c) - ord(prev)
+            up = up + 1 if diff == 1 else 1
+            down = down + 1 if diff == -1 else 1
+            neigh = _KEYBOARD_ADJ.get(prev)
+            kb = kb + 1 if neigh is not None and c in neigh else 1
+            longest_seq = max(longest_seq, up, down)
+            longest_kb = max(longest_kb, kb)
+        prev = c
+    return longest_seq, longest_kb
+
+
+def extract_features(password: str) -> PasswordFeatures:
+    n = len(password)
+    lowered = password.lower()
+    fused = len(lowered) == n
+
+    classes = 0
+    counts: dict[str, int] = {}
+    longest_repeat = repeat = 1 if n else 0
+    longest_seq = longest_kb = 1 if n else 0
+    up = down = kb = 1
+    prev = prev_low = ""
+    ascii_classes = _ASCII_CLASSES
+
+    for i, c in enumerate(password):
+        cls = ascii_classes.get(c)
+        classes |= _char_classes(c) if cls is None else cls
+        counts[c] = counts.get(c, 0) + 1
+
+        if i:
+            repeat = repeat + 1 if c == prev else 1
+            if repeat > longest_repeat:
+                longest_repeat = repeat
+
+        if fused:
+            low = lowered[i]
+            if i:
+                diff = ord(low) - ord(prev_low)
+                up = up + 1 if diff == 1 else 1
+                down = down + 1 if diff == -1 else 1
+                neigh = _KEYBOARD_ADJ.get(prev_low)
+                kb = kb + 1 if neigh is not None and low in neigh else 1
+                longest_seq = max(longest_seq, up, down)
+                longest_kb = max(longest_kb, kb)
+            prev_low = low
+        prev = c
+
+    if not fused:
+        longest_seq, longest_kb = _walk_runs(lowered)
+
+    return _features(n, classes, counts, longest_repeat, longest_seq, longest_kb)
+
+
+def _features(
+    n: int,
+    classes: int,
+    counts: dict[str, int],
+    longest_repeat: int,
+    longest_seq: int,
+    longest_kb: int,
+) -> PasswordFeatures:
+    charset = max(sum(size for flag, size in _CLASS_SIZES if classes & flag), 1)
+
+    shannon = 0.0
+    if n:
+        h = 0.0
+        for count in counts.values():
+            p = count / n
+            h -= p * math.log2(p)
+        shannon = h * n
+
+    return PasswordFeatures(
+        length=n,
+        charset_size=charset,
+        entropy_bits=n * math.log2(charset) if n else 0.0,
+        shannon_entropy_bits=shannon,
+        longest_repeat_run=longest_repeat,
+        longest_sequence_run=longest_seq,
+        longest_keyboard_run=longest_kb,
+    )
+
+
+_FINAL_SIGMA = "\u03a3"
+
+
+class IncrementalFeatures:
+    __slots__ = (
+        "_chars",
+        "_counts",
+        "_saved",
+        "_classes",
+        "_repeat",
+        "_longest_repeat",
+        "_prev_low",
+        "_up",
+        "_down",
+        "_kb",
+        "_longest_seq",
+        "_longest_kb",
+        "_sigmas",
+    )
+
+    def __init__(self, password: str = "") -> None:
+        self._chars: list[str] = []
+        self._counts: dict[str, int] = {}
+        self._saved: list[tuple[int, int, int, str, int, int, int, int, int]] = []
+        self._classes = 0
+        self._repeat = self._longest_repeat = 0
+        self._prev_low = ""
+        self._up = self._down = self._kb = 1
+        self._longest_seq = self._longest_kb = 0
+        self._sigmas = 0
+        for c in password:
+            self.push(c)
+
+    def __len__(self) -> int:
+        return len(self._chars)
+
+    @property
+    def password(self) -> str:
+        return "".join(self._chars)
+
+    def push(self, char: str) -> None:
+        if len(char) != 1:
+            raise ValueError("push() takes a single character")
+        self._saved.append(
+            (
+                self._classes,
+                self._repeat,
+                self._longest_repeat,
+                self._prev_low,
+                self._up,
+                self._down,
+                self._kb,
+                self._longest_seq,
+                self._longest_kb,
+            )
+        )
+
+        cls = _ASCII_CLASSES.get(char)
+        self._classes |= _char_classes(char) if cls is None else cls
+        self._counts[char] = self._counts.get(char, 0) + 1
+
+        if self._chars and self._chars[-1] == char:
+            self._repeat += 1
+        else:
+            self._repeat = 1
+        self._longest_repeat = max(self._longest_repeat, self._repeat)
+
+        for low in char.lower():
+            prev = self._prev_low
+            if prev:
+                diff = ord(low) - ord(prev)
+                self._up = self._up + 1 if diff == 1 else 1
+                self._down = self._down + 1 if diff == -1 else 1
+                neigh = _KEYBOARD_ADJ.get(prev)
+                self._kb = self._kb + 1 if neigh is not None and low in neigh else 1
+                self._longest_seq = max(self._longest_seq, self._up, self._down)
+                self._longest_kb = max(self._longest_kb, self._kb)
+            else:
+                self._longest_seq = self._longest_kb = 1
+            self._prev_low = low
+
+        if char == _FINAL_SIGMA:
+            self._sigmas += 1
+        self._chars.append(char)
+
+    def pop(self) -> str:
+        if not self._chars:
+            raise IndexError("pop from an empty password")
+        char = self._chars.pop()
+        count = self._counts[char] - 1
+        if count:
+            self._counts[char] = count
+        else:
+            del self._counts[char]
+        if char == _FINAL_SIGMA:
+            self._sigmas -= 1
+        (
+            self._classes,
+            self._repeat,
+            self._longest_repeat,
+            self._prev_low,
+            self._up,
+            self._down,
+            self._kb,
+            self._longest_seq,
+            self._longest_kb,
+        ) = self._saved.pop()
+        return char
+
+    def features(self) -> PasswordFeatures:
+        longest_seq, longest_kb = self._longest_seq, self._longest_kb
+        if self._sigmas:
+            longest_seq, longest_kb = _walk_runs(self.password.lower())
+        return _features(
+            len(self._chars),
+            self._classes,
+            self._counts,
+            self._longest_repeat,
+            longest_seq,
+            longest_kb,
+        )
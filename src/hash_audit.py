@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import struct
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import IO
+
+from src.breach import _INDEX_MAGIC, LocalBreachIndex, _parse_dump_line, _sha1_hex
+from src.wordlist import read_wordlist_words
+
+HASH_TYPES = ("sha1", "ntlm")
+CORPORA = ("breach", "common")
+DIGEST_SIZES = {"sha1": 20, "ntlm": 16}
+
+_CHUNK_SIZE = 1 << 20
+_RUN_READ_RECORDS = 1 << 12
+_MASK = 0xFFFFFFFF
+_MD4_ROUNDS = (
+    (tuple(range(16)), (3, 7, 11, 19), 0),
+    ((0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15), (3, 5, 9, 13), 0x5A827999),
+    ((0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15), (3, 9, 11, 15), 0x6ED9EBA1),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class HashMatch:
+    line: int
+    hash_hex: str
+    count: int
+
+
+def _md4(data: bytes) -> bytes:
+    message = data + b"\x80" + bytes((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    state = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476]
+    for offset in range(0, len(message), 64):
+        x = struct.unpack_from("<16I", message, offset)
+        a, b, c, d = state
+        for round_number, (order, shifts, constant) in enumerate(_MD4_ROUNDS):
+            for i, k in enumerate(order):
+                if round_number == 0:
+                    f = (b & c) | (~b & d)
+                elif round_number == 1:
+                    f = (b & c) | (b & d) | (c & d)
+                else:
+                    f = b ^ c ^ d
+                t = (a + f + x[k] + constant) & _MASK
+                s = shifts[i % 4]
+                a, b, c, d = d, ((t << s) | (t >> (32 - s))) & _MASK, b, c
+        state = [(v + w) & _MASK for v, w in zip(state, (a, b, c, d))]
+    return struct.pack("<4I", *state)
+
+
+def _ntlm_hex(password: str) -> str:
+    data = password.encode("utf-16-le")
+    try:
+        digest = hashlib.new("md4", data).digest()
+    except ValueError:
+        digest = _md4(data)
+    return digest.hex().upper()
+
+
+def _digest_size(hash_type: str) -> int:
+    if hash_type not in DIGEST_SIZES:
+        raise ValueError(f"Unknown hash type: {hash_type!r}")
+    return DIGEST_SIZES[hash_type]
+
+
+def read_hashes(lines: Iterable[str], hash_type: str) -> Iterator[tuple[bytes, int]]:
+    width = _digest_size(hash_type) * 2
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        fields = [field.strip() for field in line.split(":")]
+        candidates = [field for field in fields if len(field) == width]
+        try:
+            yield bytes.fromhex(candidates[-1]), number
+        except (IndexError, ValueError):
+            raise ValueError(
+                f"Line {number}: expected a {width}-character {hash_type} hash"
+            ) from None
+
+
+def _read_run(run: IO[bytes], record: struct.Struct) -> Iterator[tuple[bytes, int]]:
+    while block := run.read(record.size * _RUN_READ_RECORDS):
+        yield from record.iter_unpack(block)
+
+
+def external_sort(
+    records: Iterable[tuple[bytes, int]], digest_size: int, chunk_size: int = _CHUNK_SIZE
+) -> Iterator[tuple[bytes, int]]:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    remaining = iter(records)
+    chunk = sorted(islice(remaining, chunk_size))
+    if len(chunk) < chunk_size:
+        yield from chunk
+        return
+
+    import tempfile
+
+    record = struct.Struct(f"<{digest_size}sQ")
+    with ExitStack() as stack:
+        runs: list[IO[bytes]] = []
+        while chunk:
+            run = stack.enter_context(tempfile.TemporaryFile())
+            run.writelines(record.pack(digest, line) for digest, line in chunk)
+            run.seek(0)
+            runs.append(run)
+            chunk.clear()
+            chunk = sorted(islice(remaining, chunk_size))
+        yield from heapq.merge(*(_read_run(run, record) for run in runs))
+
+
+def _index_records(path: Path) -> Iterator[tuple[bytes, int]]:
+    with LocalBreachIndex(path) as index:
+        yield from index.records()
+
+
+def _dump_records(path: Path, digest_size: int) -> Iterator[tuple[bytes, int]]:
+    with path.open("r", encoding="ascii") as src:
+        for line in src:
+            parsed = _parse_dump_line(line, digest_size)
+            if parsed is not None:
+                yield parsed
+
+
+def _common_records(path: Path, hash_type: str) -> Iterator[tuple[bytes, int]]:
+    digest = _sha1_hex if hash_type == "sha1" else _ntlm_hex
+    hashed = {bytes.fromhex(digest(word)) for word in read_wordlist_words(path)}
+    return ((h, 1) for h in sorted(hashed))
+
+
+def open_corpus(path: Path, hash_type: str, corpus: str = "breach") -> Iterator[tuple[bytes, int]]:
+    digest_size = _digest_size(hash_type)
+    if corpus not in CORPORA:
+        raise ValueError(f"Unknown corpus: {corpus!r}")
+    if corpus == "common":
+        return _common_records(path, hash_type)
+    with path.open("rb") as f:
+        is_index = f.read(len(_INDEX_MAGIC)) == _INDEX_MAGIC
+    if not is_index:
+        return _dump_records(path, digest_size)
+    if hash_type != "sha1":
+        raise ValueError(f"{path} is a local breach index, which only holds SHA-1 hashes")
+    return _index_records(path)
+
+
+def merge_join(
+    hashes: Iterable[tuple[bytes, int]], corpus: Iterable[tuple[bytes, int]]
+) -> Iterator[HashMatch]:
+    records = iter(corpus)
+    current = next(records, None)
+    for digest, line in hashes:
+        while current is not None and current[0] < digest:
+            previous = current[0]
+            current = next(records, None)
+            if current is not None and current[0] < previous:
+                raise ValueError("Corpus must be sorted by hash")
+        count = current[1] if current is not None and current[0] == digest else 0
+        yield HashMatch(line, digest.hex().upper(), count)
+
+
+def audit_hashes(
+    lines: Iterable[str],
+    corpus: Iterable[tuple[bytes, int]],
+    hash_type: str,
+    *,
+    chunk_size: int = _CHUNK_SIZE,
+) -> Iterator[HashMatch]:
+    hashes = read_hashes(lines, hash_type)
+    return merge_join(external_sort(hashes, _digest_size(hash_type), chunk_size), corpus)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+_PREFIX = "psc"
+_STAGE_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+class MetricsSink(Protocol):
+    def observe(self, stage: str, seconds: float) -> None: ...
+
+    def inc(self, name: str, amount: float = 1.0) -> None: ...
+
+
+class _StageHistogram:
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * len(_STAGE_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class MetricsSnapshot:
+    stages: dict[str, tuple[tuple[int, ...], int, float]]
+    counters: dict[str, float]
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: dict[str, _StageHistogram] = {}
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+        self._counter_readers: dict[str, Callable[[], float]] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _StageHistogram()
+            hist.count += 1
+            hist.total += seconds
+            for i, bound in enumerate(_STAGE_BUCKETS):
+                if seconds <= bound:
+                    hist.buckets[i] += 1
+                    break
+
+    def inc(self, name: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + amount
+
+    def register_gauge(self, name: str, read: Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = read
+
+    def register_counter(self, name: str, read: Callable[[], float]) -> None:
+        with self._lock:
+            self._counter_readers[name] = read
+
+    def drain(self) -> MetricsSnapshot:
+        with self._lock:
+            stages = {
+                name: (tuple(h.buckets), h.count, h.total) for name, h in self._stages.items()
+            }
+            counters = self._counters
+            self._stages = {}
+            self._counters = {}
+        return MetricsSnapshot(stages, counters)
+
+    def merge(self, snapshot: MetricsSnapshot) -> None:
+        with self._lock:
+            for name, (buckets, count, total) in snapshot.stages.items():
+                hist = self._stages.get(name)
+                if hist is None:
+                    hist = self._stages[name] = _StageHistogram()
+                hist.buckets = [a + b for a, b in zip(hist.buckets, buckets)]
+                hist.count += count
+                hist.total += total
+            for name, amount in snapshot.counters.items():
+                self._counters[name] = self._counters.get(name, 0.0) + amount
+
+    def stage_totals(self) -> dict[str, tuple[int, float]]:
+        with self._lock:
+            return {name: (h.count, h.total) for name, h in self._stages.items()}
+
+    def counters(self) -> dict[str, float]:
+        with self._lock:
+            readers = dict(self._counter_readers)
+            out = dict(self._counters)
+        for name, read in readers.items():
+            out[name] = out.get(name, 0.0) + read()
+        return out
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            stages = {
+                name: (list(h.buckets), h.count, h.total) for name, h in self._stages.items()
+            }
+            gauges = dict(self._gauges)
+
+        lines = [
+            f"# HELP {_PREFIX}_stage_seconds Wall time spent in each analysis stage.",
+            f"# TYPE {_PREFIX}_stage_seconds histogram",
+        ]
+        for stage, (buckets, count, total) in sorted(stages.items()):
+            cumulative = 0
+            for bound, n in zip(_STAGE_BUCKETS, buckets):
+                cumulative += n
+                lines.append(
+                    f'{_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(f'{_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {total:.9f}')
+            lines.append(f'{_PREFIX}_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        for name, value in sorted(self.counters().items()):
+            lines.append(f"# TYPE {_PREFIX}_{name}_total counter")
+            lines.append(f"{_PREFIX}_{name}_total {value:g}")
+        for name, read in sorted(gauges.items()):
+            lines.append(f"# TYPE {_PREFIX}_{name} gauge")
+            lines.append(f"{_PREFIX}_{name} {read():g}")
+        return "\n".join(lines) + "\n"
+
+
+class Stopwatch:
+    __slots__ = ("_sink", "_last")
+
+    def __init__(self, sink: MetricsSink) -> None:
+        self._sink = sink
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._sink.observe(stage, now - self._last)
+        self._last = now
+
+    def restart(self) -> None:
+        self._last = time.perf_counter()
+
+
+class _NullStopwatch:
+    __slots__ = ()
+
+    def lap(self, stage: str) -> None:
+        pass
+
+    def restart(self) -> None:
+        pass
+
+
+_NULL_STOPWATCH = _NullStopwatch()
+_sink: MetricsSink | None = None
+
+
+def set_metrics_sink(sink: MetricsSink | None) -> None:
+    global _sink
+    _sink = sink
+
+
+def get_metrics_sink() -> MetricsSink | None:
+    return _sink
+
+
+def stopwatch() -> Stopwatch | _NullStopwatch:
+    if _sink is None:
+        return _NULL_STOPWATCH
+    return Stopwatch(_sink)
+
+
+def inc(name: str, amount: float = 1.0) -> None:
+    if _sink is not None:
+        _sink.inc(name, amount)
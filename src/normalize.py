@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import string
+
+_LEET_TABLE = str.maketrans(
+    {
+        "@": "a",
+        "4": "a",
+        "8": "b",
+        "(": "c",
+        "3": "e",
+        "6": "g",
+        "9": "g",
+        "1": "i",
+        "!": "i",
+        "|": "i",
+        "l": "i",
+        "0": "o",
+        "$": "s",
+        "5": "s",
+        "7": "t",
+        "+": "t",
+    }
+)
+_SUFFIX_PUNCTUATION = string.punctuation + " "
+_MIN_VARIANT_LENGTH = 4
+
+VARIANT_KEY_PREFIX = b"\x00"
+
+
+def canonical_form(word: str) -> str:
+    return word.strip().lower().translate(_LEET_TABLE)
+
+
+def variant_candidates(password: str) -> list[str]:
+    base = password.strip().lower()
+    canonical = base.translate(_LEET_TABLE)
+    no_symbols = base.rstrip(_SUFFIX_PUNCTUATION)
+    no_digits = no_symbols.rstrip(string.digits)
+    stripped = no_digits.rstrip(_SUFFIX_PUNCTUATION)
+
+    out: list[str] = []
+    for n in (len(base), len(no_symbols), len(no_digits), len(stripped)):
+        if n >= _MIN_VARIANT_LENGTH and (not out or len(out[-1]) != n):
+            out.append(canonical[:n])
+    return out
+
+
+def variant_key(canonical: str) -> bytes:
+    return VARIANT_KEY_PREFIX + canonical.encode("utf-8", "surrogateescape")
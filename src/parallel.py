@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from src import metrics
+from src.analyzer import MODES, Analysis, iter_reuse, score_passwords
+from src.breach import BreachLookup, FilteredBreachLookup, RangeCache, RangeCacheStats
+from src.dictionary import WordMatcher, load_word_matcher
+from src.metrics import Metrics, MetricsSnapshot
+from src.patterns import MappedCommonPasswordIndex, load_common_password_index
+from src.result_cache import ResultCache, ResultCacheStats
+
+_MIN_CHUNK = 64
+_MAX_CHUNK = 16384
+_TARGET_CHUNK_SECONDS = 0.05
+
+_worker_index: MappedCommonPasswordIndex | None = None
+_worker_mmap: mmap.mmap | None = None
+_worker_breach_lookup: BreachLookup | None = None
+_worker_dictionary: WordMatcher | None = None
+_worker_result_cache: ResultCache | None = None
+_worker_range_cache: RangeCache | None = None
+_worker_reported: tuple[ResultCacheStats | None, RangeCacheStats | None] = (None, None)
+
+
+@dataclass(frozen=True, slots=True)
+class _WorkerStats:
+    result_cache: ResultCacheStats | None
+    range_cache: RangeCacheStats | None
+    metrics: MetricsSnapshot | None
+
+
+def _range_cache(lookup: BreachLookup | None) -> RangeCache | None:
+    if isinstance(lookup, FilteredBreachLookup):
+        lookup = lookup.lookup
+    cache = getattr(lookup, "cache", None)
+    return cache if isinstance(cache, RangeCache) else None
+
+
+def _init_worker(
+    index_path: str,
+    breach_lookup: BreachLookup | None,
+    wordlist_paths: Sequence[Path],
+    result_cache: ResultCache | None,
+    collect_metrics: bool,
+) -> None:
+    global _worker_index, _worker_mmap, _worker_breach_lookup, _worker_dictionary
+    global _worker_result_cache, _worker_range_cache
+    _worker_breach_lookup = breach_lookup
+    _worker_result_cache = result_cache
+    _worker_range_cache = _range_cache(breach_lookup)
+    metrics.set_metrics_sink(Metrics() if collect_metrics else None)
+    _worker_dictionary = load_word_matcher(wordlist_paths) if wordlist_paths else None
+    with open(index_path, "rb") as f:
+        _worker_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker_index = MappedCommonPasswordIndex(_worker_mmap)
+
+
+def _drain_worker_stats() -> _WorkerStats:
+    global _worker_reported
+    result_stats = _worker_result_cache.stats() if _worker_result_cache is not None else None
+    range_stats = _worker_range_cache.stats() if _worker_range_cache is not None else None
+    last_result, last_range = _worker_reported
+    _worker_reported = (result_stats, range_stats)
+    if result_stats is not None and last_result is not None:
+        result_stats = ResultCacheStats(
+            result_stats.hits - last_result.hits,
+            result_stats.misses - last_result.misses,
+            result_stats.breach_hits - last_result.breach_hits,
+            result_stats.breach_misses - last_result.breach_misses,
+            result_stats.evictions - last_result.evictions,
+            result_stats.size,
+        )
+    if range_stats is not None and last_range is not None:
+        range_stats = RangeCacheStats(
+            range_stats.memory_hits - last_range.memory_hits,
+            range_stats.disk_hits - last_range.disk_hits,
+            range_stats.misses - last_range.misses,
+        )
+    sink = metrics.get_metrics_sink()
+    snapshot = sink.drain() if isinstance(sink, Metrics) else None
+    return _WorkerStats(result_stats, range_stats, snapshot)
+
+
+def _merge_worker_stats(
+    stats: _WorkerStats, result_cache: ResultCache | None, range_cache: RangeCache | None
+) -> None:
+    if result_cache is not None and stats.result_cache is not None:
+        result_cache.merge_stats(stats.result_cache)
+    if range_cache is not None and stats.range_cache is not None:
+        range_cache.merge_stats(stats.range_cache)
+    sink = metrics.get_metrics_sink()
+    if isinstance(sink, Metrics) and stats.metrics is not None:
+        sink.merge(stats.metrics)
+
+
+def _analyze_chunk(
+    chunk: list[tuple[str, bool]], check_breach: bool, engine: str, mode: str
+) -> tuple[list[Analysis], float, _WorkerStats]:
+    assert _worker_index is not None
+    started = time.perf_counter()
+    out = score_passwords(
+        chunk,
+        common_index=_worker_index,
+        check_breach=check_breach,
+        breach_lookup=_worker_breach_lookup,
+        engine=engine,
+        dictionary=_worker_dictionary,
+        mode=mode,
+        result_cache=_worker_result_cache,
+    )
+    return out, time.perf_counter() - started, _drain_worker_stats()
+
+
+def _next_chunk_size(size: int, chunk_len: int, elapsed: float) -> int:
+    if chunk_len == 0 or elapsed <= 0:
+        return min(size * 2, _MAX_CHUNK)
+    per_item = elapsed / chunk_len
+    wanted = int(_TARGET_CHUNK_SECONDS / per_item)
+    return max(_MIN_CHUNK, min(_MAX_CHUNK, wanted))
+
+
+def analyze_passwords_parallel(
+    passwords: Iterable[str],
+    *,
+    workers: int,
+    common_passwords_path: Path,
+    history_path: Path,
+    history_pepper: str,
+    check_breach: bool,
+    save_history: bool,
+    breach_lookup: BreachLookup | None = None,
+    engine: str = "python",
+    wordlist_paths: Sequence[Path] = (),
+    mode: str = "full",
+    result_cache: ResultCache | None = None,
+) -> Iterator[Analysis]:
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    if mode not in MODES:
+        raise ValueError(f"Unknown analysis mode: {mode!r}")
+
+    index = load_common_password_index(common_passwords_path)
+    fd, index_path = tempfile.mkstemp(prefix="psc-index-", suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(index.to_bytes())
+
+        range_cache = _range_cache(breach_lookup)
+        pairs = iter_reuse(
+            passwords,
+            history_path=history_path,
+            history_pepper=history_pepper,
+            save_history=save_history,
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                index_path,
+                breach_lookup,
+                tuple(wordlist_paths),
+                result_cache,
+                isinstance(metrics.get_metrics_sink(), Metrics),
+            ),
+        ) as pool:
+            pending: deque[Future[tuple[list[Analysis], float, _WorkerStats]]] = deque()
+            max_pending = workers * 2
+            chunk_size = _MIN_CHUNK
+            exhausted = False
+
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    chunk: list[tuple[str, bool]] = []
+                    for pair in pairs:
+                        chunk.append(pair)
+                        if len(chunk) >= chunk_size:
+                            break
+                    if len(chunk) < chunk_size:
+                        exhausted = True
+                    if chunk:
+                        pending.append(
+                            pool.submit(_analyze_chunk, chunk, check_breach, engine, mode)
+                        )
+
+                if not pending:
+                    break
+
+                results, elapsed, stats = pending.popleft().result()
+                _merge_worker_stats(stats, result_cache, range_cache)
+                chunk_size = _next_chunk_size(chunk_size, len(results), elapsed)
+                yield from results
+    finally:
+        os.unlink(index_path)
@@ -1,50 +1,87 @@
 from __future__ import annotations
 
-import importlib.resources
+import mmap
+import os
+from collections.abc import Callable, Container, Iterable, Mapping, Sequence
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 
+from src.bloom import BloomFilter, filter_sidecar_path
+from src.dictionary import WordMatcher, load_word_matcher
+from src.normalize import canonical_form, variant_candidates, variant_key
+from src.wordlist import (
+    CompiledWordlist,
+    compile_wordlist,
+    compiled_section_count,
+    compiled_wordlist_path,
+    parse_wordlist,
+)
 
-def _build_keyboard_adjacency() -> dict[str, set[str]]:
-    rows = [
-        "`1234567890-=",
-        "qwertyuiop[]\\",
-        "asdfghjkl;'",
-        "zxcvbnm,./",
-    ]
+if TYPE_CHECKING:
+    from src.features import PasswordFeatures
 
-    pos: dict[str, tuple[int, int]] = {}
-    for y, row in enumerate(rows):
-        for x, c in enumerate(row):
-            pos[c] = (x, y)
 
-    adj: dict[str, set[str]] = {}
-    for c, (x0, y0) in pos.items():
-        out: set[str] = set()
-        for dy in (-1, 0, 1):
-            for dx in (-1, 0, 1):
-                if dx == 0 and dy == 0:
-                    continue
-                x = x0 + dx
-                y = y0 + dy
-                if y < 0 or y >= len(rows):
-                    continue
-                row = rows[y]
-                if x < 0 or x >= len(row):
-                    continue
-                out.add(row[x])
-        adj[c] = out
-
-    return adj
-
-
-_KEYBOARD_ADJ = _build_keyboard_adjacency()
+_KEYBOARD_ADJ: Mapping[str, frozenset[str]] = MappingProxyType(
+    {
+        "'": frozenset("/;[]p"),
+        ",": frozenset(".jklm"),
+        "-": frozenset("0=[\\]"),
+        ".": frozenset(",/;kl"),
+        "/": frozenset("'.;l"),
+        "0": frozenset("-9[]p"),
+        "1": frozenset("2`eqw"),
+        "2": frozenset("13erw"),
+        "3": frozenset("24ert"),
+        "4": frozenset("35rty"),
+        "5": frozenset("46tuy"),
+        "6": frozenset("57iuy"),
+        "7": frozenset("68iou"),
+        "8": frozenset("79iop"),
+        "9": frozenset("08[op"),
+        ";": frozenset("'./[lop"),
+        "=": frozenset("-\\]"),
+        "[": frozenset("'-09;]p"),
+        "\\": frozenset("-=]"),
+        "]": frozenset("'-0=[\\"),
+        "`": frozenset("1qw"),
+        "a": frozenset("qswxz"),
+        "b": frozenset("fghnv"),
+        "c": frozenset("dfsvx"),
+        "d": frozenset("cefrsvwx"),
+        "e": frozenset("123dfrsw"),
+        "f": frozenset("bcdegrtv"),
+        "g": frozenset("bfhnrtvy"),
+        "h": frozenset("bgjmntuy"),
+        "i": frozenset("678jklou"),
+        "j": frozenset(",hikmnuy"),
+        "k": frozenset(",.ijlmou"),
+        "l": frozenset(",./;ikop"),
+        "m": frozenset(",hjkn"),
+        "n": frozenset("bghjm"),
+        "o": frozenset("789;iklp"),
+        "p": frozenset("'089;[lo"),
+        "q": frozenset("1`asw"),
+        "r": frozenset("234defgt"),
+        "s": frozenset("acdeqwxz"),
+        "t": frozenset("345fghry"),
+        "u": frozenset("567hijky"),
+        "v": frozenset("bcdfg"),
+        "w": frozenset("12`adeqs"),
+        "x": frozenset("acdsz"),
+        "y": frozenset("456ghjtu"),
+        "z": frozenset("asx"),
+    }
+)
 
 
 @dataclass(frozen=True)
 class PatternHit:
     name: str
     detail: str
+    words: tuple[str, ...] = ()
 
 
 def has_repeated_char_run(password: str, run_len: int = 4) -> bool:
@@ -102,41 +139,270 @@ def has_keyboard_walk(password: str) -> bool:
     return False
 
 
-def is_common_password(password: str, common_passwords_path: Path) -> bool:
-    p = password.strip().lower()
+class CommonPasswordIndex:
+    __slots__ = ("_words", "_variants")
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self._words = frozenset(words)
+        self._variants = frozenset(canonical_form(w) for w in self._words)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, password: object) -> bool:
+        if not isinstance(password, str):
+            return False
+        return password.strip().lower() in self._words
+
+    def contains_variant(self, password: str) -> bool:
+        return any(c in self._variants for c in variant_candidates(password))
+
+    @classmethod
+    def from_text(cls, text: str) -> CommonPasswordIndex:
+        return cls(parse_wordlist(text))
+
+    def to_bytes(self) -> bytes:
+        return compile_wordlist([self._words, self._variants])
+
+
+class MappedCommonPasswordIndex:
+    __slots__ = ("_wordlist", "_words", "_variants")
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        self._wordlist = CompiledWordlist(buffer)
+        if len(self._wordlist.sections) < 2:
+            raise ValueError("Compiled wordlist has no variant section (compile it as 'common')")
+        self._words, self._variants = self._wordlist.sections[:2]
+
+    @classmethod
+    def open(cls, path: Path) -> MappedCommonPasswordIndex:
+        with path.open("rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, password: object) -> bool:
+        if not isinstance(password, str):
+            return False
+        return password.strip().lower().encode("utf-8", "surrogateescape") in self._words
+
+    def contains_variant(self, password: str) -> bool:
+        return any(
+            c.encode("utf-8", "surrogateescape") in self._variants
+            for c in variant_candidates(password)
+        )
+
+    def to_bytes(self) -> bytes:
+        return self._wordlist.to_bytes()
+
+
+class FilteredCommonPasswordIndex:
+    __slots__ = ("_bloom", "_load_exact", "_exact")
+
+    def __init__(
+        self, bloom: BloomFilter, load_exact: Callable[[], ExactCommonPasswordIndex]
+    ) -> None:
+        self._bloom = bloom
+        self._load_exact = load_exact
+        self._exact: ExactCommonPasswordIndex | None = None
+
+    def __contains__(self, password: object) -> bool:
+        if not isinstance(password, str):
+            return False
+        if password.strip().lower().encode("utf-8", "surrogateescape") not in self._bloom:
+            return False
+        return password in self.exact()
+
+    def contains_variant(self, password: str) -> bool:
+        candidates = variant_candidates(password)
+        if not any(variant_key(c) in self._bloom for c in candidates):
+            return False
+        return self.exact().contains_variant(password)
+
+    def exact(self) -> ExactCommonPasswordIndex:
+        if self._exact is None:
+            self._exact = self._load_exact()
+        return self._exact
+
+    def to_bytes(self) -> bytes:
+        return self.exact().to_bytes()
+
+
+ExactCommonPasswordIndex = CommonPasswordIndex | MappedCommonPasswordIndex
+AnyCommonPasswordIndex = ExactCommonPasswordIndex | FilteredCommonPasswordIndex
+
+_EMPTY_INDEX = CommonPasswordIndex(())
+_INDEX_CACHE_MAX = 8
+_index_cache: dict[str, tuple[tuple[int, int, int | None, int | None], AnyCommonPasswordIndex]] = {}
+_packaged_index: CommonPasswordIndex | None = None
+
+
+def _load_packaged_index() -> CommonPasswordIndex:
+    global _packaged_index
+    if _packaged_index is None:
+        import importlib.resources
 
-    if common_passwords_path.exists():
-        lines = common_passwords_path.read_text(encoding="utf-8").splitlines()
-    else:
         try:
-            lines = (
+            text = (
                 importlib.resources.files("src.data")
                 .joinpath("common_passwords.txt")
                 .read_text(encoding="utf-8")
-                .splitlines()
             )
         except (FileNotFoundError, ModuleNotFoundError):
-            return False
+            _packaged_index = _EMPTY_INDEX
+        else:
+            _packaged_index = CommonPasswordIndex.from_text(text)
+    return _packaged_index
 
-    for line in lines:
-        w = line.strip().lower()
-        if not w or w.startswith("#"):
-            continue
-        if p == w:
-            return True
+
+def _fresh_compiled_mtime(common_passwords_path: Path, mtime_ns: int) -> int | None:
+    compiled = compiled_wordlist_path(common_passwords_path)
+    if compiled == common_passwords_path:
+        return None
+    try:
+        compiled_mtime = compiled.stat().st_mtime_ns
+    except OSError:
+        return None
+    return compiled_mtime if compiled_mtime >= mtime_ns else None
+
+
+def _compiled_source(common_passwords_path: Path, fresh_sidecar: bool) -> Path | None:
+    if compiled_section_count(common_passwords_path) is not None:
+        return common_passwords_path
+    compiled = compiled_wordlist_path(common_passwords_path)
+    if fresh_sidecar and (compiled_section_count(compiled) or 0) >= 2:
+        return compiled
+    return None
+
+
+def _read_common_password_index(
+    common_passwords_path: Path, compiled: Path | None = None
+) -> ExactCommonPasswordIndex:
+    if compiled is not None:
+        return MappedCommonPasswordIndex.open(compiled)
+    return CommonPasswordIndex.from_text(common_passwords_path.read_text(encoding="utf-8"))
+
+
+def load_common_password_index(common_passwords_path: Path) -> AnyCommonPasswordIndex:
+    try:
+        st = common_passwords_path.stat()
+    except OSError:
+        return _load_packaged_index()
+
+    sidecar = filter_sidecar_path(common_passwords_path)
+    try:
+        bloom_mtime: int | None = sidecar.stat().st_mtime_ns
+    except OSError:
+        bloom_mtime = None
+    if bloom_mtime is not None and bloom_mtime < st.st_mtime_ns:
+        bloom_mtime = None
+    compiled_mtime = _fresh_compiled_mtime(common_passwords_path, st.st_mtime_ns)
+
+    key = os.fspath(common_passwords_path)
+    stamp = (st.st_mtime_ns, st.st_size, bloom_mtime, compiled_mtime)
+    cached = _index_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    compiled = _compiled_source(common_passwords_path, compiled_mtime is not None)
+
+    bloom: BloomFilter | None = None
+    if bloom_mtime is not None:
+        try:
+            bloom = BloomFilter.load(sidecar)
+        except (OSError, ValueError):
+            bloom = None
+
+    index: AnyCommonPasswordIndex
+    if bloom is None:
+        index = _read_common_password_index(common_passwords_path, compiled)
+    else:
+        index = FilteredCommonPasswordIndex(
+            bloom, partial(_read_common_password_index, common_passwords_path, compiled)
+        )
+
+    _index_cache.pop(key, None)
+    while len(_index_cache) >= _INDEX_CACHE_MAX:
+        del _index_cache[next(iter(_index_cache))]
+    _index_cache[key] = (stamp, index)
+    return index
+
+
+def clear_common_password_cache() -> None:
+    global _packaged_index
+    _index_cache.clear()
+    _packaged_index = None
+
+
+def is_common_password(password: str, common_passwords_path: Path) -> bool:
+    return password in load_common_password_index(common_passwords_path)
+
+
+def is_common_password_variant(password: str, common_passwords_path: Path) -> bool:
+    return _contains_variant(load_common_password_index(common_passwords_path), password)
+
+
+def _contains_variant(common_index: Container[str], password: str) -> bool:
+    if isinstance(
+        common_index,
+        (CommonPasswordIndex, MappedCommonPasswordIndex, FilteredCommonPasswordIndex),
+    ):
+        return common_index.contains_variant(password)
     return False
 
 
-def detect_patterns(password: str, common_passwords_path: Path) -> list[PatternHit]:
+def detect_patterns(
+    password: str, common_passwords_path: Path, wordlist_paths: Sequence[Path] = ()
+) -> list[PatternHit]:
+    return detect_patterns_with_index(
+        password,
+        load_common_password_index(common_passwords_path),
+        dictionary=load_word_matcher(wordlist_paths) if wordlist_paths else None,
+    )
+
+
+def detect_patterns_with_index(
+    password: str,
+    common_index: Container[str],
+    features: PasswordFeatures | None = None,
+    dictionary: WordMatcher | None = None,
+) -> list[PatternHit]:
+    if features is None:
+        repeated = has_repeated_char_run(password)
+        sequence = has_simple_sequence(password)
+        keyboard_walk = has_keyboard_walk(password)
+    else:
+        repeated = features.has_repeated_chars
+        sequence = features.has_sequence
+        keyboard_walk = features.has_keyboard_walk
+
     hits: list[PatternHit] = []
 
-    if has_repeated_char_run(password):
+    if repeated:
         hits.append(PatternHit(name="repeated_chars", detail="Contains repeated character runs"))
-    if has_simple_sequence(password):
+    if sequence:
         hits.append(PatternHit(name="sequence", detail="Contains simple sequential characters"))
-    if has_keyboard_walk(password):
+    if keyboard_walk:
         hits.append(PatternHit(name="keyboard_walk", detail="Contains keyboard-walk patterns"))
-    if is_common_password(password, common_passwords_path):
+    if password in common_index:
         hits.append(PatternHit(name="common_password", detail="Matches a common password"))
+    elif _contains_variant(common_index, password):
+        hits.append(
+            PatternHit(
+                name="common_password_variant",
+                detail="Matches a common password with substitutions or a suffix",
+            )
+        )
+    if dictionary is not None:
+        words = dictionary.find_words(password)
+        if words:
+            hits.append(
+                PatternHit(
+                    name="dictionary_word",
+                    detail=f"Contains dictionary words ({', '.join(words)})",
+                    words=tuple(words),
+                )
+            )
 
     return hits
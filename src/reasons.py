@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+REASON_EMPTY = 0
+REASON_TOO_SHORT = 1
+REASON_ACCEPTABLE_LENGTH = 2
+REASON_GOOD_LENGTH = 3
+REASON_LOW_ENTROPY = 4
+REASON_MODERATE_ENTROPY = 5
+REASON_HIGH_ENTROPY = 6
+REASON_LOW_SHANNON_ENTROPY = 7
+REASON_REPEATED_CHARS = 8
+REASON_SEQUENCE = 9
+REASON_KEYBOARD_WALK = 10
+REASON_COMMON_PASSWORD = 11
+REASON_COMMON_PASSWORD_VARIANT = 12
+REASON_DICTIONARY_WORD = 13
+REASON_REUSED = 14
+REASON_BREACH_UNAVAILABLE = 15
+REASON_BREACHED = 16
+REASON_NOT_BREACHED = 17
+REASON_CHECKS_SKIPPED = 18
+
+_TEMPLATES = (
+    "Password is empty",
+    "Too short (< 8 characters)",
+    "Acceptable length (8–11), but longer is better",
+    "Good length (>= 12)",
+    "Low estimated entropy ({:.1f} bits)",
+    "Moderate estimated entropy ({:.1f} bits)",
+    "High estimated entropy ({:.1f} bits)",
+    "Low Shannon entropy signal ({:.1f} bits)",
+    "Pattern detected: Contains repeated character runs",
+    "Pattern detected: Contains simple sequential characters",
+    "Pattern detected: Contains keyboard-walk patterns",
+    "Pattern detected: Matches a common password",
+    "Pattern detected: Matches a common password with substitutions or a suffix",
+    "Pattern detected: Contains dictionary words ({})",
+    "Password appears to be reused (seen in local history)",
+    "Breach check unavailable (network error)",
+    "Found in breach corpus ({} occurrences)",
+    "Not found in breach corpus (k-anonymity check)",
+    "Remaining checks skipped (label already determined)",
+)
+
+REASON_NAMES = (
+    "empty",
+    "too_short",
+    "acceptable_length",
+    "good_length",
+    "low_entropy",
+    "moderate_entropy",
+    "high_entropy",
+    "low_shannon_entropy",
+    "repeated_chars",
+    "sequence",
+    "keyboard_walk",
+    "common_password",
+    "common_password_variant",
+    "dictionary_word",
+    "reused",
+    "breach_unavailable",
+    "breached",
+    "not_breached",
+    "checks_skipped",
+)
+FAILURE_REASONS = frozenset(
+    (
+        REASON_EMPTY,
+        REASON_TOO_SHORT,
+        REASON_LOW_ENTROPY,
+        REASON_LOW_SHANNON_ENTROPY,
+        REASON_REPEATED_CHARS,
+        REASON_SEQUENCE,
+        REASON_KEYBOARD_WALK,
+        REASON_COMMON_PASSWORD,
+        REASON_COMMON_PASSWORD_VARIANT,
+        REASON_DICTIONARY_WORD,
+        REASON_REUSED,
+        REASON_BREACHED,
+    )
+)
+
+_TAKES_PARAM = frozenset(code for code, template in enumerate(_TEMPLATES) if "{" in template)
+
+PATTERN_REASONS = {
+    "repeated_chars": REASON_REPEATED_CHARS,
+    "sequence": REASON_SEQUENCE,
+    "keyboard_walk": REASON_KEYBOARD_WALK,
+    "common_password": REASON_COMMON_PASSWORD,
+    "common_password_variant": REASON_COMMON_PASSWORD_VARIANT,
+    "dictionary_word": REASON_DICTIONARY_WORD,
+}
+
+
+def takes_param(code: int) -> bool:
+    return code in _TAKES_PARAM
+
+
+def render_reasons(codes: bytes, params: Sequence[float | str]) -> list[str]:
+    out: list[str] = []
+    i = 0
+    for code in codes:
+        template = _TEMPLATES[code]
+        if code in _TAKES_PARAM:
+            out.append(template.format(params[i]))
+            i += 1
+        else:
+            out.append(template)
+    return out
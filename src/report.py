@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol, TextIO
+
+from src.analyzer import Analysis, analysis_payload
+from src.reasons import (
+    FAILURE_REASONS,
+    REASON_BREACH_UNAVAILABLE,
+    REASON_COMMON_PASSWORD,
+    REASON_COMMON_PASSWORD_VARIANT,
+    REASON_DICTIONARY_WORD,
+    REASON_KEYBOARD_WALK,
+    REASON_NAMES,
+    REASON_REPEATED_CHARS,
+    REASON_SEQUENCE,
+)
+
+LABELS = ("weak", "ok", "strong")
+_LABEL_IDS = {label: i for i, label in enumerate(LABELS)}
+
+FLAG_REUSED = 1
+FLAG_BREACHED = 2
+FLAG_BREACH_UNAVAILABLE = 4
+FLAG_COMMON = 8
+FLAG_PATTERN = 16
+FLAG_DICTIONARY_WORD = 32
+
+FORMATS = ("jsonl", "csv", "columnar")
+COLUMNAR_MAGIC = b"PSCR"
+COLUMNAR_VERSION = 1
+
+_COMMON_CODES = (REASON_COMMON_PASSWORD, REASON_COMMON_PASSWORD_VARIANT)
+_PATTERN_CODES = (REASON_REPEATED_CHARS, REASON_SEQUENCE, REASON_KEYBOARD_WALK)
+_FLAG_NAMES = (
+    ("reused", FLAG_REUSED),
+    ("breached", FLAG_BREACHED),
+    ("breach_unavailable", FLAG_BREACH_UNAVAILABLE),
+    ("common_password", FLAG_COMMON),
+    ("weak_pattern", FLAG_PATTERN),
+    ("dictionary_word", FLAG_DICTIONARY_WORD),
+)
+_SCORE_BINS = tuple(f"{lo}-{lo + 9}" for lo in range(0, 90, 10)) + ("90-100",)
+_ENTROPY_BINS = tuple(f"{lo}-{lo + 9}" for lo in range(0, 120, 10)) + ("120+",)
+_TOP_FAILURES = 5
+
+_HEADER = struct.Struct("<4sHH")
+_BLOCK = struct.Struct("<I")
+_BLOCK_ROWS = 4096
+_CSV_FIELDS = (
+    "line",
+    "score",
+    "label",
+    "entropy_bits",
+    "shannon_entropy_bits",
+    "is_reused",
+    "breach_count",
+    "reasons",
+)
+
+
+def _flags(analysis: Analysis) -> int:
+    codes = analysis.reason_codes
+    flags = 0
+    if analysis.is_reused:
+        flags |= FLAG_REUSED
+    if analysis.breach_count:
+        flags |= FLAG_BREACHED
+    if REASON_BREACH_UNAVAILABLE in codes:
+        flags |= FLAG_BREACH_UNAVAILABLE
+    if any(code in codes for code in _COMMON_CODES):
+        flags |= FLAG_COMMON
+    if any(code in codes for code in _PATTERN_CODES):
+        flags |= FLAG_PATTERN
+    if REASON_DICTIONARY_WORD in codes:
+        flags |= FLAG_DICTIONARY_WORD
+    return flags
+
+
+class AnalysisColumns:
+    __slots__ = (
+        "scores",
+        "labels",
+        "flags",
+        "breach_counts",
+        "entropy_bits",
+        "shannon_entropy_bits",
+    )
+
+    def __init__(self) -> None:
+        self.scores = array("B")
+        self.labels = array("B")
+        self.flags = array("B")
+        self.breach_counts = array("i")
+        self.entropy_bits = array("f")
+        self.shannon_entropy_bits = array("f")
+
+    @classmethod
+    def from_analyses(cls, analyses: Iterable[Analysis]) -> AnalysisColumns:
+        columns = cls()
+        for analysis in analyses:
+            columns.append(analysis)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _arrays(self) -> tuple[array[Any], ...]:
+        return (
+            self.scores,
+            self.labels,
+            self.flags,
+            self.breach_counts,
+            self.entropy_bits,
+            self.shannon_entropy_bits,
+        )
+
+    def append(self, analysis: Analysis) -> None:
+        self.scores.append(analysis.score)
+        self.labels.append(_LABEL_IDS[analysis.label])
+        self.flags.append(_flags(analysis))
+        count = analysis.breach_count
+        self.breach_counts.append(-1 if count is None else min(count, 0x7FFFFFFF))
+        self.entropy_bits.append(analysis.entropy_bits)
+        self.shannon_entropy_bits.append(analysis.shannon_entropy_bits)
+
+    def clear(self) -> None:
+        for column in self._arrays():
+            del column[:]
+
+    def label_counts(self) -> dict[str, int]:
+        counts = [0] * len(LABELS)
+        for label in self.labels:
+            counts[label] += 1
+        return dict(zip(LABELS, counts))
+
+    def count_flag(self, flag: int) -> int:
+        return sum(1 for flags in self.flags if flags & flag)
+
+    def to_bytes(self) -> bytes:
+        parts = [_BLOCK.pack(len(self))]
+        for column in self._arrays():
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+
+def read_columnar(stream: BinaryIO) -> Iterator[AnalysisColumns]:
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("Not a columnar audit report")
+    magic, version, _ = _HEADER.unpack(header)
+    if magic != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar audit report")
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar audit report version {version}")
+    while raw := stream.read(_BLOCK.size):
+        if len(raw) < _BLOCK.size:
+            raise ValueError("Truncated columnar audit report")
+        (rows,) = _BLOCK.unpack(raw)
+        block = AnalysisColumns()
+        for column in block._arrays():
+            size = rows * column.itemsize
+            data = stream.read(size)
+            if len(data) < size:
+                raise ValueError("Truncated columnar audit report")
+            column.frombytes(data)
+            if sys.byteorder == "big":
+                column.byteswap()
+        yield block
+
+
+class AuditAggregator:
+    __slots__ = (
+        "count",
+        "label_counts",
+        "score_histogram",
+        "entropy_histogram",
+        "reason_counts",
+        "flag_counts",
+        "score_total",
+        "entropy_total",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.label_counts = [0] * len(LABELS)
+        self.score_histogram = [0] * len(_SCORE_BINS)
+        self.entropy_histogram = [0] * len(_ENTROPY_BINS)
+        self.reason_counts = [0] * len(REASON_NAMES)
+        self.flag_counts = [0] * len(_FLAG_NAMES)
+        self.score_total = 0
+        self.entropy_total = 0.0
+
+    def add(self, analysis: Analysis) -> None:
+        self.count += 1
+        self.label_counts[_LABEL_IDS[analysis.label]] += 1
+        self.score_histogram[min(analysis.score // 10, len(_SCORE_BINS) - 1)] += 1
+        self.entropy_histogram[min(int(analysis.entropy_bits // 10), len(_ENTROPY_BINS) - 1)] += 1
+        for code in set(analysis.reason_codes):
+            self.reason_counts[code] += 1
+        flags = _flags(analysis)
+        for i, (_, flag) in enumerate(_FLAG_NAMES):
+            if flags & flag:
+                self.flag_counts[i] += 1
+        self.score_total += analysis.score
+        self.entropy_total += analysis.entropy_bits
+
+    def summary(self) -> dict[str, Any]:
+        n = self.count
+        failures = sorted(
+            (code for code in FAILURE_REASONS if self.reason_counts[code]),
+            key=lambda code: (-self.reason_counts[code], code),
+        )
+        return {
+            "count": n,
+            "labels": dict(zip(LABELS, self.label_counts)),
+            "weak_fraction": self.label_counts[0] / n if n else 0.0,
+            "mean_score": self.score_total / n if n else 0.0,
+            "mean_entropy_bits": self.entropy_total / n if n else 0.0,
+            **{name: count for (name, _), count in zip(_FLAG_NAMES, self.flag_counts)},
+            "top_failures": [
+                {
+                    "reason": REASON_NAMES[code],
+                    "count": self.reason_counts[code],
+                    "fraction": self.reason_counts[code] / n,
+                }
+                for code in failures[:_TOP_FAILURES]
+            ],
+            "score_histogram": dict(zip(_SCORE_BINS, self.score_histogram)),
+            "entropy_histogram": dict(zip(_ENTROPY_BINS, self.entropy_histogram)),
+        }
+
+
+class JsonlWriter:
+    def __init__(self, stream: TextIO) -> None:
+        import json
+
+        self._stream = stream
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+        self._line = 0
+
+    def write(self, analysis: Analysis) -> None:
+        self._line += 1
+        payload = {"line": self._line, **analysis_payload(analysis)}
+        self._stream.write(self._encode(payload) + "\n")
+
+    def close(self) -> None:
+        self._stream.flush()
+
+
+class CsvWriter:
+    def __init__(self, stream: TextIO) -> None:
+        import csv
+
+        self._stream = stream
+        self._writer = csv.writer(stream, lineterminator="\n")
+        self._writer.writerow(_CSV_FIELDS)
+        self._line = 0
+
+    def write(self, analysis: Analysis) -> None:
+        self._line += 1
+        self._writer.writerow(
+            (
+                self._line,
+                analysis.score,
+                analysis.label,
+                f"{analysis.entropy_bits:.1f}",
+                f"{analysis.shannon_entropy_bits:.1f}",
+                int(analysis.is_reused),
+                "" if analysis.breach_count is None else analysis.breach_count,
+                "; ".join(analysis.reasons),
+            )
+        )
+
+    def close(self) -> None:
+        self._stream.flush()
+
+
+class ColumnarWriter:
+    def __init__(self, stream: BinaryIO, block_rows: int = _BLOCK_ROWS) -> None:
+        if block_rows < 1:
+            raise ValueError("block_rows must be >= 1")
+        self._stream = stream
+        self._block = AnalysisColumns()
+        self._block_rows = block_rows
+        stream.write(_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, 0))
+
+    def write(self, analysis: Analysis) -> None:
+        self._block.append(analysis)
+        if len(self._block) >= self._block_rows:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        if len(self._block):
+            self._stream.write(self._block.to_bytes())
+            self._block.clear()
+
+    def close(self) -> None:
+        self._flush_block()
+        self._stream.flush()
+
+
+class ReportWriter(Protocol):
+    def write(self, analysis: Analysis) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class _OwnedWriter:
+    def __init__(self, writer: ReportWriter, stream: TextIO | BinaryIO | None) -> None:
+        self._writer = writer
+        self._stream = stream
+
+    def write(self, analysis: Analysis) -> None:
+        self._writer.write(analysis)
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._stream is not None:
+            self._stream.close()
+
+
+def open_report_writer(fmt: str, path: Path | None = None) -> ReportWriter:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format: {fmt!r}")
+    if fmt == "columnar":
+        binary = sys.stdout.buffer if path is None else path.open("wb", buffering=1 << 16)
+        return _OwnedWriter(ColumnarWriter(binary), None if path is None else binary)
+    text = (
+        sys.stdout
+        if path is None
+        else path.open("w", encoding="utf-8", newline="", buffering=1 << 16)
+    )
+    writer: ReportWriter
+    if fmt == "jsonl":
+        writer = JsonlWriter(text)
+    else:
+        writer = CsvWriter(text)
+    return _OwnedWriter(writer, None if path is None else text)
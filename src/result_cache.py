@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.features import PasswordFeatures
+from src.reuse import _digest_password
+
+
+@dataclass(frozen=True, slots=True)
+class LocalResult:
+    features: PasswordFeatures
+    score: int
+    reason_codes: bytes
+    reason_params: tuple[float | str, ...]
+    next_stage: int
+
+
+@dataclass(frozen=True)
+class ResultCacheStats:
+    hits: int
+    misses: int
+    breach_hits: int
+    breach_misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Entry:
+    __slots__ = ("local", "scope", "breach_count", "breach_stored_at")
+
+    def __init__(self) -> None:
+        self.local: LocalResult | None = None
+        self.scope = 0
+        self.breach_count: int | None = None
+        self.breach_stored_at = 0.0
+
+
+_MAX_SCOPES = 8
+
+
+def _restore_result_cache(pepper: str, max_entries: int, breach_ttl_seconds: float) -> ResultCache:
+    return ResultCache(
+        pepper=pepper, max_entries=max_entries, breach_ttl_seconds=breach_ttl_seconds
+    )
+
+
+class ResultCache:
+    def __init__(
+        self,
+        *,
+        pepper: str = "",
+        max_entries: int = 65536,
+        breach_ttl_seconds: float = 60 * 60,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.pepper = pepper or secrets.token_hex(32)
+        self.max_entries = max_entries
+        self.breach_ttl_seconds = breach_ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._breach_hits = 0
+        self._breach_misses = 0
+        self._evictions = 0
+        self._scopes: OrderedDict[tuple[int, ...], tuple[int, tuple[object, ...]]] = OrderedDict()
+        self._last_scope = 0
+
+    def __reduce__(
+        self,
+    ) -> tuple[Callable[..., ResultCache], tuple[str, int, float]]:
+        return (
+            _restore_result_cache,
+            (self.pepper, self.max_entries, self.breach_ttl_seconds),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def key(self, password: str) -> str:
+        return _digest_password(password, self.pepper)
+
+    def scope(self, *config: object) -> int:
+        ids = tuple(id(part) for part in config)
+        with self._lock:
+            found = self._scopes.get(ids)
+            if found is None:
+                self._last_scope += 1
+                found = self._scopes[ids] = (self._last_scope, config)
+                while len(self._scopes) > _MAX_SCOPES:
+                    self._scopes.popitem(last=False)
+            else:
+                self._scopes.move_to_end(ids)
+            return found[0]
+
+    def stats(self) -> ResultCacheStats:
+        with self._lock:
+            return ResultCacheStats(
+                self._hits,
+                self._misses,
+                self._breach_hits,
+                self._breach_misses,
+                self._evictions,
+                len(self._entries),
+            )
+
+    def merge_stats(self, stats: ResultCacheStats) -> None:
+        with self._lock:
+            self._hits += stats.hits
+            self._misses += stats.misses
+            self._breach_hits += stats.breach_hits
+            self._breach_misses += stats.breach_misses
+            self._evictions += stats.evictions
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: str, scope: int = 0) -> LocalResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.local is None or entry.scope != scope:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.local
+
+    def put(self, key: str, result: LocalResult, scope: int = 0) -> None:
+        with self._lock:
+            entry = self._entry(key)
+            entry.local = result
+            entry.scope = scope
+
+    def get_breach(self, key: str) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.breach_count is None:
+                self._breach_misses += 1
+                return None
+            if now - entry.breach_stored_at >= self.breach_ttl_seconds:
+                entry.breach_count = None
+                self._breach_misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._breach_hits += 1
+            return entry.breach_count
+
+    def put_breach(self, key: str, count: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry(key)
+            entry.breach_count = count
+            entry.breach_stored_at = now
+
+    def _entry(self, key: str) -> _Entry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        else:
+            self._entries.move_to_end(key)
+        return entry
@@ -1,10 +1,42 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import os
+import sys
+import threading
+from collections.abc import Container, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 
+_HISTORY_MAGIC = b"PSCHIST1"
+_DIGEST_SIZE = 32
+_COMPACT_MIN_RECORDS = 1024
+_COMPACT_DUPLICATE_RATIO = 0.25
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(fd: int) -> None:
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
 
 @dataclass(frozen=True)
 class ReuseResult:
@@ -16,43 +48,213 @@ def _digest_password(password: str, pepper: str) -> str:
     h = hashlib.sha256()
     h.update(pepper.encode("utf-8"))
     h.update(b"\x00")
-    h.update(password.encode("utf-8"))
+    h.update(password.encode("utf-8", "surrogateescape"))
     return h.hexdigest()
 
 
-def _load_history(path: Path) -> set[str]:
-    if not path.exists():
-        return set()
+def _load_json_history(data: bytes) -> set[bytes] | None:
+    import json
 
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return set()
+        parsed = json.loads(data.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
 
-    items = data.get("digests") if isinstance(data, dict) else None
+    items = parsed.get("digests") if isinstance(parsed, dict) else None
     if not isinstance(items, list):
-        return set()
+        return None
 
-    out: set[str] = set()
+    out: set[bytes] = set()
     for x in items:
         if isinstance(x, str) and len(x) == 64:
-            out.add(x)
+            try:
+                out.add(bytes.fromhex(x))
+            except ValueError:
+                continue
     return out
 
 
-def _save_history(path: Path, digests: set[str]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {"digests": sorted(digests)}
-    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+class HistoryStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock_path = path.with_name(path.name + ".lock")
+        self._digests: set[bytes] = set()
+        self._records = 0
+        self._offset = 0
+        self._inode: int | None = None
+        self._mutex = threading.RLock()
+        self._compacting = False
+
+    def __len__(self) -> int:
+        with self._mutex:
+            self._refresh()
+            return len(self._digests)
+
+    def __contains__(self, digest_hex: object) -> bool:
+        if not isinstance(digest_hex, str):
+            return False
+        try:
+            digest = bytes.fromhex(digest_hex)
+        except ValueError:
+            return False
+        with self._mutex:
+            self._refresh()
+            return digest in self._digests
+
+    def refresh(self) -> None:
+        with self._mutex:
+            self._refresh()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            _lock_file(fd)
+            try:
+                yield
+            finally:
+                _unlock_file(fd)
+        finally:
+            os.close(fd)
+
+    def _reset(self) -> None:
+        self._digests = set()
+        self._records = 0
+        self._offset = 0
+        self._inode = None
+
+    def _refresh(self) -> None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+        if st.st_ino == self._inode and st.st_size == self._offset:
+            return
+
+        legacy = False
+        tail = b""
+        with self.path.open("rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset()
+            if self._offset == 0:
+                if f.read(len(_HISTORY_MAGIC)) == _HISTORY_MAGIC:
+                    self._offset = len(_HISTORY_MAGIC)
+                else:
+                    legacy = True
+            if not legacy:
+                f.seek(self._offset)
+                tail = f.read((st.st_size - self._offset) // _DIGEST_SIZE * _DIGEST_SIZE)
+
+        if legacy:
+            if st.st_size:
+                self._migrate()
+                self._refresh()
+            return
+
+        for i in range(0, len(tail), _DIGEST_SIZE):
+            self._digests.add(tail[i : i + _DIGEST_SIZE])
+        self._records += len(tail) // _DIGEST_SIZE
+        self._offset += len(tail)
+        self._inode = st.st_ino
+
+    def _migrate(self) -> None:
+        with self._file_lock():
+            data = self.path.read_bytes()
+            if data.startswith(_HISTORY_MAGIC):
+                return
+            digests = _load_json_history(data)
+            if digests is None:
+                self._back_up()
+                digests = set()
+            self._write_atomically(sorted(digests))
+
+    def _back_up(self) -> None:
+        backup = self.path.with_name(self.path.name + ".bak")
+        n = 1
+        while backup.exists():
+            backup = self.path.with_name(f"{self.path.name}.bak{n}")
+            n += 1
+        os.replace(self.path, backup)
+
+    def _write_atomically(self, digests: list[bytes]) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_HISTORY_MAGIC)
+            f.write(b"".join(digests))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def add(self, digest_hex: str) -> None:
+        digest = bytes.fromhex(digest_hex)
+        if len(digest) != _DIGEST_SIZE:
+            raise ValueError("History digests must be SHA-256 hex strings")
+
+        with self._mutex:
+            self._refresh()
+            if digest in self._digests:
+                return
+            with self._file_lock():
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    if os.fstat(fd).st_size == 0:
+                        os.write(fd, _HISTORY_MAGIC)
+                    os.write(fd, digest)
+                finally:
+                    os.close(fd)
+            self._refresh()
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self._compacting or self._records < _COMPACT_MIN_RECORDS:
+            return
+        duplicates = self._records - len(self._digests)
+        if duplicates < self._records * _COMPACT_DUPLICATE_RATIO:
+            return
+        self._compacting = True
+        threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        finally:
+            self._compacting = False
+
+    def compact(self) -> None:
+        with self._mutex:
+            self._refresh()
+            with self._file_lock():
+                self._reset()
+                self._refresh()
+                self._write_atomically(sorted(self._digests))
+            self._reset()
+            self._refresh()
+
+
+_stores: dict[str, HistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_history(history_path: Path) -> HistoryStore:
+    key = os.fspath(history_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = HistoryStore(history_path)
+        return store
 
 
 def check_reuse(password: str, history_path: Path, pepper: str) -> ReuseResult:
+    return check_reuse_in(password, open_history(history_path), pepper)
+
+
+def check_reuse_in(password: str, digests: Container[str], pepper: str) -> ReuseResult:
     digest = _digest_password(password, pepper)
-    digests = _load_history(history_path)
     return ReuseResult(is_reused=digest in digests, digest_hex=digest)
 
 
 def save_to_history(digest_hex: str, history_path: Path) -> None:
-    digests = _load_history(history_path)
-    digests.add(digest_hex)
-    _save_history(history_path, digests)
+    open_history(history_path).add(digest_hex)
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import socketserver
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from src import metrics
+from src.analyzer import MODES, Analysis, analysis_payload, iter_reuse, score_passwords
+from src.breach import BreachLookup
+from src.dictionary import load_word_matcher
+from src.metrics import Metrics, get_metrics_sink
+from src.patterns import load_common_password_index
+from src.result_cache import ResultCache
+from src.reuse import open_history
+
+_MAX_REQUEST_BYTES = 1 << 20
+_REQUEST_TIMEOUT_SECONDS = 30.0
+
+_log = logging.getLogger(__name__)
+
+
+class ServiceBusy(RuntimeError):
+    pass
+
+
+class BadRequest(ValueError):
+    pass
+
+
+@dataclass
+class _Job:
+    passwords: list[str]
+    save_history: bool
+    future: Future[list[Analysis]] = field(default_factory=Future)
+
+
+class AnalysisService:
+    def __init__(
+        self,
+        *,
+        common_passwords_path: Path,
+        history_path: Path,
+        history_pepper: str,
+        check_breach: bool,
+        breach_lookup: BreachLookup | None = None,
+        wordlist_paths: Sequence[Path] = (),
+        mode: str = "full",
+        result_cache: ResultCache | None = None,
+        max_batch: int = 256,
+        max_queue: int = 1024,
+    ) -> None:
+        if max_batch < 1 or max_queue < 1:
+            raise ValueError("max_batch and max_queue must be >= 1")
+        if mode not in MODES:
+            raise ValueError(f"Unknown analysis mode: {mode!r}")
+        self.history_path = history_path
+        self.history_pepper = history_pepper
+        self.check_breach = check_breach
+        self.breach_lookup = breach_lookup
+        self.mode = mode
+        self.result_cache = result_cache
+        self.max_batch = max_batch
+        self.common_index = load_common_password_index(common_passwords_path)
+        self.dictionary = load_word_matcher(wordlist_paths) if wordlist_paths else None
+        self.history = open_history(history_path)
+        self.history.refresh()
+
+        self._queue: queue.Queue[_Job | None] = queue.Queue(max_queue)
+        self._worker = threading.Thread(target=self._run, name="analysis-batcher", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> AnalysisService:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, passwords: list[str], *, save_history: bool = False) -> Future[list[Analysis]]:
+        if save_history and not self.history_pepper:
+            raise BadRequest("PASSWORD_HISTORY_PEPPER must be set to use history tracking")
+        job = _Job(passwords, save_history)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise ServiceBusy("Analysis queue is full") from None
+        return job.future
+
+    def analyze(self, passwords: list[str], *, save_history: bool = False) -> list[Analysis]:
+        future = self.submit(passwords, save_history=save_history)
+        try:
+            return future.result(_REQUEST_TIMEOUT_SECONDS)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+
+    def _next_batch(self) -> list[_Job] | None:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        size = len(first.passwords)
+        while size < self.max_batch:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)
+                break
+            batch.append(job)
+            size += len(job.passwords)
+        return batch
+
+    def _run(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            metrics.inc("server_batches")
+            metrics.inc("server_requests", len(batch))
+            try:
+                pairs: list[tuple[str, bool]] = []
+                for job in batch:
+                    pairs.extend(
+                        iter_reuse(
+                            job.passwords,
+                            history_path=self.history_path,
+                            history_pepper=self.history_pepper,
+                            save_history=job.save_history,
+                        )
+                    )
+                results = score_passwords(
+                    pairs,
+                    common_index=self.common_index,
+                    check_breach=self.check_breach,
+                    breach_lookup=self.breach_lookup,
+                    dictionary=self.dictionary,
+                    mode=self.mode,
+                    result_cache=self.result_cache,
+                )
+            except Exception as e:
+                for job in batch:
+                    job.future.set_exception(e)
+                continue
+
+            start = 0
+            for job in batch:
+                end = start + len(job.passwords)
+                job.future.set_result(results[start:end])
+                start = end
+
+
+def _parse_request(body: bytes) -> tuple[list[str], bool, bool]:
+    try:
+        request = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise BadRequest("Request body must be JSON") from None
+    if not isinstance(request, dict):
+        raise BadRequest("Request must be a JSON object")
+
+    save_history = request.get("save_history", False)
+    if not isinstance(save_history, bool):
+        raise BadRequest("save_history must be a boolean")
+
+    if "passwords" in request:
+        passwords = request["passwords"]
+        if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+            raise BadRequest("passwords must be a list of strings")
+    else:
+        password = request.get("password")
+        if not isinstance(password, str):
+            raise BadRequest("password must be a string")
+        passwords = [password]
+
+    for password in passwords:
+        try:
+            password.encode("utf-8", "surrogateescape")
+        except UnicodeEncodeError:
+            raise BadRequest("Passwords must not contain unpaired surrogates") from None
+    return passwords, save_history, "passwords" in request
+
+
+def handle_request(service: AnalysisService, body: bytes) -> tuple[int, dict[str, Any]]:
+    try:
+        passwords, save_history, many = _parse_request(body)
+        results = service.analyze(passwords, save_history=save_history)
+    except BadRequest as e:
+        return 400, {"error": str(e)}
+    except ServiceBusy as e:
+        return 503, {"error": str(e)}
+    except TimeoutError:
+        return 504, {"error": "Analysis timed out"}
+    except Exception:
+        _log.exception("Analysis request failed")
+        return 500, {"error": "Internal server error"}
+
+    if many:
+        return 200, {"results": [analysis_payload(a) for a in results]}
+    return 200, analysis_payload(results[0])
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: _HTTPServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, payload: dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            self._send_metrics()
+            return
+        if self.path != "/health":
+            self._send(404, {"error": "Not found"})
+            return
+        self._send(200, {"status": "ok", "queued": self.server.service.queued})
+
+    def _send_metrics(self) -> None:
+        sink = get_metrics_sink()
+        if not isinstance(sink, Metrics):
+            self._send(404, {"error": "Metrics are disabled"})
+            return
+        data = sink.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        if self.path != "/analyze":
+            self._send(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._send(411, {"error": "Content-Length required"})
+            return
+        if length < 0:
+            self.close_connection = True
+            self._send(400, {"error": "Invalid Content-Length"})
+            return
+        if length > _MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": "Request body too large"})
+            return
+        self._send(*handle_request(self.server.service, self.rfile.read(length)))
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, service: AnalysisService) -> None:
+        self.service = service
+        super().__init__(("127.0.0.1", port), _HTTPHandler)
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    server: _UnixServer
+
+    def handle(self) -> None:
+        while line := self.rfile.readline(_MAX_REQUEST_BYTES + 1):
+            payload: dict[str, Any]
+            if len(line) > _MAX_REQUEST_BYTES:
+                status, payload = 413, {"error": "Request body too large"}
+            else:
+                status, payload = handle_request(self.server.service, line)
+            if status != 200:
+                payload = {"status": status, **payload}
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if status == 413:
+                return
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, service: AnalysisService) -> None:
+        self.service = service
+        self.path = path
+        if path.is_socket():
+            path.unlink()
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(os.fspath(path), _UnixHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def make_http_server(service: AnalysisService, port: int) -> socketserver.BaseServer:
+    return _HTTPServer(port, service)
+
+
+def make_unix_server(service: AnalysisService, path: Path) -> socketserver.BaseServer:
+    return _UnixServer(path, service)
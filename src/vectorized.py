@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+from collections.abc import Sequence
+from typing import Any
+
+from src.features import (
+    _ASCII_CLASSES,
+    _CLASS_SIZES,
+    PasswordFeatures,
+    _char_classes,
+    extract_features,
+)
+from src.patterns import _KEYBOARD_ADJ
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+ENGINES = ("python", "vectorized", "auto")
+
+_MAX_VECTOR_WIDTH = 256
+
+_CHARSET_BITS = {
+    bits: max(sum(size for flag, size in _CLASS_SIZES if bits & flag), 1) for bits in range(32)
+}
+_LOG2_CHARSET = [math.log2(_CHARSET_BITS[bits]) for bits in range(32)]
+
+
+def _shannon_table() -> Any:
+    table = np.zeros((_MAX_VECTOR_WIDTH + 1, _MAX_VECTOR_WIDTH + 1), dtype=np.float64)
+    for n in range(1, _MAX_VECTOR_WIDTH + 1):
+        for count in range(1, n + 1):
+            p = count / n
+            table[n, count] = p * math.log2(p)
+    return table
+
+
+def _keyboard_table() -> Any:
+    table = np.zeros((128, 128), dtype=bool)
+    for a, neighbours in _KEYBOARD_ADJ.items():
+        for b in neighbours:
+            table[ord(a), ord(b)] = True
+    return table
+
+
+np: Any = None
+_keyboard_lookup: Any = None
+_shannon_terms: Any = None
+
+
+def _load_numpy() -> None:
+    global np, _keyboard_lookup, _shannon_terms
+    import numpy
+
+    np = numpy
+    _keyboard_lookup = _keyboard_table()
+    _shannon_terms = _shannon_table()
+
+
+def _encode(passwords: Sequence[str], width: int) -> Any:
+    if width == 0:
+        return np.zeros((len(passwords), 0), dtype=np.uint32)
+    return np.array(passwords, dtype=f"<U{width}").view(np.uint32).reshape(len(passwords), width)
+
+
+def _longest_runs(pairs: Any) -> Any:
+    current = np.zeros(pairs.shape[0], dtype=np.int64)
+    best = np.zeros(pairs.shape[0], dtype=np.int64)
+    for j in range(pairs.shape[1]):
+        current = (current + 1) * pairs[:, j]
+        np.maximum(best, current, out=best)
+    return best
+
+
+def _vectorized_features(passwords: Sequence[str]) -> list[PasswordFeatures]:
+    if np is None:
+        _load_numpy()
+
+    count = len(passwords)
+    lengths = np.fromiter((len(pw) for pw in passwords), dtype=np.int64, count=count)
+    width = int(lengths.max()) if count else 0
+    codes = _encode(passwords, width)
+    lowered = _encode([pw.lower() for pw in passwords], width)
+    columns = np.arange(width)
+    valid = columns[None, :] < lengths[:, None]
+
+    uniques, inverse = np.unique(codes, return_inverse=True)
+    class_of_unique = np.fromiter(
+        (_ASCII_CLASSES.get(chr(c)) or _char_classes(chr(c)) for c in uniques.tolist()),
+        dtype=np.int64,
+        count=len(uniques),
+    )
+    char_classes = class_of_unique[inverse.reshape(codes.shape)] * valid
+    class_bits = np.bitwise_or.reduce(char_classes, axis=1)
+    entropy = lengths * np.asarray(_LOG2_CHARSET)[class_bits]
+    charset = np.asarray([_CHARSET_BITS[b] for b in range(32)])[class_bits]
+
+    rows = np.nonzero(valid)[0]
+    flat = codes[valid]
+    order = np.lexsort((flat, rows))
+    rows_sorted = rows[order]
+    flat_sorted = flat[order]
+    starts = np.ones(len(flat_sorted), dtype=bool)
+    starts[1:] = (rows_sorted[1:] != rows_sorted[:-1]) | (flat_sorted[1:] != flat_sorted[:-1])
+    start_idx = np.nonzero(starts)[0]
+    run_counts = np.diff(np.append(start_idx, len(flat_sorted)))
+    run_rows = rows_sorted[start_idx]
+    first_seen = np.argsort(order[start_idx], kind="stable")
+    run_rows = run_rows[first_seen]
+    terms = _shannon_terms[lengths[run_rows], run_counts[first_seen]]
+    h = np.bincount(run_rows, weights=-terms, minlength=count)
+    shannon = h * lengths
+
+    pair_valid = valid[:, 1:]
+    repeat = _longest_runs((codes[:, 1:] == codes[:, :-1]) & pair_valid)
+    diff = lowered[:, 1:].astype(np.int64) - lowered[:, :-1].astype(np.int64)
+    up = _longest_runs((diff == 1) & pair_valid)
+    down = _longest_runs((diff == -1) & pair_valid)
+    prev, cur = lowered[:, :-1], lowered[:, 1:]
+    ascii_pair = (prev < 128) & (cur < 128)
+    adjacent = _keyboard_lookup[np.minimum(prev, 127), np.minimum(cur, 127)] & ascii_pair
+    keyboard = _longest_runs(adjacent & pair_valid)
+
+    has_chars = (lengths > 0).astype(np.int64)
+    features: list[PasswordFeatures] = []
+    for i, n in enumerate(lengths.tolist()):
+        base = int(has_chars[i])
+        features.append(
+            PasswordFeatures(
+                length=n,
+                charset_size=int(charset[i]),
+                entropy_bits=float(entropy[i]) if n else 0.0,
+                shannon_entropy_bits=float(shannon[i]) if n else 0.0,
+                longest_repeat_run=int(repeat[i]) + base,
+                longest_sequence_run=max(int(up[i]), int(down[i])) + base,
+                longest_keyboard_run=int(keyboard[i]) + base,
+            )
+        )
+    return features
+
+
+def extract_features_batch(
+    passwords: Sequence[str], *, engine: str = "auto"
+) -> list[PasswordFeatures]:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown feature engine: {engine!r}")
+    if engine == "vectorized" and not HAVE_NUMPY:
+        raise RuntimeError("The vectorized engine requires numpy (pip install '.[vectorized]')")
+    if engine == "python" or not HAVE_NUMPY or not passwords:
+        return [extract_features(pw) for pw in passwords]
+
+    out: list[PasswordFeatures | None] = [None] * len(passwords)
+    batch_idx: list[int] = []
+    for i, pw in enumerate(passwords):
+        if len(pw) > _MAX_VECTOR_WIDTH or len(pw.lower()) != len(pw):
+            out[i] = extract_features(pw)
+        else:
+            batch_idx.append(i)
+
+    if batch_idx:
+        computed = _vectorized_features([passwords[i] for i in batch_idx])
+        for i, f in zip(batch_idx, computed):
+            out[i] = f
+
+    return [f for f in out if f is not None]
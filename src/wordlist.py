@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from src.normalize import canonical_form
+
+WORDLIST_MAGIC = b"PSCW"
+WORDLIST_VERSION = 1
+KINDS = ("common", "words")
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<III")
+_U32 = struct.Struct("<I")
+_BLOCK_SIZE = 16
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(data: memoryview | bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _shared_prefix(a: bytes, b: bytes) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) >> 1
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _pack_section(words: Iterable[str]) -> bytes:
+    encoded = sorted({w.encode("utf-8") for w in words})
+    offsets: list[int] = []
+    data = bytearray()
+    prev = b""
+    for i, word in enumerate(encoded):
+        if i % _BLOCK_SIZE == 0:
+            offsets.append(len(data))
+            shared = 0
+        else:
+            shared = _shared_prefix(prev, word)
+            data += _varint(shared) if shared >= 0x80 else bytes((shared,))
+        suffix = len(word) - shared
+        data += _varint(suffix) if suffix >= 0x80 else bytes((suffix,))
+        data += word[shared:] if shared else word
+        prev = word
+    offsets.append(len(data))
+    max_len = max((len(w) for w in encoded), default=0)
+    return (
+        _SECTION.pack(len(encoded), len(offsets) - 1, max_len)
+        + struct.pack(f"<{len(offsets)}I", *offsets)
+        + bytes(data)
+    )
+
+
+def compile_wordlist(sections: Iterable[Iterable[str]]) -> bytes:
+    packed = [_pack_section(words) for words in sections]
+    starts: list[int] = []
+    pos = _HEADER.size + _U32.size * len(packed)
+    for section in packed:
+        starts.append(pos)
+        pos += len(section)
+    return (
+        _HEADER.pack(WORDLIST_MAGIC, WORDLIST_VERSION, len(packed))
+        + b"".join(_U32.pack(s) for s in starts)
+        + b"".join(packed)
+    )
+
+
+def parse_wordlist(text: str) -> set[str]:
+    words: set[str] = set()
+    for line in text.splitlines():
+        w = line.strip().lower()
+        if w and not w.startswith("#"):
+            words.add(w)
+    return words
+
+
+def compile_wordlist_file(source: Path, output: Path, kind: str = "words") -> int:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown wordlist kind: {kind!r}")
+    words = parse_wordlist(source.read_text(encoding="utf-8"))
+    sections = [words]
+    if kind == "common":
+        sections.append({canonical_form(w) for w in words})
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    tmp.write_bytes(compile_wordlist(sections))
+    os.replace(tmp, output)
+    return len(words)
+
+
+def compiled_wordlist_path(path: Path) -> Path:
+    return path.with_suffix(".bin")
+
+
+def is_compiled_wordlist(path: Path) -> bool:
+    try:
+        with path.open("rb") as f:
+            return f.read(len(WORDLIST_MAGIC)) == WORDLIST_MAGIC
+    except OSError:
+        return False
+
+
+def compiled_section_count(path: Path) -> int | None:
+    try:
+        with path.open("rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, count = _HEADER.unpack(header)
+    if magic != WORDLIST_MAGIC or version != WORDLIST_VERSION:
+        return None
+    return int(count)
+
+
+class CompiledSection:
+    __slots__ = ("count", "max_len", "_blocks", "_offsets", "_data")
+
+    def __init__(self, view: memoryview, start: int) -> None:
+        count, blocks, max_len = _SECTION.unpack_from(view, start)
+        self.count: int = count
+        self.max_len: int = max_len
+        self._blocks: int = blocks
+        offsets_start = start + _SECTION.size
+        offsets_end = offsets_start + _U32.size * (self._blocks + 1)
+        self._offsets = view[offsets_start:offsets_end].cast("I")
+        self._data = view[offsets_end : offsets_end + self._offsets[self._blocks]]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _head(self, block: int) -> bytes:
+        n, pos = _read_varint(self._data, self._offsets[block])
+        return bytes(self._data[pos : pos + n])
+
+    def _block_words(self, block: int) -> Iterator[bytes]:
+        data = self._data
+        pos = self._offsets[block]
+        end = self._offsets[block + 1]
+        n, pos = _read_varint(data, pos)
+        word = bytes(data[pos : pos + n])
+        pos += n
+        yield word
+        while pos < end:
+            shared, pos = _read_varint(data, pos)
+            n, pos = _read_varint(data, pos)
+            word = word[:shared] + bytes(data[pos : pos + n])
+            pos += n
+            yield word
+
+    def __contains__(self, target: object) -> bool:
+        if isinstance(target, str):
+            target = target.encode("utf-8", "surrogateescape")
+        if not isinstance(target, bytes) or len(target) > self.max_len:
+            return False
+        lo, hi = 0, self._blocks
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._head(mid) <= target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return False
+        for word in self._block_words(lo - 1):
+            if word >= target:
+                return word == target
+        return False
+
+    def __iter__(self) -> Iterator[str]:
+        for block in range(self._blocks):
+            for word in self._block_words(block):
+                yield word.decode("utf-8")
+
+
+class CompiledWordlist:
+    __slots__ = ("_buffer", "sections")
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        view = memoryview(buffer)
+        try:
+            magic, version, count = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError("Not a compiled wordlist") from None
+        if magic != WORDLIST_MAGIC:
+            raise ValueError("Not a compiled wordlist")
+        if version != WORDLIST_VERSION:
+            raise ValueError(f"Unsupported compiled wordlist version {version}")
+        self._buffer = buffer
+        self.sections = tuple(
+            CompiledSection(view, _U32.unpack_from(view, _HEADER.size + _U32.size * i)[0])
+            for i in range(count)
+        )
+
+    @classmethod
+    def open(cls, path: Path) -> CompiledWordlist:
+        with path.open("rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+
+def read_wordlist_words(path: Path) -> list[str]:
+    if is_compiled_wordlist(path):
+        return list(CompiledWordlist.open(path).sections[0])
+    return sorted(parse_wordlist(path.read_text(encoding="utf-8")))
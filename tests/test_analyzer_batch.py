@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from unittest.mock import patch
+
+from src.analyzer import analyze_password, analyze_passwords
+from src.breach import _sha1_hex
+from src.result_cache import ResultCache
+from src.reuse import check_reuse
+
+
+def _common_passwords_file(tmp_path: Path) -> Path:
+    p = tmp_path / "common.txt"
+    p.write_text("password\n", encoding="utf-8")
+    return p
+
+
+def test_batch_matches_single_password_analysis(tmp_path: Path):
+    common = _common_passwords_file(tmp_path)
+    history = tmp_path / "history.json"
+    passwords = ["password", "", "qwerty123", "CorrectHorseBatteryStaple", "aaaa1111"]
+
+    batch = list(
+        analyze_passwords(
+            passwords,
+            common_passwords_path=common,
+            history_path=history,
+            history_pepper="pepper",
+            check_breach=False,
+            save_history=False,
+        )
+    )
+
+    single = [
+        analyze_password(
+            pw,
+            common_passwords_path=common,
+            history_path=history,
+            history_pepper="pepper",
+            check_breach=False,
+            save_history=False,
+        )
+        for pw in passwords
+    ]
+
+    assert batch == single
+
+
+def test_batch_is_lazy_and_appends_history_as_it_goes(tmp_path: Path):
+    common = _common_passwords_file(tmp_path)
+    history = tmp_path / "history.json"
+
+    results = analyze_passwords(
+        iter(["secret-one", "secret-two", "secret-one"]),
+        common_passwords_path=common,
+        history_path=history,
+        history_pepper="pepper",
+        check_breach=False,
+        save_history=True,
+    )
+
+    first = next(results)
+    assert first.is_reused is False
+    assert check_reuse("secret-one", history, "pepper").is_reused is True
+    assert check_reuse("secret-two", history, "pepper").is_reused is False
+
+    rest = list(results)
+    assert [a.is_reused for a in rest] == [False, True]
+    assert check_reuse("secret-two", history, "pepper").is_reused is True
+
+
+class _FakeResponse:
+    def __init__(self, body: str):
+        self._body = body
+
+    def read(self) -> bytes:
+        return self._body.encode("utf-8")
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+def test_batch_breach_check_fetches_shared_prefix_once(tmp_path: Path):
+    common = _common_passwords_file(tmp_path)
+    history = tmp_path / "history.json"
+    body = "1E4C9B93F3F0682250B6CF8331B7EE68FD8:42\n"
+
+    with patch("urllib.request.urlopen", return_value=_FakeResponse(body)) as urlopen:
+        results = list(
+            analyze_passwords(
+                ["password", "password", "password"],
+                common_passwords_path=common,
+                history_path=history,
+                history_pepper="pepper",
+                check_breach=True,
+                save_history=False,
+            )
+        )
+
+    assert urlopen.call_count == 1
+    assert [a.breach_count for a in results] == [42, 42, 42]
+
+
+def test_batch_handles_undecodable_bytes(tmp_path: Path):
+    raw = b"abc\xffdefgh"
+    password = raw.decode("utf-8", "surrogateescape")
+    history = tmp_path / "history.bin"
+    looked_up: list[str] = []
+
+    def lookup(pw: str) -> int:
+        looked_up.append(_sha1_hex(pw))
+        return 0
+
+    results = list(
+        analyze_passwords(
+            [password, password],
+            common_passwords_path=_common_passwords_file(tmp_path),
+            history_path=history,
+            history_pepper="pepper",
+            check_breach=True,
+            save_history=True,
+            breach_lookup=lookup,
+            result_cache=ResultCache(pepper="pepper"),
+        )
+    )
+    assert [r.is_reused for r in results] == [False, True]
+    assert looked_up[0] == hashlib.sha1(raw).hexdigest().upper()  # noqa: S324
+    assert check_reuse(password, history_path=history, pepper="pepper").is_reused
@@ -94,3 +94,22 @@ def test_analyzer_breach_found_penalizes_score(tmp_path: Path):
     assert analysis.breach_count == 10
     assert "Found in breach corpus (10 occurrences)" in analysis.reasons
     assert analysis.score == max(0, baseline.score - 50)
+
+
+def test_analyzer_uses_supplied_breach_lookup(tmp_path: Path):
+    common = _common_passwords_file(tmp_path)
+    history = tmp_path / "history.json"
+
+    with patch("src.analyzer.check_pwned_password_k_anonymity") as network:
+        analysis = analyze_password(
+            "CorrectHorseBatteryStaple",
+            common_passwords_path=common,
+            history_path=history,
+            history_pepper="pepper",
+            check_breach=True,
+            save_history=False,
+            breach_lookup=lambda pw: 3,
+        )
+
+    network.assert_not_called()
+    assert analysis.breach_count == 3
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from src.analyzer import IncrementalAnalyzer, score_password
+from src.dictionary import WordMatcher
+from src.patterns import CommonPasswordIndex
+
+
+def test_incremental_analyzer_matches_full_analysis_per_keystroke():
+    index = CommonPasswordIndex(["password", "qwerty"])
+    dictionary = WordMatcher(["dragon", "summer"])
+    analyzer = IncrementalAnalyzer(common_index=index, dictionary=dictionary)
+
+    def check() -> None:
+        expected = score_password(
+            analyzer.password,
+            common_index=index,
+            is_reused=False,
+            check_breach=False,
+            dictionary=dictionary,
+        )
+        assert analyzer.result() == expected
+
+    check()
+    for c in "passwordd":
+        analyzer.push(c)
+        check()
+    assert analyzer.pop() == "d"
+    check()
+    assert analyzer.result().label == "weak"
+    for _ in range(4):
+        analyzer.pop()
+    for c in "Summer!2024qwer":
+        analyzer.push(c)
+        check()
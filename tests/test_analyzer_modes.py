@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import random
+import string
+from pathlib import Path
+
+import pytest
+
+from src.analyzer import analyze_password, analyze_passwords
+
+
+def _common_passwords_file(tmp_path: Path) -> Path:
+    p = tmp_path / "common.txt"
+    p.write_text("password\nqwerty\n", encoding="utf-8")
+    return p
+
+
+@pytest.mark.parametrize("password", ["abc12", "password"])
+def test_fast_mode_skips_expensive_checks_once_label_is_settled(tmp_path: Path, password: str):
+    common = _common_passwords_file(tmp_path)
+    history = tmp_path / "history.bin"
+    looked_up: list[str] = []
+
+    def lookup(pw: str) -> int:
+        looked_up.append(pw)
+        return 0
+
+    options = dict(
+        common_passwords_path=common,
+        history_path=history,
+        history_pepper="pepper",
+        check_breach=True,
+        save_history=False,
+        breach_lookup=lookup,
+    )
+    fast = analyze_password(password, mode="fast", **options)
+    assert looked_up == []
+    assert fast.breach_count is None
+    assert fast.reasons[-1] == "Remaining checks skipped (label already determined)"
+
+    full = analyze_password(password, mode="full", **options)
+    assert looked_up == [password]
+    assert fast.label == full.label == "weak"
+
+
+def test_fast_mode_labels_match_full_mode(tmp_path: Path):
+    common = _common_passwords_file(tmp_path)
+    rng = random.Random(17)
+    alphabet = string.ascii_letters + string.digits + "!@#$%"
+    passwords = ["password", "qwerty", "P@ssw0rd!", "", "aaaa"]
+    passwords += ["".join(rng.choices(alphabet, k=rng.randint(1, 24))) for _ in range(300)]
+    looked_up: dict[str, list[str]] = {"fast": [], "full": []}
+
+    def run(mode: str) -> list[str]:
+        def lookup(pw: str) -> int:
+            looked_up[mode].append(pw)
+            return len(pw) % 3
+
+        results = analyze_passwords(
+            passwords,
+            common_passwords_path=common,
+            history_path=tmp_path / f"history-{mode}.bin",
+            history_pepper="pepper",
+            check_breach=True,
+            save_history=True,
+            breach_lookup=lookup,
+            mode=mode,
+        )
+        return [a.label for a in results]
+
+    assert run("fast") == run("full")
+    assert len(looked_up["fast"]) < len(looked_up["full"])
+
+
+def test_unknown_mode_is_rejected(tmp_path: Path):
+    with pytest.raises(ValueError):
+        analyze_password(
+            "secret",
+            common_passwords_path=_common_passwords_file(tmp_path),
+            history_path=tmp_path / "history.bin",
+            history_pepper="pepper",
+            check_breach=False,
+            save_history=False,
+            mode="eager",
+        )
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_fast_mode_without_breach_does_not_report_skipped_checks(tmp_path: Path, batch: bool):
+    options = dict(
+        common_passwords_path=_common_passwords_file(tmp_path),
+        history_pepper="pepper",
+        check_breach=False,
+        save_history=False,
+    )
+    password = "Tr0ub4dor&3"
+
+    def run(mode: str):
+        history = tmp_path / f"history-{mode}.bin"
+        if batch:
+            return next(analyze_passwords([password], history_path=history, mode=mode, **options))
+        return analyze_password(password, history_path=history, mode=mode, **options)
+
+    fast = run("fast")
+    assert "Remaining checks skipped (label already determined)" not in fast.reasons
+    assert fast == run("full")
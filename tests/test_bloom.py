@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from src.bloom import BloomFilter, build_common_password_filter, filter_sidecar_path
+from src.breach import FilteredBreachLookup, _sha1_hex
+from src.patterns import FilteredCommonPasswordIndex, load_common_password_index
+
+
+def test_bloom_has_no_false_negatives_and_bounded_false_positives(tmp_path: Path):
+    bloom = BloomFilter.for_capacity(2000, 0.01)
+    members = [f"member-{i}".encode() for i in range(2000)]
+    bloom.update(members)
+
+    path = tmp_path / "members.bloom"
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+
+    assert len(loaded) == 2000
+    assert all(m in loaded for m in members)
+    false_positives = sum(f"other-{i}".encode() in loaded for i in range(5000))
+    assert false_positives < 5000 * 0.03
+    assert members[0] in pickle.loads(pickle.dumps(loaded))
+
+
+def test_common_password_sidecar_filter_short_circuits_misses(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("password\nletmein\n", encoding="utf-8")
+    assert build_common_password_filter(common, filter_sidecar_path(common)) == 2
+
+    index = load_common_password_index(common)
+    assert isinstance(index, FilteredCommonPasswordIndex)
+    assert "CorrectHorseBatteryStaple" not in index
+    assert index._exact is None
+    assert not index.contains_variant("Tr0ub4dor&3")
+    assert index._exact is None
+    assert " Password " in index
+    assert index.contains_variant("L3tm31n!")
+
+    common.write_text("password\nletmein\nhunter22\n", encoding="utf-8")
+    st = filter_sidecar_path(common).stat()
+    os.utime(common, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    stale = load_common_password_index(common)
+    assert not isinstance(stale, FilteredCommonPasswordIndex)
+    assert "hunter22" in stale
+
+
+def test_filtered_breach_lookup_skips_backend_for_definite_misses():
+    bloom = BloomFilter.for_capacity(10, 0.001)
+    bloom.add(bytes.fromhex(_sha1_hex("password")))
+    calls: list[str] = []
+
+    def backend(pw: str) -> int:
+        calls.append(pw)
+        return 42
+
+    lookup = FilteredBreachLookup(bloom, backend)
+    assert lookup("password") == 42
+    assert lookup("CorrectHorseBatteryStaple") == 0
+    assert calls == ["password"]
+
+
+def test_old_format_filter_is_rejected_and_skipped(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("password\np@ssword\nletmein\n", encoding="utf-8")
+    sidecar = filter_sidecar_path(common)
+    assert build_common_password_filter(common, sidecar) == 3
+
+    data = bytearray(sidecar.read_bytes())
+    data[8:10] = (1).to_bytes(2, "little")
+    sidecar.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="rebuild"):
+        BloomFilter.load(sidecar)
+
+    index = load_common_password_index(common)
+    assert not isinstance(index, FilteredCommonPasswordIndex)
+    assert index.contains_variant("L3tm31n!")
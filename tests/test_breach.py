@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import os
+import pickle
+import time
 import urllib.error
 from unittest.mock import patch
 
-from src.breach import check_pwned_password_k_anonymity
+import pytest
+
+from src.breach import (
+    LocalBreachIndex,
+    RangeCache,
+    RangeCacheStats,
+    _sha1_hex,
+    build_local_breach_index,
+    check_pwned_password_k_anonymity,
+    check_pwned_passwords_grouped,
+)
 
 
 class _FakeResponse:
@@ -40,3 +53,90 @@ def test_breach_returns_zero_when_not_found():
 def test_breach_returns_none_on_network_error():
     with patch("urllib.request.urlopen", side_effect=urllib.error.URLError("down")):
         assert check_pwned_password_k_anonymity("password") is None
+
+
+def _write_dump(path, passwords_with_counts):
+    lines = sorted(f"{_sha1_hex(pw)}:{count}" for pw, count in passwords_with_counts)
+    path.write_text("\n".join(lines) + "\n", encoding="ascii")
+
+
+def test_local_breach_index_lookup(tmp_path):
+    dump = tmp_path / "dump.txt"
+    index_path = tmp_path / "pwned.idx"
+    _write_dump(dump, [("password", 42), ("letmein", 7), (f"filler-{1}", 1)])
+
+    assert build_local_breach_index(dump, index_path) == 3
+
+    with LocalBreachIndex(index_path) as index:
+        assert len(index) == 3
+        assert index("password") == 42
+        assert index("letmein") == 7
+        assert index("CorrectHorseBatteryStaple") == 0
+        assert pickle.loads(pickle.dumps(index))("password") == 42
+
+
+def test_local_breach_index_rejects_unsorted_dump(tmp_path):
+    dump = tmp_path / "dump.txt"
+    dump.write_text(f"{'F' * 40}:1\n{'0' * 40}:1\n", encoding="ascii")
+
+    with pytest.raises(ValueError):
+        build_local_breach_index(dump, tmp_path / "pwned.idx")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dump.txt"]
+
+
+def test_range_cache_avoids_repeat_fetches(tmp_path):
+    body = "1E4C9B93F3F0682250B6CF8331B7EE68FD8:42\n"
+    cache = RangeCache(cache_dir=tmp_path / "ranges")
+
+    with patch("urllib.request.urlopen", return_value=_FakeResponse(body)) as urlopen:
+        assert check_pwned_password_k_anonymity("password", cache=cache) == 42
+        assert check_pwned_password_k_anonymity("password", cache=cache) == 42
+    assert urlopen.call_count == 1
+    assert cache.stats() == RangeCacheStats(memory_hits=1, disk_hits=0, misses=1)
+
+    fresh = pickle.loads(pickle.dumps(cache))
+    with patch("urllib.request.urlopen", side_effect=urllib.error.URLError("down")):
+        assert check_pwned_password_k_anonymity("password", cache=fresh) == 42
+    assert fresh.stats().disk_hits == 1
+
+
+def test_range_cache_expires_entries(tmp_path):
+    cache = RangeCache(cache_dir=tmp_path / "ranges", ttl_seconds=0)
+    cache.put("5BAA6", "ABC:1\n")
+
+    assert cache.get("5BAA6") is None
+    assert cache.stats().misses == 1
+
+
+def test_range_cache_promotion_keeps_the_disk_timestamp(tmp_path):
+    cache = RangeCache(cache_dir=tmp_path / "ranges", ttl_seconds=100)
+    cache.put("5BAA6", "ABC:1\n")
+    path = tmp_path / "ranges" / "5B" / "5BAA6.z"
+    stored_at = time.time() - 90
+    os.utime(path, (stored_at, stored_at))
+
+    fresh = pickle.loads(pickle.dumps(cache))
+    assert fresh.get("5BAA6") == "ABC:1\n"
+    with patch.object(time, "time", return_value=stored_at + 101):
+        assert fresh.get("5BAA6") is None
+    assert fresh.stats() == RangeCacheStats(memory_hits=0, disk_hits=1, misses=1)
+
+
+def test_grouped_check_fetches_each_prefix_once():
+    hashes = {pw: _sha1_hex(pw) for pw in ["password", "letmein", "hunter2"]}
+    bodies = {
+        h[:5]: f"{h[5:]}:{len(pw)}\r\n0000000000000000000000000000000000A:0\r\n"
+        for pw, h in hashes.items()
+        if pw != "hunter2"
+    }
+    fetched: list[str] = []
+
+    def fetch(prefix):
+        fetched.append(prefix)
+        return bodies.get(prefix)
+
+    passwords = ["password", "letmein", "password", "hunter2"]
+    counts = check_pwned_passwords_grouped(passwords, fetch)
+
+    assert counts == [8, 7, 8, None]
+    assert sorted(fetched) == sorted({h[:5] for h in hashes.values()})
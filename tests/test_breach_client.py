@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import breach_client
+from src.analyzer import analyze_passwords
+from src.breach import RangeCache, _sha1_hex
+from src.breach_client import AsyncPwnedPasswordsClient, PwnedPasswordsClient
+
+
+class _RangeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _RangeHandler)
+        self.connections = 0
+        self.requests: list[str] = []
+        self.throttle_next = 0
+        self.drop_connections = False
+        self.delay = 0.0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _RangeServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args) -> None:
+        return None
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        self.close_connection = self.server.drop_connections
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        if self.server.throttle_next > 0:
+            self.server.throttle_next -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        prefix = self.path.rsplit("/", 1)[-1]
+        body = "".join(
+            f"{h[5:]}:{len(pw)}\r\n"
+            for pw in ("password", "letmein")
+            if (h := _sha1_hex(pw)).startswith(prefix)
+        )
+        body += "0000000000000000000000000000000000A:0\r\n"
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def range_server():
+    server = _RangeServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _base_url(server: _RangeServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def test_client_reuses_connection(range_server):
+    with PwnedPasswordsClient(base_url=_base_url(range_server)) as client:
+        assert client("password") == 8
+        assert client("letmein") == 7
+        assert client("CorrectHorseBatteryStaple") == 0
+
+    assert len(range_server.requests) == 3
+    assert range_server.connections == 1
+
+
+def test_client_retries_after_429(range_server):
+    range_server.throttle_next = 2
+    client = PwnedPasswordsClient(base_url=_base_url(range_server), backoff_seconds=0)
+
+    assert client("password") == 8
+    assert len(range_server.requests) == 3
+
+
+@pytest.fixture
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(seconds: float) -> None:
+        raise AssertionError(f"unexpected backoff of {seconds}s")
+
+    monkeypatch.setattr(breach_client.time, "sleep", fail)
+
+
+def test_client_fails_fast_when_unreachable(no_sleep):
+    client = PwnedPasswordsClient(base_url="http://127.0.0.1:1")
+    assert client("password") is None
+
+
+def test_client_reconnects_a_stale_pooled_connection_without_backoff(range_server, no_sleep):
+    range_server.drop_connections = True
+    with PwnedPasswordsClient(base_url=_base_url(range_server)) as client:
+        assert client("password") == 8
+        assert client("letmein") == 7
+
+    assert len(range_server.requests) == 2
+    assert range_server.connections == 2
+
+
+def test_grouped_batch_fetches_prefixes_concurrently(range_server, tmp_path):
+    range_server.delay = 0.05
+    common = tmp_path / "common.txt"
+    common.write_text("", encoding="utf-8")
+    passwords = ["password", "letmein", "CorrectHorseBatteryStaple", "Tr0ub4dor&3", "password"]
+    with PwnedPasswordsClient(base_url=_base_url(range_server)) as client:
+        results = analyze_passwords(
+            passwords,
+            common_passwords_path=common,
+            history_path=tmp_path / "history.bin",
+            history_pepper="pepper",
+            check_breach=True,
+            save_history=False,
+            breach_lookup=client,
+        )
+
+    assert [r.breach_count for r in results] == [8, 7, 0, 0, 8]
+    assert len(range_server.requests) == 4
+    assert range_server.peak > 1
+
+
+def test_async_client_checks_many_with_limited_concurrency(range_server):
+    passwords = ["password", "letmein", "CorrectHorseBatteryStaple", "password"]
+    cache = RangeCache()
+
+    async def run() -> list[int | None]:
+        async with AsyncPwnedPasswordsClient(
+            base_url=_base_url(range_server), max_concurrency=2, cache=cache
+        ) as client:
+            first = await client.check_many(passwords)
+            second = await client.check_many(passwords)
+            return first + second
+
+    range_server.throttle_next = 1
+    assert asyncio.run(run()) == [8, 7, 0, 8] * 2
+    assert range_server.connections <= 2
+    assert cache.stats().hits >= 4
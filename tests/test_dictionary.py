@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.dictionary import WordMatcher, load_word_matcher
+from src.patterns import detect_patterns
+
+
+def test_matcher_finds_overlapping_words_in_one_pass():
+    matcher = WordMatcher(["she", "hers", "his", " Horse", "#comment"], min_length=3)
+    assert len(matcher) == 4
+    assert matcher.find_all("uSHERS") == ["she", "hers"]
+    assert matcher.find_all("CorrectHorseBatteryStaple") == ["horse"]
+    assert matcher.find_all("nothing here") == []
+
+
+def test_matcher_agrees_with_substring_search():
+    words = ["correct", "horse", "battery", "staple", "orse", "tery", "rect"]
+    matcher = WordMatcher(words)
+    for text in ["correcthorsebatterystaple", "staplestaple", "xbatter", "rectorse"]:
+        assert set(matcher.find_all(text)) == {w for w in words if w in text}
+
+
+def test_word_matcher_is_cached_and_reloaded_on_change(tmp_path: Path):
+    p = tmp_path / "words.txt"
+    p.write_text("window\n", encoding="utf-8")
+    first = load_word_matcher([p])
+    assert load_word_matcher([p]) is first
+
+    p.write_text("window\nsummer\n", encoding="utf-8")
+    assert load_word_matcher([p]).find_all("summerwindow") == ["summer", "window"]
+
+
+def test_detect_patterns_reports_dictionary_words(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("", encoding="utf-8")
+    words = tmp_path / "words.txt"
+    words.write_text("summer\nwindow\n", encoding="utf-8")
+
+    hits = detect_patterns("Summerwindow2024", common, [words])
+    assert [h.name for h in hits] == ["dictionary_word"]
+    assert "summer, window" in hits[0].detail
+    assert detect_patterns("Summerwindow2024", common) == []
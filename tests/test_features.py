@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import random
+import string
+
+import pytest
+
+from src.entropy import estimate_entropy_bits, estimate_shannon_entropy_bits
+from src.features import IncrementalFeatures, extract_features
+from src.patterns import has_keyboard_walk, has_repeated_char_run, has_simple_sequence
+
+
+def _assert_matches_individual_checks(pw: str) -> None:
+    f = extract_features(pw)
+    assert f.length == len(pw)
+    assert f.entropy_bits == estimate_entropy_bits(pw)
+    assert f.shannon_entropy_bits == estimate_shannon_entropy_bits(pw)
+    assert f.has_repeated_chars == has_repeated_char_run(pw)
+    assert f.has_sequence == has_simple_sequence(pw)
+    assert f.has_keyboard_walk == has_keyboard_walk(pw)
+
+
+def test_features_match_individual_checks_on_random_passwords():
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " éßΣİ€"
+    rng = random.Random(2024)
+    for i in range(2000):
+        n = i % 24
+        _assert_matches_individual_checks("".join(rng.choice(alphabet) for _ in range(n)))
+
+
+def test_features_match_individual_checks_on_known_patterns():
+    known = ["", "a", "aaaa", "abcd", "DCBA", "qwerty123", "zaq1", "İabcd", "ΣΑΣ4321", "1qaz2wsx"]
+    for pw in known:
+        _assert_matches_individual_checks(pw)
+
+
+def test_incremental_features_match_full_extraction_while_editing():
+    alphabet = "abcdqwer1234!@ AΣΑİé"
+    rng = random.Random(7)
+    inc = IncrementalFeatures()
+    typed: list[str] = []
+    for _ in range(3000):
+        if typed and rng.random() < 0.35:
+            assert inc.pop() == typed.pop()
+        else:
+            c = rng.choice(alphabet)
+            inc.push(c)
+            typed.append(c)
+        assert inc.features() == extract_features("".join(typed))
+
+
+def test_incremental_features_reject_bad_edits():
+    inc = IncrementalFeatures("ab")
+    with pytest.raises(ValueError):
+        inc.push("cd")
+    inc.pop()
+    inc.pop()
+    with pytest.raises(IndexError):
+        inc.pop()
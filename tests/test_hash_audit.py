@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from src.breach import LocalBreachIndex, _sha1_hex, build_local_breach_index
+from src.hash_audit import (
+    _md4,
+    _ntlm_hex,
+    audit_hashes,
+    external_sort,
+    merge_join,
+    open_corpus,
+    read_hashes,
+)
+from src.wordlist import compile_wordlist_file
+
+
+def test_ntlm_matches_reference_vectors():
+    assert _md4(b"").hex() == "31d6cfe0d16ae931b73c59d7e0c089c0"
+    assert _md4(b"abc").hex() == "a448017aaf21d8525fc10ae87aa6729d"
+    assert _md4(b"1234567890" * 8).hex() == "e33b4ddc9c38f2199c3e7b164fcc0536"
+    assert _ntlm_hex("password") == "8846F7EAEE8FB117AD06BDD830B7586C"
+
+
+def test_external_sort_spills_runs_and_merges():
+    rng = random.Random(3)
+    records = [(rng.randbytes(20), i) for i in range(1000)]
+    records += records[:50]
+    assert list(external_sort(records, 20, chunk_size=64)) == sorted(records)
+    assert list(external_sort(records, 20)) == sorted(records)
+
+
+def test_audit_counts_line_up_with_breach_index(tmp_path: Path):
+    breached = {f"pw-{i}": i + 1 for i in range(200)}
+    dump = tmp_path / "dump.txt"
+    dump.write_text(
+        "".join(sorted(f"{_sha1_hex(pw)}:{n}\n" for pw, n in breached.items())), encoding="ascii"
+    )
+    index_path = tmp_path / "pwned.idx"
+    build_local_breach_index(dump, index_path)
+
+    audited = [f"pw-{i}" for i in range(0, 400, 3)]
+    lines = [f"user{i}:{_sha1_hex(pw).lower()}" for i, pw in enumerate(audited)]
+    lines.insert(5, "")
+    lines.append(_sha1_hex("pw-3"))
+
+    with LocalBreachIndex(index_path) as index:
+        for source in (index_path, dump):
+            corpus = open_corpus(source, "sha1")
+            matches = list(audit_hashes(lines, corpus, "sha1", chunk_size=16))
+            assert len(matches) == len(audited) + 1
+            assert [m.hash_hex for m in matches] == sorted(m.hash_hex for m in matches)
+            for match in matches:
+                assert match.count == index.count_for_sha1(match.hash_hex)
+            assert sum(1 for m in matches if m.hash_hex == _sha1_hex("pw-3")) == 2
+
+
+def test_ntlm_audit_against_common_passwords_and_pwdump(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("password\nletmein\nqwerty\n", encoding="utf-8")
+    lm = "aad3b435b51404eeaad3b435b51404ee"
+    lines = [
+        f"alice:1001:{lm}:{_ntlm_hex('letmein')}:::",
+        f"bob:1002:{lm}:{_ntlm_hex('Tr0ub4dor&3')}:::",
+    ]
+
+    matches = list(audit_hashes(lines, open_corpus(common, "ntlm", "common"), "ntlm"))
+    assert {m.line: m.count for m in matches} == {1: 1, 2: 0}
+    with pytest.raises(ValueError):
+        open_corpus(tmp_path / "pwned.idx", "sha1", "unknown")
+
+
+def test_text_and_compiled_common_corpora_agree(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("# comment\nPassword\nqwerty \n", encoding="utf-8")
+    compiled = tmp_path / "common.bin"
+    compile_wordlist_file(common, compiled, "common")
+    lines = [_sha1_hex(pw) for pw in ("# comment", "password", "qwerty", "Password")]
+
+    for source in (common, compiled):
+        matches = list(audit_hashes(lines, open_corpus(source, "sha1", "common"), "sha1"))
+        assert {m.line: m.count for m in matches} == {1: 0, 2: 1, 3: 1, 4: 0}
+
+
+def test_rejects_malformed_hashes_and_unsorted_corpus():
+    with pytest.raises(ValueError, match="Line 2"):
+        list(read_hashes([_sha1_hex("a"), "not-a-hash"], "sha1"))
+    corpus = [(b"\x02" * 20, 1), (b"\x01" * 20, 1)]
+    with pytest.raises(ValueError, match="sorted"):
+        list(merge_join([(b"\x03" * 20, 1)], corpus))
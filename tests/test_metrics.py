@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src import metrics
+from src.analyzer import analyze_password
+from src.metrics import Metrics, set_metrics_sink
+
+
+@pytest.fixture
+def sink() -> Iterator[Metrics]:
+    sink = Metrics()
+    set_metrics_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_metrics_sink(None)
+
+
+def test_analyze_password_records_each_stage(sink: Metrics, tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("password\n", encoding="utf-8")
+    analyze_password(
+        "Tr0ub4dor&3",
+        common_passwords_path=common,
+        history_path=tmp_path / "history.bin",
+        history_pepper="pepper",
+        check_breach=True,
+        save_history=True,
+        breach_lookup=lambda pw: 0,
+    )
+
+    totals = sink.stage_totals()
+    assert set(totals) == {
+        "features",
+        "length",
+        "entropy",
+        "patterns",
+        "reuse_check",
+        "breach",
+        "history_save",
+    }
+    assert all(count == 1 and seconds >= 0 for count, seconds in totals.values())
+
+
+def test_prometheus_export_includes_histograms_counters_and_gauges(sink: Metrics):
+    sink.observe("patterns", 0.0002)
+    sink.observe("patterns", 2.0)
+    metrics.inc("breach_network_errors")
+    metrics.inc("breach_network_errors")
+    sink.register_counter("breach_cache_misses", lambda: 3)
+    sink.register_gauge("history_digests", lambda: 42)
+
+    text = sink.to_prometheus()
+    assert 'psc_stage_seconds_bucket{stage="patterns",le="0.00025"} 1' in text
+    assert 'psc_stage_seconds_bucket{stage="patterns",le="+Inf"} 2' in text
+    assert 'psc_stage_seconds_count{stage="patterns"} 2' in text
+    assert "psc_breach_network_errors_total 2" in text
+    assert "psc_breach_cache_misses_total 3" in text
+    assert "psc_history_digests 42" in text
+
+
+def test_disabled_metrics_record_nothing():
+    assert metrics.get_metrics_sink() is None
+    watch = metrics.stopwatch()
+    watch.lap("anything")
+    metrics.inc("anything")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src import metrics
+from src.analyzer import analyze_passwords
+from src.breach import RangeCache, _sha1_hex
+from src.metrics import Metrics
+from src.parallel import analyze_passwords_parallel
+from src.patterns import CommonPasswordIndex, MappedCommonPasswordIndex
+from src.result_cache import ResultCache
+
+
+def test_mapped_index_matches_set_index():
+    index = CommonPasswordIndex(["password", "letmein", "qwerty", "Ünïcode"])
+    mapped = MappedCommonPasswordIndex(index.to_bytes())
+
+    assert len(mapped) == 4
+    for candidate in ["password", " LetMeIn ", "ünïcode", "nope", "", "zzzz"]:
+        assert (candidate in mapped) == (candidate in index)
+
+
+def test_parallel_output_matches_sequential_order(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("password\nletmein\n", encoding="utf-8")
+    history = tmp_path / "history.json"
+    passwords = [f"pw{i}-{'x' * (i % 13)}" for i in range(300)] + ["password", "", "letmein"]
+
+    options = dict(
+        common_passwords_path=common,
+        history_path=history,
+        history_pepper="pepper",
+        check_breach=False,
+        save_history=False,
+    )
+    sequential = list(analyze_passwords(passwords, **options))
+    parallel = list(analyze_passwords_parallel(passwords, workers=2, **options))
+
+    assert parallel == sequential
+
+
+class _CachedLookup:
+    def __init__(self, cache: RangeCache) -> None:
+        self.cache = cache
+
+    def __call__(self, password: str) -> int:
+        prefix = _sha1_hex(password)[:5]
+        if self.cache.get(prefix) is None:
+            self.cache.put(prefix, "")
+        return 0
+
+
+def test_worker_cache_stats_and_metrics_reach_the_parent(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("password\n", encoding="utf-8")
+    passwords = [f"pw{i % 40}-suffix" for i in range(400)]
+    range_cache = RangeCache()
+    result_cache = ResultCache(pepper="pepper")
+    sink = Metrics()
+    metrics.set_metrics_sink(sink)
+    try:
+        results = list(
+            analyze_passwords_parallel(
+                passwords,
+                workers=2,
+                common_passwords_path=common,
+                history_path=tmp_path / "history.bin",
+                history_pepper="pepper",
+                check_breach=True,
+                save_history=False,
+                breach_lookup=_CachedLookup(range_cache),
+                result_cache=result_cache,
+            )
+        )
+    finally:
+        metrics.set_metrics_sink(None)
+
+    assert len(results) == len(passwords)
+    stats = result_cache.stats()
+    assert stats.hits + stats.misses == len(passwords)
+    assert stats.hits >= len(passwords) - 2 * 40
+    assert range_cache.stats().misses >= 40
+    assert sum(count for count, _ in sink.stage_totals().values()) > 0
@@ -1,6 +1,14 @@
 from pathlib import Path
 
-from src.patterns import detect_patterns
+from src.patterns import (
+    _KEYBOARD_ADJ,
+    CommonPasswordIndex,
+    MappedCommonPasswordIndex,
+    detect_patterns,
+    is_common_password,
+    is_common_password_variant,
+    load_common_password_index,
+)
 
 
 def test_detects_common_password(tmp_path: Path):
@@ -15,3 +23,55 @@ def test_detects_keyboard_walk(tmp_path: Path):
     p.write_text("", encoding="utf-8")
     hits = detect_patterns("qwerty123", p)
     assert any(h.name == "keyboard_walk" for h in hits)
+
+
+def test_common_password_index_is_cached_and_reloaded_on_change(tmp_path: Path):
+    p = tmp_path / "common.txt"
+    p.write_text("# comment\nPassword\n", encoding="utf-8")
+
+    first = load_common_password_index(p)
+    assert "  PASSWORD " in first
+    assert load_common_password_index(p) is first
+
+    p.write_text("password\nletmein\n", encoding="utf-8")
+    second = load_common_password_index(p)
+    assert second is not first
+    assert is_common_password("LetMeIn", p)
+
+
+def test_detects_leet_and_suffixed_common_password_variants(tmp_path: Path):
+    p = tmp_path / "common.txt"
+    p.write_text("password\ndragon\n", encoding="utf-8")
+
+    assert not is_common_password("P@ssw0rd!", p)
+    for pw in ["P@ssw0rd!", "password2024", "Dr4g0n123!", "DRAGON!!"]:
+        assert is_common_password_variant(pw, p)
+    assert not is_common_password_variant("dragonfly", p)
+    assert not is_common_password_variant("P@ssw0rd!x", p)
+
+    hits = detect_patterns("P@ssw0rd!", p)
+    assert [h.name for h in hits] == ["common_password_variant"]
+    assert [h.name for h in detect_patterns("password", p)] == ["common_password"]
+
+
+def test_mapped_index_answers_variant_queries():
+    index = CommonPasswordIndex(["password", "letmein", "dragon"])
+    mapped = MappedCommonPasswordIndex(index.to_bytes())
+    assert len(mapped) == 3
+    for pw in ["password", "P@ssw0rd!", "1etme1n99", "dragonfly", "letme", ""]:
+        assert (pw in mapped) == (pw in index)
+        assert mapped.contains_variant(pw) == index.contains_variant(pw)
+
+
+def test_keyboard_adjacency_table_matches_layout():
+    rows = ["`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./"]
+    expected: dict[str, frozenset[str]] = {}
+    for y, row in enumerate(rows):
+        for x, c in enumerate(row):
+            expected[c] = frozenset(
+                rows[ny][nx]
+                for ny in range(max(y - 1, 0), min(y + 2, len(rows)))
+                for nx in range(max(x - 1, 0), min(x + 2, len(rows[ny])))
+                if (nx, ny) != (x, y)
+            )
+    assert dict(_KEYBOARD_ADJ) == expected
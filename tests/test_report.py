@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from src.analyzer import Analysis, analysis_payload, analyze_passwords
+from src.reasons import REASON_BREACHED, REASON_COMMON_PASSWORD, REASON_TOO_SHORT
+from src.report import (
+    FLAG_BREACHED,
+    FLAG_COMMON,
+    FLAG_PATTERN,
+    AnalysisColumns,
+    AuditAggregator,
+    ColumnarWriter,
+    CsvWriter,
+    JsonlWriter,
+    read_columnar,
+)
+
+
+def _analyses(tmp_path: Path, passwords: list[str]) -> list[Analysis]:
+    common = tmp_path / "common.txt"
+    common.write_text("password\n", encoding="utf-8")
+    return list(
+        analyze_passwords(
+            passwords,
+            common_passwords_path=common,
+            history_path=tmp_path / "history.bin",
+            history_pepper="pepper",
+            check_breach=True,
+            save_history=False,
+            breach_lookup=lambda pw: 3 if pw == "password" else 0,
+        )
+    )
+
+
+def test_reason_codes_render_lazily_and_columns_aggregate(tmp_path: Path):
+    analyses = _analyses(tmp_path, ["password", "", "Tr0ub4dor&3x!Zq", "abcd1234"])
+
+    first = analyses[0]
+    assert not hasattr(first, "__dict__")
+    assert REASON_COMMON_PASSWORD in first.reason_codes
+    assert REASON_BREACHED in first.reason_codes
+    assert first.reason_params[-1] == 3
+    assert "Found in breach corpus (3 occurrences)" in first.reasons
+    assert analysis_payload(first)["reasons"] == first.reasons
+    assert analyses[1].reasons == ["Password is empty"]
+    assert REASON_TOO_SHORT not in analyses[2].reason_codes
+
+    columns = AnalysisColumns.from_analyses(analyses)
+    assert len(columns) == 4
+    assert list(columns.scores) == [a.score for a in analyses]
+    assert columns.label_counts() == {
+        label: sum(a.label == label for a in analyses) for label in ("weak", "ok", "strong")
+    }
+    assert columns.count_flag(FLAG_COMMON) == 1
+    assert columns.count_flag(FLAG_BREACHED) == 1
+    assert columns.count_flag(FLAG_PATTERN) == 1
+
+
+def test_aggregator_summarizes_without_rows(tmp_path: Path):
+    analyses = _analyses(tmp_path, ["password", "", "Tr0ub4dor&3x!Zq", "abcd1234"] * 50)
+    aggregator = AuditAggregator()
+    for analysis in analyses:
+        aggregator.add(analysis)
+
+    summary = aggregator.summary()
+    weak = sum(a.label == "weak" for a in analyses)
+    assert summary["count"] == 200
+    assert summary["weak_fraction"] == weak / 200
+    assert summary["breached"] == 50
+    assert summary["mean_score"] == sum(a.score for a in analyses) / 200
+    assert sum(summary["score_histogram"].values()) == 200
+    assert sum(summary["entropy_histogram"].values()) == 200
+    top = summary["top_failures"]
+    assert [f["count"] for f in top] == sorted((f["count"] for f in top), reverse=True)
+    assert len(top) == 5
+    assert top[0] == {"reason": "low_shannon_entropy", "count": 100, "fraction": 0.5}
+
+
+def test_writers_stream_rows_in_each_format(tmp_path: Path):
+    analyses = _analyses(tmp_path, ["password", "", "Tr0ub4dor&3x!Zq", "abcd1234", "ab"] * 3)
+
+    text = io.StringIO()
+    jsonl = JsonlWriter(text)
+    for analysis in analyses:
+        jsonl.write(analysis)
+    jsonl.close()
+    rows = [json.loads(line) for line in text.getvalue().splitlines()]
+    assert rows[2] == {"line": 3, **analysis_payload(analyses[2])}
+
+    text = io.StringIO()
+    writer = CsvWriter(text)
+    for analysis in analyses:
+        writer.write(analysis)
+    writer.close()
+    records = list(csv.DictReader(io.StringIO(text.getvalue())))
+    assert [int(r["score"]) for r in records] == [a.score for a in analyses]
+    assert records[0]["breach_count"] == "3"
+    assert records[0]["reasons"] == "; ".join(analyses[0].reasons)
+
+    binary = io.BytesIO()
+    columnar = ColumnarWriter(binary, block_rows=4)
+    for analysis in analyses:
+        columnar.write(analysis)
+    columnar.close()
+    blocks = list(read_columnar(io.BytesIO(binary.getvalue())))
+    assert [len(b) for b in blocks] == [4, 4, 4, 3]
+    expected = AnalysisColumns.from_analyses(analyses)
+    assert [s for b in blocks for s in b.scores] == list(expected.scores)
+    assert [c for b in blocks for c in b.breach_counts] == list(expected.breach_counts)
+    assert [f for b in blocks for f in b.flags] == list(expected.flags)
+    with pytest.raises(ValueError):
+        list(read_columnar(io.BytesIO(binary.getvalue()[:-1])))
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import pickle
+import random
+from pathlib import Path
+
+import pytest
+
+from src import result_cache as result_cache_module
+from src.analyzer import analyze_password, analyze_passwords, score_password
+from src.dictionary import WordMatcher
+from src.features import extract_features
+from src.reasons import REASON_DICTIONARY_WORD
+from src.result_cache import LocalResult, ResultCache
+from src.reuse import _digest_password
+
+
+def _local(score: int) -> LocalResult:
+    return LocalResult(extract_features("x"), score, b"", (), 3)
+
+
+def test_lru_eviction_stats_and_pickling():
+    cache = ResultCache(pepper="pepper", max_entries=2)
+    a, b, c = (cache.key(pw) for pw in ("a", "b", "c"))
+    assert a == _digest_password("a", "pepper")
+    cache.put(a, _local(1))
+    cache.put(b, _local(2))
+    assert cache.get(a) == _local(1)
+    cache.put(c, _local(3))
+    assert cache.get(b) is None
+    assert cache.get(c) == _local(3)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 1, 1, 2)
+    assert stats.hit_ratio == pytest.approx(2 / 3)
+
+    restored = pickle.loads(pickle.dumps(cache))
+    assert (restored.pepper, restored.max_entries, len(restored)) == ("pepper", 2, 0)
+
+
+def test_unpeppered_cache_uses_a_random_pepper_shared_with_workers():
+    cache = ResultCache()
+    assert cache.key("hunter2") != _digest_password("hunter2", "")
+    assert cache.key("hunter2") != ResultCache().key("hunter2")
+    assert pickle.loads(pickle.dumps(cache)).key("hunter2") == cache.key("hunter2")
+
+
+def test_breach_counts_expire_independently(monkeypatch: pytest.MonkeyPatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResultCache(breach_ttl_seconds=10)
+    key = cache.key("hunter2")
+    cache.put(key, _local(1))
+    cache.put_breach(key, 7)
+    now[0] += 5
+    assert cache.get_breach(key) == 7
+    now[0] += 10
+    assert cache.get_breach(key) is None
+    assert cache.get(key) == _local(1)
+    assert (cache.stats().breach_hits, cache.stats().breach_misses) == (1, 1)
+
+
+@pytest.mark.parametrize("mode", ["full", "fast"])
+def test_cached_stream_matches_uncached_analysis(tmp_path: Path, mode: str):
+    common = tmp_path / "common.txt"
+    common.write_text("password\nqwerty\n", encoding="utf-8")
+    rng = random.Random(5)
+    pool = ["password", "P@ssw0rd!", "", "Tr0ub4dor&3", "correct horse", "aaaa", "qwerty1"]
+    passwords = [rng.choice(pool) for _ in range(400)]
+    looked_up: list[str] = []
+
+    def lookup(pw: str) -> int:
+        looked_up.append(pw)
+        return len(pw) % 2
+
+    def run(cache: ResultCache | None, history: str) -> list[object]:
+        return list(
+            analyze_passwords(
+                passwords,
+                common_passwords_path=common,
+                history_path=tmp_path / history,
+                history_pepper="pepper",
+                check_breach=True,
+                save_history=True,
+                breach_lookup=lookup,
+                mode=mode,
+                result_cache=cache,
+            )
+        )
+
+    expected = run(None, "uncached.bin")
+    looked_up.clear()
+    cache = ResultCache(pepper="pepper")
+    assert run(cache, "cached.bin") == expected
+    assert len(looked_up) == len(set(looked_up))
+    assert cache.stats().hits > (300 if mode == "full" else 150)
+    assert all(pw not in key for key in cache._entries for pw in pool if pw)
+
+
+def test_single_analysis_uses_cache_but_still_checks_reuse(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("", encoding="utf-8")
+    calls: list[str] = []
+
+    def lookup(pw: str) -> int:
+        calls.append(pw)
+        return 0
+
+    cache = ResultCache(pepper="pepper")
+    options = dict(
+        common_passwords_path=common,
+        history_path=tmp_path / "history.bin",
+        history_pepper="pepper",
+        check_breach=True,
+        save_history=True,
+        breach_lookup=lookup,
+        result_cache=cache,
+    )
+    first = analyze_password("Tr0ub4dor&3", **options)
+    second = analyze_password("Tr0ub4dor&3", **options)
+    assert calls == ["Tr0ub4dor&3"]
+    assert not first.is_reused
+    assert second.is_reused
+    assert second.score == first.score - 30
+    assert cache.stats().hits == 1
+
+
+def test_cached_results_are_scoped_to_mode_and_corpora():
+    cache = ResultCache(pepper="pepper")
+    fast = score_password(
+        "abc",
+        common_index=set(),
+        is_reused=False,
+        check_breach=False,
+        mode="fast",
+        result_cache=cache,
+    )
+    full = score_password(
+        "abc", common_index=set(), is_reused=True, check_breach=False, result_cache=cache
+    )
+    assert fast.reasons[-1] == "Remaining checks skipped (label already determined)"
+    assert full.is_reused
+    assert "Remaining checks skipped (label already determined)" not in full.reasons
+
+    plain = score_password(
+        "dragonfly", common_index=set(), is_reused=False, check_breach=False, result_cache=cache
+    )
+    with_words = score_password(
+        "dragonfly",
+        common_index=set(),
+        is_reused=False,
+        check_breach=False,
+        dictionary=WordMatcher(["dragon"]),
+        result_cache=cache,
+    )
+    assert REASON_DICTIONARY_WORD not in plain.reason_codes
+    assert REASON_DICTIONARY_WORD in with_words.reason_codes
@@ -1,6 +1,8 @@
+import json
+import multiprocessing
 from pathlib import Path
 
-from src.reuse import check_reuse, save_to_history
+from src.reuse import HistoryStore, check_reuse, save_to_history
 
 
 def test_reuse_round_trip(tmp_path: Path):
@@ -14,3 +16,62 @@ def test_reuse_round_trip(tmp_path: Path):
 
     r2 = check_reuse("secret", history, pepper)
     assert r2.is_reused is True
+
+
+def test_reuse_migrates_legacy_json_history(tmp_path: Path):
+    history = tmp_path / "history.json"
+    digest = check_reuse("legacy", history, "pepper").digest_hex
+    history.write_text(json.dumps({"digests": [digest]}, indent=2) + "\n", encoding="utf-8")
+
+    assert check_reuse("legacy", history, "pepper").is_reused is True
+    assert history.read_bytes().startswith(b"PSCHIST1")
+
+    save_to_history(check_reuse("fresh", history, "pepper").digest_hex, history)
+    assert len(HistoryStore(history)) == 2
+
+
+def test_unrecognised_history_is_backed_up_not_discarded(tmp_path: Path):
+    history = tmp_path / "history.json"
+    history.write_text("not json\n", encoding="utf-8")
+    assert check_reuse("secret", history, "pepper").is_reused is False
+    assert (tmp_path / "history.json.bak").read_text(encoding="utf-8") == "not json\n"
+    assert history.read_bytes() == b"PSCHIST1"
+
+    legacy = tmp_path / "legacy.json"
+    digest = check_reuse("legacy", legacy, "pepper").digest_hex
+    legacy.write_text(json.dumps({"digests": ["z" * 64, digest]}), encoding="utf-8")
+    assert check_reuse("legacy", legacy, "pepper").is_reused is True
+    assert not (tmp_path / "legacy.json.bak").exists()
+
+
+def _append_digests(history: Path, worker: int) -> None:
+    store = HistoryStore(history)
+    for i in range(50):
+        store.add(check_reuse(f"w{worker}-{i}", history, "pepper").digest_hex)
+
+
+def test_concurrent_appends_are_not_lost(tmp_path: Path):
+    history = tmp_path / "history.bin"
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_append_digests, args=(history, w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    assert len(HistoryStore(history)) == 200
+
+
+def test_compact_drops_duplicate_records(tmp_path: Path):
+    history = tmp_path / "history.bin"
+    digest = check_reuse("dup", history, "pepper").digest_hex
+    HistoryStore(history).add(digest)
+    HistoryStore(history).add(digest)
+    with history.open("ab") as f:
+        f.write(bytes.fromhex(digest))
+
+    store = HistoryStore(history)
+    store.compact()
+
+    assert history.stat().st_size == len(b"PSCHIST1") + 32
+    assert digest in store
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src import server as server_module
+from src.analyzer import analysis_payload, analyze_password
+from src.reuse import check_reuse
+from src.server import (
+    AnalysisService,
+    ServiceBusy,
+    handle_request,
+    make_http_server,
+    make_unix_server,
+)
+
+
+@pytest.fixture
+def service(tmp_path: Path) -> Iterator[AnalysisService]:
+    common = tmp_path / "common.txt"
+    common.write_text("password\n", encoding="utf-8")
+    with AnalysisService(
+        common_passwords_path=common,
+        history_path=tmp_path / "history.bin",
+        history_pepper="pepper",
+        check_breach=False,
+    ) as svc:
+        yield svc
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_service_matches_one_shot_analysis_and_tracks_reuse(
+    service: AnalysisService, tmp_path: Path
+):
+    expected = analyze_password(
+        "password",
+        common_passwords_path=tmp_path / "common.txt",
+        history_path=service.history_path,
+        history_pepper="pepper",
+        check_breach=False,
+        save_history=False,
+    )
+    assert service.analyze(["password"]) == [expected]
+
+    first, second = service.analyze(["Tr0ub4dor&3x", "Tr0ub4dor&3x"], save_history=True)
+    assert not first.is_reused
+    assert second.is_reused
+
+
+def test_unix_socket_answers_jsonl_requests(service: AnalysisService, tmp_path: Path):
+    path = tmp_path / "psc.sock"
+    server = make_unix_server(service, path)
+    _serve(server)
+    try:
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(str(path))
+            f = sock.makefile("rwb")
+            f.write(b'{"password": "password"}\n{"passwords": ["a", "b"]}\nnot json\n')
+            f.flush()
+            single = json.loads(f.readline())
+            many = json.loads(f.readline())
+            error = json.loads(f.readline())
+        assert single == analysis_payload(service.analyze(["password"])[0])
+        assert len(many["results"]) == 2
+        assert error["status"] == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not path.exists()
+
+
+def test_http_listener_serves_analysis_and_health(service: AnalysisService):
+    server = make_http_server(service, 0)
+    _serve(server)
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        conn.request("POST", "/analyze", body=json.dumps({"password": "password"}))
+        resp = conn.getresponse()
+        assert resp.status == 200
+        assert json.loads(resp.read())["label"] == "weak"
+
+        conn.request("POST", "/analyze", body=b'{"password": 1}')
+        resp = conn.getresponse()
+        assert resp.status == 400
+        resp.read()
+
+        conn.request("GET", "/health")
+        assert json.loads(conn.getresponse().read())["status"] == "ok"
+
+        conn.request("GET", "/metrics")
+        resp = conn.getresponse()
+        assert resp.status == 404
+        resp.read()
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_rejects_negative_content_length(service: AnalysisService):
+    server = make_http_server(service, 0)
+    _serve(server)
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            sock.sendall(
+                b"POST /analyze HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n"
+                b'{"password": "password"}'
+            )
+            status_line = sock.makefile("rb").readline()
+        assert status_line.split()[1] == b"400"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_full_queue_is_rejected(tmp_path: Path):
+    common = tmp_path / "common.txt"
+    common.write_text("", encoding="utf-8")
+    svc = AnalysisService(
+        common_passwords_path=common,
+        history_path=tmp_path / "history.bin",
+        history_pepper="",
+        check_breach=False,
+        max_queue=1,
+    )
+    svc.close()
+    svc.submit(["queued"])
+    with pytest.raises(ServiceBusy):
+        svc.submit(["overflow"])
+
+
+def test_unexpected_errors_and_bad_strings_get_a_response(
+    service: AnalysisService, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    status, payload = handle_request(service, b'{"passwords": ["ok", "\\ud800"]}')
+    assert status == 400
+
+    def fail(passwords: list[str], *, save_history: bool = False) -> list[object]:
+        raise OSError("history unavailable")
+
+    monkeypatch.setattr(service, "analyze", fail)
+    assert handle_request(service, b'{"password": "x"}') == (
+        500,
+        {"error": "Internal server error"},
+    )
+    assert "Analysis request failed" in caplog.text
+
+
+def test_timed_out_request_does_not_save_history(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    common = tmp_path / "common.txt"
+    common.write_text("", encoding="utf-8")
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_lookup(password: str) -> int:
+        started.set()
+        release.wait(5)
+        return 0
+
+    with AnalysisService(
+        common_passwords_path=common,
+        history_path=tmp_path / "history.bin",
+        history_pepper="pepper",
+        check_breach=True,
+        breach_lookup=slow_lookup,
+    ) as svc:
+        busy = svc.submit(["Tr0ub4dor&3x"])
+        assert started.wait(5)
+        monkeypatch.setattr(server_module, "_REQUEST_TIMEOUT_SECONDS", 0.05)
+        status, _ = handle_request(svc, b'{"password": "late-secret", "save_history": true}')
+        assert status == 504
+        release.set()
+        busy.result(5)
+        svc.submit(["flush"]).result(5)
+        assert not check_reuse("late-secret", svc.history_path, "pepper").is_reused
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[1]
+_LAZY_MODULES = {
+    "asyncio",
+    "http.client",
+    "importlib.resources",
+    "json",
+    "numpy",
+    "src.breach_client",
+    "src.parallel",
+    "src.server",
+    "ssl",
+    "tempfile",
+    "urllib.request",
+}
+
+
+def _import_times(tmp_path: Path, *args: str) -> dict[str, int]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=_ROOT,
+        env={**os.environ, "PASSWORD_HISTORY_PATH": str(tmp_path / "history.bin")},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_skips_heavy_modules(tmp_path: Path):
+    times = _import_times(tmp_path, "-c", "import src.cli")
+    assert "src.cli" in times
+    assert not _LAZY_MODULES & times.keys()
+
+
+def test_single_password_run_does_not_load_breach_or_json_modules(tmp_path: Path):
+    times = _import_times(tmp_path, "-m", "src.cli", "--password", "Tr0ub4dor&3")
+    assert not _LAZY_MODULES & times.keys()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import random
+import string
+
+import pytest
+
+from src.analyzer import score_passwords
+from src.features import extract_features
+from src.patterns import CommonPasswordIndex
+from src.vectorized import extract_features_batch
+
+
+def _random_passwords(count: int) -> list[str]:
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " éßΣİ€"
+    rng = random.Random(7)
+    out = ["", "aaaa", "abcd", "DCBA", "qwerty123", "1qaz2wsx", "İabcd", "x" * 300]
+    out += ["".join(rng.choice(alphabet) for _ in range(i % 30)) for i in range(count)]
+    return out
+
+
+def test_vectorized_features_match_python_engine():
+    pytest.importorskip("numpy")
+    passwords = _random_passwords(2000)
+    vectorized = extract_features_batch(passwords, engine="vectorized")
+    for pw, got in zip(passwords, vectorized):
+        want = extract_features(pw)
+        assert got.length == want.length
+        assert got.charset_size == want.charset_size
+        assert got.entropy_bits == want.entropy_bits
+        assert got.shannon_entropy_bits == want.shannon_entropy_bits
+        assert got.longest_repeat_run == want.longest_repeat_run
+        assert got.longest_sequence_run == want.longest_sequence_run
+        assert got.longest_keyboard_run == want.longest_keyboard_run
+
+
+def test_batch_scores_are_identical_across_engines():
+    pytest.importorskip("numpy")
+    index = CommonPasswordIndex(["password", "qwerty123"])
+    pairs = [(pw, False) for pw in _random_passwords(500) + ["password"]]
+    python = score_passwords(pairs, common_index=index, check_breach=False, engine="python")
+    vectorized = score_passwords(
+        pairs, common_index=index, check_breach=False, engine="vectorized"
+    )
+    assert python == vectorized
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        extract_features_batch(["pw"], engine="gpu")
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import random
+import string
+from pathlib import Path
+
+import pytest
+
+from src import patterns
+from src.dictionary import clear_word_matcher_cache, load_word_matcher
+from src.patterns import (
+    MappedCommonPasswordIndex,
+    clear_common_password_cache,
+    is_common_password,
+    is_common_password_variant,
+    load_common_password_index,
+)
+from src.wordlist import (
+    CompiledWordlist,
+    compile_wordlist,
+    compile_wordlist_file,
+    compiled_wordlist_path,
+)
+
+
+def test_compiled_wordlist_round_trips_and_answers_membership():
+    rng = random.Random(5)
+    words = {"".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 12))) for _ in range(500)}
+    words |= {"ünïcode", "密码", "a", "ab", "abc"}
+    wordlist = CompiledWordlist(compile_wordlist([words]))
+    section = wordlist.sections[0]
+
+    assert len(section) == len(words)
+    assert sorted(section) == sorted(words, key=lambda w: w.encode("utf-8"))
+    for w in words:
+        assert w in section
+        assert w.encode("utf-8") in section
+    for miss in ["", "zzzzzzzzzzzzzzzzzz", "abd", "ünïcod", "aa" * 10]:
+        assert (miss in section) == (miss in words)
+
+
+def test_compiled_wordlist_rejects_other_formats():
+    with pytest.raises(ValueError):
+        CompiledWordlist(b"not a wordlist")
+    data = bytearray(compile_wordlist([["word"]]))
+    data[4] = 99
+    with pytest.raises(ValueError, match="version"):
+        CompiledWordlist(bytes(data))
+
+
+def test_fresh_compiled_sidecar_replaces_text_parsing(tmp_path: Path):
+    clear_common_password_cache()
+    source = tmp_path / "common.txt"
+    source.write_text("password\nqwerty\n", encoding="utf-8")
+    compile_wordlist_file(source, compiled_wordlist_path(source), "common")
+
+    index = load_common_password_index(source)
+    assert isinstance(index, MappedCommonPasswordIndex)
+    assert is_common_password(" Password ", source)
+    assert is_common_password_variant("P@ssw0rd!", source)
+
+    source.write_text("letmein\n", encoding="utf-8")
+    st = compiled_wordlist_path(source).stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert not isinstance(load_common_password_index(source), MappedCommonPasswordIndex)
+    assert is_common_password("letmein", source)
+    assert not is_common_password("password", source)
+
+
+def test_words_kind_sidecar_falls_back_to_text_and_is_probed_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    clear_common_password_cache()
+    source = tmp_path / "common.txt"
+    source.write_text("password\nqwerty\n", encoding="utf-8")
+    compile_wordlist_file(source, compiled_wordlist_path(source), "words")
+
+    probes: list[Path] = []
+    count_sections = patterns.compiled_section_count
+
+    def probe(path: Path) -> int | None:
+        probes.append(path)
+        return count_sections(path)
+
+    monkeypatch.setattr(patterns, "compiled_section_count", probe)
+    index = load_common_password_index(source)
+    assert not isinstance(index, MappedCommonPasswordIndex)
+    assert is_common_password("password", source)
+    assert is_common_password_variant("P@ssw0rd!", source)
+    assert probes == [source, compiled_wordlist_path(source)]
+
+
+def test_compiled_dictionary_feeds_the_word_matcher(tmp_path: Path):
+    clear_word_matcher_cache()
+    source = tmp_path / "words.txt"
+    source.write_text("summer\nwindow\n", encoding="utf-8")
+    compiled = tmp_path / "words.bin"
+    compile_wordlist_file(source, compiled)
+
+    assert load_word_matcher([compiled]).find_words("xSummerWindow1") == ["summer", "window"]
@@ -1,3 +1,5 @@
 import "./test_analyzer.mjs";
+import "./test_analysis_engine.mjs";
+import "./test_wordlist.mjs";
 import "./test_generator.mjs";
 import "./test_crypto.mjs";
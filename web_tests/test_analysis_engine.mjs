@@ -0,0 +1,99 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+
+import { AnalysisClient } from "../docs/assets/modules/analysis-client.js";
+import { AnalysisEngine } from "../docs/assets/modules/analysis-engine.js";
+import { analyzePassword } from "../docs/assets/modules/analyzer.js";
+
+const LISTS = {
+  "common.txt": "# comment\npassword\nQwerty\n",
+  "words.txt": "dragon\nsummer\n",
+};
+
+function makeEngine() {
+  const fetched = [];
+  const engine = new AnalysisEngine({
+    fetchBuffer: async (url) => {
+      fetched.push(url);
+      if (!(url in LISTS)) throw new Error(`Failed to load ${url}`);
+      return new TextEncoder().encode(LISTS[url]).buffer;
+    },
+  });
+  return { engine, fetched };
+}
+
+test("engine fetches each list once, only when a check needs it", async () => {
+  const { engine, fetched } = makeEngine();
+  await engine.handle({ type: "common-list", id: 1, url: "common.txt" });
+  await engine.handle({ type: "word-list", id: 2, url: "words_fr.txt" });
+  await engine.handle({ type: "word-list", id: 3, url: "words.txt" });
+  const custom = await engine.handle({ type: "custom-words", id: 4, text: "acme\n" });
+  assert.equal(custom.size, 1);
+  assert.deepEqual(fetched, []);
+
+  await engine.handle({ type: "analyze", id: 5, password: "x", options: { toggles: { dictionary: false } } });
+  assert.deepEqual(fetched, ["common.txt"]);
+
+  const missing = await engine.handle({ type: "word-list", id: 6, url: "missing.bin" });
+  assert.equal(missing.type, "ok");
+  const warned = await engine.handle({ type: "analyze", id: 7, password: "x", options: {} });
+  assert.deepEqual(warned.warnings, ["Failed to load missing.bin"]);
+  await engine.handle({ type: "word-list", id: 8, url: "words.txt" });
+
+  const options = { policy: "strict", toggles: { reuse: false } };
+  const expected = await analyzePassword("qwerty-dragon-acme", {
+    ...options,
+    commonSet: new Set(["password", "qwerty"]),
+    wordSet: new Set(["dragon", "summer", "acme"]),
+  });
+  for (const live of [false, true]) {
+    const response = await engine.handle({
+      type: "analyze",
+      id: 9,
+      password: "qwerty-dragon-acme",
+      options,
+      live,
+    });
+    assert.equal(response.type, "result");
+    assert.deepEqual(response.analysis, expected);
+    assert.ok(response.elapsedMs >= 0);
+  }
+  assert.deepEqual(fetched, ["common.txt", "missing.bin", "words.txt"]);
+});
+
+test("engine cancels superseded live requests", async () => {
+  const { engine } = makeEngine();
+  const responses = await Promise.all(
+    ["p", "pa", "pas"].map((password, i) =>
+      engine.handle({ type: "analyze", id: i + 1, password, options: {}, live: true }),
+    ),
+  );
+  assert.deepEqual(
+    responses.map((r) => r.type),
+    ["cancelled", "cancelled", "result"],
+  );
+  assert.equal(responses[2].analysis.reasons[0], "Too short (< 8 characters)");
+});
+
+test("engine returns updated history for the page to persist", async () => {
+  const { engine } = makeEngine();
+  const options = { pepper: "pepper", saveHistory: true };
+  const first = await engine.handle({ type: "analyze", id: 1, password: "hunter22", options, history: null });
+  assert.equal(first.analysis.isReused, false);
+  assert.equal(JSON.parse(first.history).length, 1);
+
+  const second = await engine.handle({ type: "analyze", id: 2, password: "hunter22", options, history: first.history });
+  assert.equal(second.analysis.isReused, true);
+});
+
+test("client falls back to an inline engine and tracks latency", async () => {
+  const client = new AnalysisClient({ Worker: null });
+  assert.equal(client.mode, "inline");
+  const response = await client.analyze("CorrectHorseBatteryStaple", { toggles: { reuse: false } }, { live: true });
+  assert.equal(response.type, "result");
+  assert.ok(response.roundTripMs >= 0);
+  const stats = client.latency();
+  assert.equal(stats.count, 1);
+  assert.equal(stats.cancelled, 0);
+  await assert.rejects(client.request({ type: "bogus" }), /Unknown message type/);
+});
@@ -2,7 +2,10 @@ import test from "node:test";
 import assert from "node:assert/strict";
 
 import {
+  IncrementalAnalyzer,
+  WordMatcher,
   analyzePassword,
+  detectDictionaryWords,
   estimateCharsetSize,
   estimateEntropyBits,
   estimateShannonEntropyBits,
@@ -170,3 +173,47 @@ test("analyzer fuzz: score stays within 0..100", async () => {
     assert.ok(a.score >= 0 && a.score <= 100);
   }
 });
+
+test("word matcher finds overlapping embedded words in one pass", () => {
+  const matcher = new WordMatcher(["she", "hers", "Horse ", "staple", "abc", 42], 3);
+  assert.deepEqual(matcher.findAll("uSHERS"), ["she", "hers"]);
+  assert.deepEqual(matcher.findAll("CorrectHorseBatteryStaple"), ["horse", "staple"]);
+  assert.deepEqual(detectDictionaryWords("xxsummerwindowsun", new Set(["summer", "window", "sun"])), [
+    "summer",
+    "window",
+  ]);
+});
+
+test("incremental analyzer matches a full re-analysis on every keystroke", async () => {
+  const options = {
+    commonSet: new Set(["password", "qwerty"]),
+    wordSet: new Set(["dragon", "summer"]),
+    policy: "strict",
+    toggles: { reuse: false },
+  };
+  const alphabet = ["a", "b", "c", "d", "q", "w", "e", "1", "2", "!", "A", "Σ", "İ", "é", "😀"];
+  const analyzer = new IncrementalAnalyzer();
+  const typed = [];
+  let seed = 11;
+  const rand = (n) => {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed % n;
+  };
+
+  for (let i = 0; i < 600; i += 1) {
+    if (typed.length > 0 && rand(3) === 0) {
+      assert.equal(analyzer.pop(), typed.pop());
+    } else {
+      const c = alphabet[rand(alphabet.length)];
+      analyzer.push(c);
+      typed.push(c);
+    }
+    const expected = await analyzePassword(typed.join(""), options);
+    assert.deepEqual(analyzer.result(options), expected);
+  }
+
+  analyzer.update("password");
+  assert.equal(analyzer.password, "password");
+  assert.deepEqual(analyzer.result(options), await analyzePassword("password", options));
+  assert.throws(() => analyzer.push("ab"), TypeError);
+});
@@ -0,0 +1,50 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { readFile } from "node:fs/promises";
+
+import { WordMatcher, parseWordlist } from "../docs/assets/modules/analyzer.js";
+import { CompiledWordlist, WordlistUnion, isCompiledWordlist } from "../docs/assets/modules/wordlist.js";
+
+async function readBuffer(path) {
+  const bytes = await readFile(new URL(path, import.meta.url));
+  return bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength);
+}
+
+test("compiled assets hold the same words as their text sources", async () => {
+  for (const name of ["common_passwords", "words_en", "words_es", "words_fr"]) {
+    const buffer = await readBuffer(`../docs/assets/${name}.bin`);
+    assert.ok(isCompiledWordlist(buffer), name);
+    const compiled = new CompiledWordlist(buffer);
+    const source = parseWordlist(await readFile(new URL(`../docs/assets/${name}.txt`, import.meta.url), "utf8"));
+    assert.deepEqual([...compiled].sort(), [...source].sort(), name);
+    assert.equal(compiled.size, source.size);
+    for (const word of source) assert.ok(compiled.has(word), word);
+    assert.equal(compiled.has("zzzz-not-a-word"), false);
+  }
+});
+
+test("compiled wordlist finds the same embedded words as the matcher", async () => {
+  const buffer = await readBuffer("../docs/assets/words_en.bin");
+  const compiled = new CompiledWordlist(buffer);
+  const words = [...compiled];
+  const matcher = new WordMatcher(words);
+
+  let seed = 3;
+  const rand = (n) => {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed % n;
+  };
+  for (let i = 0; i < 300; i += 1) {
+    let text = "";
+    while (text.length < 24) {
+      text += rand(2) ? words[rand(words.length)] : "xQ9!é"[rand(5)];
+    }
+    if (i % 3 === 0) text = text.toUpperCase();
+    assert.deepEqual(compiled.findAll(text, 3), matcher.findAll(text, 3), text);
+  }
+
+  const union = new WordlistUnion([compiled, new Set(["acme", "about"])]);
+  const merged = new WordMatcher([...words, "acme"]);
+  assert.deepEqual(union.findAll("ACMEaboutxabove"), merged.findAll("ACMEaboutxabove"));
+  assert.ok(union.has("acme") && union.has("about"));
+});